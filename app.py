@@ -82,6 +82,26 @@ def create_app():
     app.register_blueprint(main_bp)
     app.register_blueprint(api_bp)
     
+    # Geldbeträge (Money) in JSON-Antworten als Zahl
+    from utils import money
+    money.init_app(app)
+    
+    # SQL-Statistik pro Request (Anzahl, Dauer, N+1-Verdacht)
+    from utils import sql_stats
+    sql_stats.init_app(app)
+    
+    # Prometheus-Metriken unter /metrics
+    from utils import metrics
+    metrics.init_app(app)
+    
+    # Profiling einzelner Requests (nur wenn PROFILE_* gesetzt)
+    from utils import profiler
+    profiler.init_app(app)
+    
+    # Slow-Query-Log (Abfragen über SLOW_QUERY_MS, mit Route + User)
+    from utils import slow_queries
+    slow_queries.init_app(app)
+    
     # Optional: Custom Error-Handler
     @app.errorhandler(404)
     def not_found(error):
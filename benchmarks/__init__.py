@@ -0,0 +1 @@
+"""Benchmarks, Seed-Daten und Lasttests (nicht Teil der App)."""
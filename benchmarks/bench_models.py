@@ -0,0 +1,299 @@
+"""
+bench_models.py - Microbenchmarks für Model- und Service-Methoden
+
+    export DB_NAME=budget_tracker_bench
+    python benchmarks/bench_models.py --users 20 --transactions 5000 --categories 12
+    python benchmarks/bench_models.py --no-seed --save            # Baseline speichern
+    python benchmarks/bench_models.py --no-seed --compare         # gegen Baseline prüfen
+    python benchmarks/bench_models.py --engine both               # MySQL vs. SQLite (SQLITE_PATH)
+
+Jeder Fall wird nach einer Aufwärmphase --iterations Mal ausgeführt (User
+reihum). Gemessen werden p50/p90/p99/Mittelwert in ms und die Spitzen-
+Allokation eines Aufrufs (tracemalloc, separater Lauf, damit die Zeiten
+nicht verfälscht werden).
+
+--compare beendet mit Exit-Code 1, wenn ein Fall im p50 um mehr als
+--threshold (Standard 20%) langsamer ist als in der Baseline.
+Baselines liegen unter benchmarks/baselines/<name>.json (SQLite:
+<name>.sqlite.json).
+
+--engine both führt die Fälle nacheinander gegen beide Storage-Engines
+aus (gleiche Seed-Daten) und stellt die p50-Werte gegenüber.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from models import storage  # noqa: E402
+from models.storage import get_db_connection  # noqa: E402
+from models.category import Category  # noqa: E402
+from models.transaction import Transaction  # noqa: E402
+from models.user import User  # noqa: E402
+from services.category_service import CategoryService  # noqa: E402
+from services.transaction_service import TransactionService  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+
+class BenchContext:
+    """IDs aus der Benchmark-DB, reihum an die Fälle verteilt"""
+
+    def __init__(self):
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM users ORDER BY id")
+        self.user_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT user_id, MIN(id), MAX(id) FROM categories GROUP BY user_id")
+        self.categories = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+        cursor.execute("SELECT user_id, MIN(id), MAX(id), COUNT(*) FROM transactions GROUP BY user_id")
+        self.transactions = {row[0]: (row[1], row[2], row[3]) for row in cursor.fetchall()}
+        cursor.close()
+        conn.close()
+        if not self.user_ids:
+            raise RuntimeError("Benchmark-DB ist leer - zuerst ohne --no-seed laufen lassen")
+
+    def user(self, i):
+        return self.user_ids[i % len(self.user_ids)]
+
+    def category(self, i):
+        low, high = self.categories.get(self.user(i), (None, None))
+        return None if low is None else low + i % (high - low + 1)
+
+    def transaction(self, i):
+        low, high, _ = self.transactions.get(self.user(i), (0, 0, 0))
+        return low + (i * 7919) % (high - low + 1)
+
+    def page_count(self, i, per_page=50):
+        _, _, count = self.transactions.get(self.user(i), (0, 0, 0))
+        return max(1, (count + per_page - 1) // per_page)
+
+
+def _add_and_delete(ctx, i):
+    """Schreibpfad: anlegen (inkl. abgeleiteter Daten) und wieder löschen"""
+    user_id = ctx.user(i)
+    TransactionService.add_transaction(user_id, '12.34', 'expense', ctx.category(i), 'bench write', None)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT MAX(id) FROM transactions WHERE user_id = %s AND description = 'bench write'", (user_id,)
+    )
+    transaction_id = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    if transaction_id:
+        TransactionService.delete_transaction(transaction_id, user_id)
+
+
+def _update(ctx, i):
+    Transaction.update(ctx.transaction(i), ctx.user(i), description=f"bench update {i % 2}")
+
+
+# Name → Funktion(ctx, i). Neue Fälle einfach hier ergänzen.
+CASES = {
+    'User.find_by_id': lambda ctx, i: User.find_by_id(ctx.user(i)),
+    'Category.get_all_by_user': lambda ctx, i: Category.get_all_by_user(ctx.user(i)),
+    'Category.name_exists': lambda ctx, i: Category.name_exists(ctx.user(i), 'Kategorie 03'),
+    'Transaction.get_by_id': lambda ctx, i: Transaction.get_by_id(ctx.transaction(i), ctx.user(i)),
+    'Transaction.get_all_by_user': lambda ctx, i: Transaction.get_all_by_user(ctx.user(i)),
+    'Transaction.get_summary_by_user': lambda ctx, i: Transaction.get_summary_by_user(ctx.user(i)),
+    'Transaction.get_by_category': lambda ctx, i: Transaction.get_by_category(ctx.user(i)),
+    'Transaction.get_page_with_balance[first]':
+        lambda ctx, i: Transaction.get_page_with_balance(ctx.user(i), 1, 50),
+    'Transaction.get_page_with_balance[deep]':
+        lambda ctx, i: Transaction.get_page_with_balance(ctx.user(i), ctx.page_count(i) // 2 + 1, 50),
+    'Transaction.get_balance_as_of':
+        lambda ctx, i: Transaction.get_balance_as_of(ctx.user(i), datetime.now().date() - timedelta(days=i % 365)),
+    'Transaction.update': _update,
+    'TransactionService.get_dashboard_data[page1]':
+        lambda ctx, i: TransactionService.get_dashboard_data(ctx.user(i), 1, 50),
+    'TransactionService.get_running_balance':
+        lambda ctx, i: TransactionService.get_running_balance(ctx.user(i), 1, 50),
+    'TransactionService.add+delete': _add_and_delete,
+    'CategoryService.get_categories_as_dict': lambda ctx, i: CategoryService.get_categories_as_dict(ctx.user(i)),
+    'CategoryService.get_budget_status': lambda ctx, i: CategoryService.get_budget_status(ctx.user(i)),
+}
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_case(func, ctx, iterations, warmup):
+    for i in range(warmup):
+        func(ctx, i)
+
+    timings = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        func(ctx, i)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    func(ctx, iterations)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'p50_ms': round(_percentile(timings, 0.50), 4),
+        'p90_ms': round(_percentile(timings, 0.90), 4),
+        'p99_ms': round(_percentile(timings, 0.99), 4),
+        'mean_ms': round(statistics.fmean(timings), 4),
+        'max_ms': round(timings[-1], 4),
+        'peak_kb': round(peak / 1024, 1)
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns:
+        Liste von (fall, alt_p50, neu_p50, faktor) mit Verschlechterung > threshold
+    """
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get('results', {}).get(name)
+        if not old or not old.get('p50_ms'):
+            continue
+        ratio = result['p50_ms'] / old['p50_ms']
+        if ratio > 1 + threshold:
+            regressions.append((name, old['p50_ms'], result['p50_ms'], ratio))
+    return regressions
+
+
+def baseline_path(name, engine):
+    suffix = '' if engine == 'mysql' else f".{engine}"
+    return os.path.join(BASELINE_DIR, f"{name}{suffix}.json")
+
+
+def run_suite(args):
+    """
+    Seed (optional) + alle Fälle gegen die aktive Storage-Engine
+
+    Returns:
+        Report-Dict mit meta und results
+    """
+    if not args.no_seed:
+        from benchmarks.seed import seed, check_target
+        if not check_target(force=False):
+            return None
+        print(f"Seeding {args.users} User × {args.transactions} Transaktionen × {args.categories} Kategorien ...")
+        seed(args.users, args.transactions, args.categories)
+
+    ctx = BenchContext()
+    results = {}
+    print(f"{'Fall':<48} {'p50':>9} {'p90':>9} {'p99':>9} {'mean':>9} {'peak KB':>9}")
+    for name, func in CASES.items():
+        if args.filter and args.filter not in name:
+            continue
+        result = run_case(func, ctx, args.iterations, args.warmup)
+        results[name] = result
+        print(f"{name:<48} {result['p50_ms']:>9.3f} {result['p90_ms']:>9.3f} {result['p99_ms']:>9.3f} "
+              f"{result['mean_ms']:>9.3f} {result['peak_kb']:>9.1f}")
+
+    if storage.engine() == 'mysql':
+        db = f"{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}"
+    else:
+        db = storage.database_name()
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'engine': storage.engine(),
+            'db': db,
+            'users': len(ctx.user_ids),
+            'transactions': sum(count for _, _, count in ctx.transactions.values()),
+            'iterations': args.iterations
+        },
+        'results': results
+    }
+
+
+def print_engine_comparison(reports):
+    """p50 pro Fall nebeneinander (Faktor = sqlite / mysql)"""
+    mysql_results = reports['mysql']['results']
+    sqlite_results = reports['sqlite']['results']
+    print(f"\n{'Fall':<48} {'mysql p50':>10} {'sqlite p50':>11} {'Faktor':>8}")
+    for name, result in mysql_results.items():
+        other = sqlite_results.get(name)
+        if other is None:
+            continue
+        ratio = other['p50_ms'] / result['p50_ms'] if result['p50_ms'] else 0
+        print(f"{name:<48} {result['p50_ms']:>10.3f} {other['p50_ms']:>11.3f} {ratio:>7.2f}x")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Microbenchmarks für Models und Services")
+    ap.add_argument("--users", default=10, type=int)
+    ap.add_argument("--transactions", default=2000, type=int, help="Transaktionen pro User")
+    ap.add_argument("--categories", default=10, type=int, help="Kategorien pro User")
+    ap.add_argument("--no-seed", action="store_true", help="bestehende Benchmark-DB verwenden")
+    ap.add_argument("--engine", choices=('mysql', 'sqlite', 'both'), default=Config.DB_ENGINE,
+                    help="Storage-Engine (both = Vergleich)")
+    ap.add_argument("--iterations", default=200, type=int)
+    ap.add_argument("--warmup", default=20, type=int)
+    ap.add_argument("--filter", default='', help="nur Fälle, deren Name diesen Text enthält")
+    ap.add_argument("--baseline", default='default', help="Name der Baseline-Datei")
+    ap.add_argument("--save", action="store_true", help="Ergebnis als Baseline speichern")
+    ap.add_argument("--compare", action="store_true", help="gegen Baseline prüfen")
+    ap.add_argument("--threshold", default=0.20, type=float, help="erlaubte Verschlechterung (0.2 = 20%%)")
+    ap.add_argument("--output", help="Ergebnis zusätzlich als JSON hierhin schreiben")
+    args = ap.parse_args()
+
+    engines = ('mysql', 'sqlite') if args.engine == 'both' else (args.engine,)
+    reports = {}
+    for engine in engines:
+        storage.use_engine(engine)
+        print(f"== {engine} ({storage.database_name()}) ==")
+        report = run_suite(args)
+        if report is None:
+            return 2
+        reports[engine] = report
+
+    if len(reports) > 1:
+        print_engine_comparison(reports)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(reports if len(reports) > 1 else reports[engines[0]], f, indent=2)
+
+    failed = False
+    for engine, report in reports.items():
+        path = baseline_path(args.baseline, engine)
+        if args.save:
+            os.makedirs(BASELINE_DIR, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Baseline gespeichert: {path}")
+
+        if args.compare:
+            if not os.path.exists(path):
+                print(f"[ERROR] Keine Baseline unter {path} (zuerst mit --save erstellen)")
+                return 2
+            with open(path) as f:
+                baseline = json.load(f)
+            regressions = compare(report['results'], baseline, args.threshold)
+            for name, old, new, ratio in regressions:
+                print(f"[REGRESSION] {engine} {name}: p50 {old:.3f} ms → {new:.3f} ms ({(ratio - 1) * 100:+.0f}%)")
+            if regressions:
+                failed = True
+            else:
+                print(f"Keine Verschlechterung über {args.threshold * 100:.0f}% gegenüber {path}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+bench_prepared.py - Text-Protokoll vs. Server-side Prepared Statements
+
+Führt dieselbe feste Abfrage N-mal aus, einmal als normaler Text-Query
+(MySQL parst jedes Mal neu) und einmal über execute_prepared()
+(einmal vorbereitet, danach nur noch Parameter).
+
+    python benchmarks/bench_prepared.py --user-id 1 --iterations 5000
+
+Ausgabe: Gesamtzeit, mittlere Latenz und Anzahl Com_stmt_prepare
+(wie oft der Server tatsächlich vorbereitet hat).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.storage import get_db_connection, execute_prepared  # noqa: E402
+
+QUERY = """
+    SELECT
+        t.id, t.user_id, t.amount, t.type, t.description, t.date, t.category_id,
+        c.name as category_name, c.color as category_color
+    FROM transactions t
+    LEFT JOIN categories c ON t.category_id = c.id
+    WHERE t.user_id = %s
+    ORDER BY t.date DESC, t.id DESC
+    LIMIT 50
+"""
+
+
+def _status(conn, name):
+    cursor = conn.cursor()
+    cursor.execute("SHOW SESSION STATUS LIKE %s", (name,))
+    row = cursor.fetchone()
+    cursor.close()
+    return int(row[1]) if row else 0
+
+
+def run_text(conn, user_id, iterations):
+    for _ in range(iterations):
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(QUERY, (user_id,))
+        cursor.fetchall()
+        cursor.close()
+
+
+def run_prepared(conn, user_id, iterations):
+    for _ in range(iterations):
+        cursor = execute_prepared(conn, QUERY, (user_id,), dictionary=True)
+        cursor.fetchall()
+
+
+def measure(label, func, conn, user_id, iterations):
+    prepares_before = _status(conn, 'Com_stmt_prepare')
+    started = time.perf_counter()
+    func(conn, user_id, iterations)
+    elapsed = time.perf_counter() - started
+    prepares = _status(conn, 'Com_stmt_prepare') - prepares_before
+    print(f"{label:<10} {elapsed:8.3f}s gesamt  {elapsed / iterations * 1000:7.3f} ms/Query  "
+          f"{prepares} Prepares")
+    return elapsed
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark Prepared Statements")
+    ap.add_argument("--user-id", default=1, type=int)
+    ap.add_argument("--iterations", default=2000, type=int)
+    args = ap.parse_args()
+
+    conn = get_db_connection()
+    try:
+        # Aufwärmen (Buffer Pool, Verbindung)
+        run_text(conn, args.user_id, 50)
+        text = measure("text", run_text, conn, args.user_id, args.iterations)
+        prepared = measure("prepared", run_prepared, conn, args.user_id, args.iterations)
+    finally:
+        conn.close()
+
+    print(f"Ersparnis: {(1 - prepared / text) * 100:.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+datagen.py - Realistische Test-Ledgers für Lasttests
+
+    export DB_NAME=budget_tracker_bench
+    python benchmarks/datagen.py --users 200 --median-months 12 --out benchmarks/loadtest_users.json
+
+Im Unterschied zu seed.py (gleich grosse User, zufällige Buchungen):
+- User-Grössen sind schief verteilt (Pareto): die meisten haben wenige
+  Monate Historie und wenige Buchungen, einige wenige sehr viele
+- jede Buchung folgt einem Muster: Lohn + Miete monatlich, Abos monatlich,
+  Lebensmittel/Transport mehrmals pro Woche, Rest gelegentlich
+- mit Wochenend-Effekt und leichtem Betragsrauschen
+
+Die Login-Daten (Username + Passwort) landen in --out für loadtest.py.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.seed import (  # noqa: E402
+    BENCH_PASSWORD, check_target, create_categories, create_users,
+    insert_user_ledger, reset_database, username_for
+)
+from models import storage  # noqa: E402
+from models.balance_checkpoint import BalanceCheckpoint  # noqa: E402
+
+# (Name, Buchungen pro Monat, mittlerer Betrag, Streuung als Faktor)
+SPENDING_PATTERNS = [
+    ('Lebensmittel', 12, 45.0, 0.5),
+    ('Restaurant', 5, 35.0, 0.6),
+    ('Transport', 8, 12.0, 0.8),
+    ('Freizeit', 3, 60.0, 0.9),
+    ('Kleidung', 1, 90.0, 0.7),
+    ('Gesundheit', 0.7, 80.0, 1.0),
+    ('Haushalt', 2, 40.0, 0.8),
+    ('Geschenke', 0.4, 70.0, 0.8),
+]
+MONTHLY_FIXED = [
+    # (Name, Tag im Monat, Betrag von, Betrag bis, Typ)
+    ('Lohn', 25, 4200, 7800, 'income'),
+    ('Miete', 1, 1200, 2600, 'expense'),
+    ('Versicherung', 5, 280, 520, 'expense'),
+    ('Abos', 12, 15, 60, 'expense'),
+]
+CATEGORY_NAMES = [name for name, *_ in MONTHLY_FIXED] + [name for name, *_ in SPENDING_PATTERNS]
+
+
+def ledger_months(rng, median_months, max_months):
+    """Pareto-verteilte Historienlänge (Median ≈ median_months)"""
+    alpha = 1.2
+    scale = median_months / (2 ** (1 / alpha))
+    return max(1, min(max_months, int(scale * rng.paretovariate(alpha))))
+
+
+def _amount(rng, mean, spread):
+    return Decimal(f"{max(1.0, rng.lognormvariate(0, spread) * mean):.2f}")
+
+
+def generate_ledger(rng, months, category_ids, end):
+    """
+    Buchungen eines Users über `months` Monate bis `end`
+
+    Args:
+        category_ids: Dict {kategorie-name: id}
+    """
+    rows = []
+    activity = rng.uniform(0.5, 2.0)  # manche User buchen viel mehr Kleinkram als andere
+    start = end - timedelta(days=months * 30)
+
+    # Fixe monatliche Buchungen
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        for name, day, low, high, kind in MONTHLY_FIXED:
+            date = datetime(year, month, min(day, 28), 8, 0)
+            if start <= date <= end:
+                rows.append({
+                    'amount': Decimal(f"{rng.uniform(low, high):.2f}"),
+                    'type': kind,
+                    'description': name,
+                    'date': date,
+                    'category_id': category_ids.get(name)
+                })
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+    # Variable Ausgaben, Tag für Tag (Wochenende: mehr Restaurant/Freizeit)
+    day = start
+    while day <= end:
+        weekend = day.weekday() >= 5
+        for name, per_month, mean, spread in SPENDING_PATTERNS:
+            rate = per_month * activity / 30
+            if weekend and name in ('Restaurant', 'Freizeit'):
+                rate *= 2
+            while rate > 0:
+                if rng.random() < min(rate, 1.0):
+                    rows.append({
+                        'amount': _amount(rng, mean, spread),
+                        'type': 'expense',
+                        'description': name,
+                        'date': day.replace(hour=rng.randrange(7, 22), minute=rng.randrange(60)),
+                        'category_id': category_ids.get(name) if rng.random() > 0.05 else None
+                    })
+                rate -= 1
+        day += timedelta(days=1)
+
+    rows.sort(key=lambda row: row['date'])
+    return rows
+
+
+def generate(users, median_months, max_months, seed_value=7):
+    """
+    Legt `users` User mit schief verteilten Ledgern an
+
+    Returns:
+        Dict mit users (Login-Daten + Grösse) und Gesamtanzahl
+    """
+    rng = random.Random(seed_value)
+    end = datetime.now().replace(microsecond=0)
+
+    reset_database()
+    user_ids = create_users(users)
+    categories = create_categories(user_ids, CATEGORY_NAMES)
+
+    accounts, total = [], 0
+    for index, user_id in enumerate(user_ids):
+        months = ledger_months(rng, median_months, max_months)
+        category_ids = dict(zip(CATEGORY_NAMES, categories.get(user_id, [])))
+        rows = generate_ledger(rng, months, category_ids, end)
+        insert_user_ledger(user_id, rows)
+        BalanceCheckpoint.rebuild(user_id)
+        accounts.append({
+            'username': username_for(index),
+            'password': BENCH_PASSWORD,
+            'user_id': user_id,
+            'transactions': len(rows)
+        })
+        total += len(rows)
+
+    return {'users': accounts, 'transactions': total}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Realistische Test-Ledgers erzeugen")
+    ap.add_argument("--users", default=100, type=int)
+    ap.add_argument("--median-months", default=12, type=int, help="typische Historienlänge")
+    ap.add_argument("--max-months", default=120, type=int, help="längste Historie (Ausreisser)")
+    ap.add_argument("--seed", default=7, type=int)
+    ap.add_argument("--out", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                  'loadtest_users.json'))
+    ap.add_argument("--force", action="store_true", help="auch DBs ohne 'bench' im Namen leeren")
+    args = ap.parse_args()
+
+    if not check_target(args.force):
+        return 2
+
+    started = time.perf_counter()
+    result = generate(args.users, args.median_months, args.max_months, args.seed)
+    with open(args.out, 'w') as f:
+        json.dump(result['users'], f, indent=2)
+
+    sizes = sorted(account['transactions'] for account in result['users'])
+    print(f"{len(sizes)} User, {result['transactions']} Transaktionen in "
+          f"{time.perf_counter() - started:.1f}s ({storage.database_name()})")
+    print(f"Transaktionen pro User: min {sizes[0]}, median {sizes[len(sizes) // 2]}, max {sizes[-1]}")
+    print(f"Login-Daten: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
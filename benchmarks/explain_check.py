@@ -0,0 +1,258 @@
+"""
+explain_check.py - Query-Plan-Prüfung per EXPLAIN gegen eine Benchmark-DB
+
+    export DB_NAME=budget_tracker_bench
+    python benchmarks/explain_check.py                 # seed + prüfen gegen Snapshot
+    python benchmarks/explain_check.py --no-seed --update   # Snapshot neu schreiben
+
+Ablauf:
+    1. alle Benchmark-Fälle (bench_models.CASES + EXTRA_CASES) einmal ausführen
+       und dabei jede SQL-Anweisung aus dem models-Paket mitschneiden
+       (utils.sql_stats.capture → Fingerprint, Beispiel-Parameter, Model-Methode)
+    2. jede SELECT/UPDATE/DELETE-Anweisung mit EXPLAIN analysieren
+    3. markieren: Full Table Scan (type=ALL), Filesort, temporäre Tabelle,
+       vorhandener aber ungenutzter Index (possible_keys gesetzt, key leer)
+    4. mit dem Snapshot benchmarks/query_plans.json vergleichen
+    5. ist transactions partitioniert: prüfen, dass die Abfragen aus
+       PRUNED_CALLERS nicht alle Partitionen lesen (EXPLAIN-Spalte partitions)
+
+Exit-Code 1, wenn ein Plan schlechter geworden ist (schlechterer Zugriffstyp
+auf einer Tabelle, neue Markierung, mehr gelesene Partitionen) oder das
+Partition Pruning fehlt. Neue Abfragen werden nur gemeldet.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_models import CASES, BenchContext  # noqa: E402
+from models import storage  # noqa: E402
+from models.storage import get_db_connection  # noqa: E402
+from models.balance_checkpoint import BalanceCheckpoint  # noqa: E402
+from models.budget import Budget  # noqa: E402
+from models.job import Job  # noqa: E402
+from models.recurring import RecurringTransaction  # noqa: E402
+from models.transaction import Transaction  # noqa: E402
+from models.user import User  # noqa: E402
+from utils import sql_stats  # noqa: E402
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'query_plans.json')
+EXPLAINABLE = ('select', 'update', 'delete')
+
+# Zugriffstypen von gut nach schlecht (MySQL EXPLAIN "type")
+ACCESS_RANK = {
+    'system': 0, 'const': 0, 'eq_ref': 1, 'ref': 2, 'fulltext': 2, 'ref_or_null': 3,
+    'index_merge': 4, 'unique_subquery': 3, 'index_subquery': 3, 'range': 4, 'index': 5, 'ALL': 6
+}
+
+# Abfragen mit Datumsbedingung, die bei partitioniertem transactions
+# nur einen Teil der Partitionen lesen müssen
+PRUNED_CALLERS = (
+    'Transaction.update', 'Transaction.delete',
+    'BalanceCheckpoint.balance_before', 'BalanceCheckpoint.refresh',
+)
+
+# Model-Methoden, die von den Benchmark-Fällen nicht abgedeckt werden
+EXTRA_CASES = {
+    'User.find_by_username': lambda ctx, i: User.find_by_username('bench_user_00000'),
+    'Transaction.iter_chunks': lambda ctx, i: sum(len(rows) for rows in Transaction.iter_chunks(ctx.user(i))),
+    'Transaction.get_balance_between':
+        lambda ctx, i: Transaction.get_balance_between(ctx.user(i), date.today() - timedelta(days=90), date.today()),
+    'BalanceCheckpoint.balance_before':
+        lambda ctx, i: BalanceCheckpoint.balance_before(ctx.user(i), date.today() - timedelta(days=30)),
+    'Budget.get_all_status': lambda ctx, i: Budget.get_all_status(ctx.user(i)),
+    'RecurringTransaction.get_all_by_user': lambda ctx, i: RecurringTransaction.get_all_by_user(ctx.user(i)),
+    'Job.get_all_by_user': lambda ctx, i: Job.get_all_by_user(ctx.user(i)),
+    'Job.count_active': lambda ctx, i: Job.count_active(ctx.user(i)),
+}
+
+
+def collect_statements(ctx):
+    """
+    Returns:
+        Dict {fingerprint: {'sql', 'params', 'caller'}} (nur Aufrufe aus models/)
+    """
+    with sql_stats.capture() as log:
+        for name, func in {**CASES, **EXTRA_CASES}.items():
+            try:
+                func(ctx, 1)
+            except Exception as e:
+                print(f"[WARN] Fall {name} fehlgeschlagen: {e}")
+    return {key: sample for key, sample in log.samples.items() if sample['caller']}
+
+
+def explain(cursor, sql, params):
+    cursor.execute("EXPLAIN " + sql, params or ())
+    return cursor.fetchall()
+
+
+def summarize(rows):
+    """
+    EXPLAIN-Zeilen → vergleichbarer Plan
+
+    Returns:
+        Liste von Dicts {table, type, key, rows, partitions, flags}
+        (partitions = Anzahl gelesener Partitionen, None = nicht partitioniert)
+    """
+    plan = []
+    for row in rows:
+        extra = row.get('Extra') or ''
+        flags = []
+        if row.get('type') == 'ALL':
+            flags.append('full_scan')
+        if 'Using filesort' in extra:
+            flags.append('filesort')
+        if 'Using temporary' in extra:
+            flags.append('temporary')
+        if row.get('possible_keys') and not row.get('key'):
+            flags.append('unused_index')
+        plan.append({
+            'table': row.get('table'),
+            'type': row.get('type'),
+            'key': row.get('key'),
+            'rows': row.get('rows'),
+            'partitions': len(row['partitions'].split(',')) if row.get('partitions') else None,
+            'flags': flags
+        })
+    return plan
+
+
+def regressions(old_plan, new_plan):
+    """
+    Vergleicht zwei Pläne tabellenweise
+
+    Returns:
+        Liste von Texten (leer = nicht schlechter)
+    """
+    problems = []
+    old_by_table = {step['table']: step for step in old_plan}
+    for step in new_plan:
+        old = old_by_table.get(step['table'])
+        if old is None:
+            continue
+        old_rank = ACCESS_RANK.get(old['type'], 6)
+        new_rank = ACCESS_RANK.get(step['type'], 6)
+        if new_rank > old_rank:
+            problems.append(f"{step['table']}: Zugriff {old['type']} → {step['type']}")
+        if old['key'] and not step['key']:
+            problems.append(f"{step['table']}: Index {old['key']} wird nicht mehr verwendet")
+        if old.get('partitions') and step.get('partitions') and step['partitions'] > old['partitions']:
+            problems.append(f"{step['table']}: {old['partitions']} → {step['partitions']} Partitionen")
+        new_flags = set(step['flags']) - set(old['flags'])
+        if new_flags:
+            problems.append(f"{step['table']}: neu {', '.join(sorted(new_flags))}")
+    return problems
+
+
+def transaction_partition_count(cursor):
+    """Anzahl Partitionen von transactions (0 = nicht partitioniert)"""
+    cursor.execute(
+        "SELECT COUNT(*) AS n FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'transactions' AND PARTITION_NAME IS NOT NULL",
+        (storage.database_name(),)
+    )
+    return cursor.fetchone()['n']
+
+
+def unpruned(plans, total):
+    """
+    Returns:
+        Liste von Texten für PRUNED_CALLERS-Abfragen, die alle Partitionen lesen
+    """
+    problems = []
+    for entry in plans.values():
+        if entry['caller'] not in PRUNED_CALLERS:
+            continue
+        for step in entry['plan']:
+            if step['table'] in ('transactions', 't') and step['partitions'] and step['partitions'] >= total:
+                problems.append(f"{entry['caller']}: liest alle {total} Partitionen")
+    return problems
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="EXPLAIN-Prüfung aller Model-Abfragen")
+    ap.add_argument("--no-seed", action="store_true", help="bestehende Benchmark-DB verwenden")
+    ap.add_argument("--users", default=5, type=int)
+    ap.add_argument("--transactions", default=3000, type=int)
+    ap.add_argument("--categories", default=10, type=int)
+    ap.add_argument("--snapshot", default=SNAPSHOT_PATH)
+    ap.add_argument("--update", action="store_true", help="Snapshot mit aktuellen Plänen überschreiben")
+    ap.add_argument("--verbose", action="store_true", help="alle Pläne ausgeben")
+    args = ap.parse_args()
+
+    if storage.engine() != 'mysql':
+        print("[ERROR] EXPLAIN-Prüfung nur mit DB_ENGINE=mysql (Snapshot enthält MySQL-Pläne)")
+        return 2
+
+    if not args.no_seed:
+        from benchmarks.seed import seed, check_target
+        if not check_target(force=False):
+            return 2
+        seed(args.users, args.transactions, args.categories)
+
+    ctx = BenchContext()
+    statements = collect_statements(ctx)
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    partitions = transaction_partition_count(cursor)
+    plans = {}
+    for key, sample in sorted(statements.items()):
+        if not key.startswith(EXPLAINABLE):
+            continue
+        try:
+            plan = summarize(explain(cursor, sample['sql'], sample['params']))
+        except Exception as e:
+            print(f"[WARN] EXPLAIN fehlgeschlagen ({sample['caller']}): {e}")
+            continue
+        plans[key] = {'caller': sample['caller'], 'plan': plan}
+    cursor.close()
+    conn.close()
+
+    flagged = 0
+    for key, entry in plans.items():
+        flags = sorted({f"{step['table']}:{flag}" for step in entry['plan'] for flag in step['flags']})
+        if flags or args.verbose:
+            flagged += bool(flags)
+            print(f"{entry['caller']}: {', '.join(flags) or 'ok'}")
+            if args.verbose:
+                print(f"    {key[:160]}")
+    print(f"{len(plans)} Abfragen geprüft, {flagged} mit Auffälligkeiten")
+
+    pruning_problems = unpruned(plans, partitions) if partitions > 1 else []
+    if partitions > 1:
+        for problem in pruning_problems:
+            print(f"[KEIN PRUNING] {problem}")
+        print(f"transactions: {partitions} Partitionen, Pruning "
+              f"{'fehlt bei ' + str(len(pruning_problems)) + ' Abfragen' if pruning_problems else 'ok'}")
+
+    if args.update:
+        with open(args.snapshot, 'w') as f:
+            json.dump(plans, f, indent=2, sort_keys=True)
+        print(f"Snapshot geschrieben: {args.snapshot}")
+        return 1 if pruning_problems else 0
+
+    if not os.path.exists(args.snapshot):
+        print(f"[ERROR] Kein Snapshot unter {args.snapshot} (zuerst mit --update erstellen)")
+        return 2
+    with open(args.snapshot) as f:
+        snapshot = json.load(f)
+
+    failed = bool(pruning_problems)
+    for key, entry in plans.items():
+        old = snapshot.get(key)
+        if old is None:
+            print(f"[NEU] {entry['caller']}: {key[:120]}")
+            continue
+        for problem in regressions(old['plan'], entry['plan']):
+            failed = True
+            print(f"[REGRESSION] {entry['caller']}: {problem}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+loadtest.py - HTTP-Lasttest gegen einen lokal laufenden App-Server
+
+    python benchmarks/datagen.py --users 200                # Testdaten + Login-Datei
+    gunicorn app:app --workers 4 --bind 127.0.0.1:5000      # Server
+    python benchmarks/loadtest.py --concurrency 32 --duration 60
+
+Jeder virtuelle User (Thread) meldet sich über /api/login an (eigenes
+Cookie-Jar) und führt dann zufällig gewichtete Schritte aus:
+
+    dashboard      GET  /dashboard?page=1           (HTML, wie im Browser)
+    api_dashboard  GET  /api/dashboard?page=1       (Polling)
+    api_balance    GET  /api/transactions/balance   (Polling)
+    add            POST /api/transactions
+    delete         DELETE /api/transactions/<id>    (nur selbst angelegte)
+
+Ausgabe pro Schritt: Anzahl, Durchsatz (req/s), p50/p95/p99 und Fehlerquote.
+Nur Standardbibliothek, keine externen Dienste.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+DEFAULT_MIX = 'dashboard=30,api_dashboard=20,api_balance=25,add=15,delete=10'
+LOADTEST_DESCRIPTION = 'loadtest'
+
+
+class Recorder:
+    """Sammelt Latenzen + Fehler pro Schritt (thread-sicher)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, step, elapsed, ok):
+        with self._lock:
+            self.latencies.setdefault(step, []).append(elapsed)
+            if not ok:
+                self.errors[step] = self.errors.get(step, 0) + 1
+
+    def report(self, duration):
+        rows = {}
+        for step, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            count = len(values)
+            rows[step] = {
+                'requests': count,
+                'rps': round(count / duration, 2),
+                'p50_ms': round(_percentile(values, 0.50) * 1000, 2),
+                'p95_ms': round(_percentile(values, 0.95) * 1000, 2),
+                'p99_ms': round(_percentile(values, 0.99) * 1000, 2),
+                'error_rate': round(self.errors.get(step, 0) / count, 4)
+            }
+        return rows
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, round(fraction * (len(sorted_values) - 1)))]
+
+
+class VirtualUser:
+    """Eine eingeloggte Session mit eigenem Cookie-Jar"""
+
+    def __init__(self, base_url, account, recorder, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.account = account
+        self.recorder = recorder
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+        self.category_ids = []
+        self.own_ids = []
+
+    def request(self, step, method, path, payload=None, record=True):
+        """
+        Returns:
+            tuple: (ok, geparster JSON-Body oder None)
+        """
+        data, headers = None, {}
+        if payload is not None:
+            data = json.dumps(payload).encode()
+            headers['Content-Type'] = 'application/json'
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+
+        started = time.perf_counter()
+        body, ok = None, False
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                raw = response.read()
+                ok = response.status < 400
+                if 'json' in response.headers.get('Content-Type', ''):
+                    body = json.loads(raw)
+        except urllib.error.HTTPError as e:
+            e.read()
+        except (urllib.error.URLError, OSError, ValueError):
+            pass
+        if record:
+            self.recorder.record(step, time.perf_counter() - started, ok)
+        return ok, body
+
+    def login(self):
+        ok, _ = self.request('login', 'POST', '/api/login', {
+            'username': self.account['username'],
+            'password': self.account['password']
+        })
+        if ok:
+            _, data = self.request('login', 'GET', '/api/dashboard?page=1', record=False)
+            self.category_ids = [c['id'] for c in (data or {}).get('categories', [])]
+        return ok
+
+    # --- Schritte ---------------------------------------------------------
+
+    def dashboard(self):
+        self.request('dashboard', 'GET', '/dashboard?page=1')
+
+    def api_dashboard(self):
+        self.request('api_dashboard', 'GET', '/api/dashboard?page=1')
+
+    def api_balance(self):
+        self.request('api_balance', 'GET', '/api/transactions/balance?page=1&per_page=20')
+
+    def add(self):
+        ok, _ = self.request('add', 'POST', '/api/transactions', {
+            'amount': f"{random.uniform(2, 120):.2f}",
+            'type': 'expense',
+            'category': random.choice(self.category_ids) if self.category_ids else None,
+            'description': LOADTEST_DESCRIPTION,
+            'date': datetime.now().strftime('%Y-%m-%d')
+        })
+        if ok:
+            # Die API liefert keine ID zurück → neueste eigene Buchungen nachschlagen
+            _, data = self.request('add', 'GET', '/api/transactions/balance?page=1&per_page=10',
+                                   record=False)
+            for row in (data or {}).get('transactions', []):
+                if row['description'] == LOADTEST_DESCRIPTION and row['id'] not in self.own_ids:
+                    self.own_ids.append(row['id'])
+
+    def delete(self):
+        if not self.own_ids:
+            return self.add()
+        self.request('delete', 'DELETE', f"/api/transactions/{self.own_ids.pop()}")
+
+    def cleanup(self):
+        for transaction_id in self.own_ids:
+            self.request('cleanup', 'DELETE', f"/api/transactions/{transaction_id}", record=False)
+
+
+def parse_mix(text):
+    steps, weights = [], []
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if not hasattr(VirtualUser, name) or name in ('request', 'login', 'cleanup'):
+            raise ValueError(f"Unbekannter Schritt: {name}")
+        steps.append(name)
+        weights.append(float(weight or 1))
+    return steps, weights
+
+
+def worker(account, args, steps, weights, recorder, deadline):
+    user = VirtualUser(args.base_url, account, recorder, args.timeout)
+    if not user.login():
+        return
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        getattr(user, rng.choices(steps, weights)[0])()
+        if args.think_time:
+            time.sleep(rng.expovariate(1 / args.think_time))
+    user.cleanup()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="HTTP-Lasttest gegen lokalen Server")
+    ap.add_argument("--base-url", default="http://127.0.0.1:5000")
+    ap.add_argument("--users-file", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                         'loadtest_users.json'))
+    ap.add_argument("--concurrency", default=16, type=int, help="gleichzeitige virtuelle User")
+    ap.add_argument("--duration", default=30, type=float, help="Sekunden")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help="Gewichte der Schritte")
+    ap.add_argument("--think-time", default=0.0, type=float, help="mittlere Pause zwischen Schritten (s)")
+    ap.add_argument("--timeout", default=10.0, type=float)
+    ap.add_argument("--output", help="Ergebnis als JSON speichern")
+    args = ap.parse_args()
+
+    try:
+        steps, weights = parse_mix(args.mix)
+        with open(args.users_file) as f:
+            accounts = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        return 2
+    if not accounts:
+        print("[ERROR] Keine User in der Login-Datei (zuerst benchmarks/datagen.py ausführen)")
+        return 2
+
+    recorder = Recorder()
+    # Virtuelle User reihum auf die Accounts verteilen (grosse + kleine Ledger gemischt)
+    random.Random(1).shuffle(accounts)
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=worker, daemon=True,
+                         args=(accounts[index % len(accounts)], args, steps, weights, recorder, deadline))
+        for index in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Aufräumen nach der Deadline zählt nicht zur Messdauer
+    elapsed = min(time.monotonic() - started, args.duration)
+
+    report = recorder.report(elapsed)
+    print(f"{'Schritt':<15} {'Anzahl':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Fehler':>8}")
+    total = errors = 0
+    for step, row in report.items():
+        total += row['requests']
+        errors += round(row['error_rate'] * row['requests'])
+        print(f"{step:<15} {row['requests']:>8} {row['rps']:>8.1f} {row['p50_ms']:>9.1f} "
+              f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['error_rate'] * 100:>7.2f}%")
+    if total:
+        print(f"{'gesamt':<15} {total:>8} {total / elapsed:>8.1f}  ({errors} Fehler, {elapsed:.1f}s)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'duration': elapsed, 'concurrency': args.concurrency,
+                       'mix': args.mix, 'steps': report}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+seed.py - Befüllt eine Benchmark-Datenbank in wählbarer Grösse
+
+    export DB_NAME=budget_tracker_bench
+    python benchmarks/seed.py --users 20 --transactions 5000 --categories 12
+    SQLITE_PATH=/tmp/budget_tracker_bench.db python benchmarks/seed.py --engine sqlite
+
+Achtung: leert ALLE Tabellen der Datenbank (Config.DB_NAME bzw.
+Config.SQLITE_PATH). Deshalb nur erlaubt, wenn der Name "bench" enthält
+(oder mit --force).
+
+Transaktionen werden über Transaction.bulk_create() eingefügt, damit auch
+die abgeleiteten Daten (Fenwick-Baum, Budget-Zähler) stimmen; Checkpoints
+werden am Ende pro User aufgebaut.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from config import Config  # noqa: E402
+from models import storage  # noqa: E402
+from models.storage import get_db_connection  # noqa: E402
+from models.balance_checkpoint import BalanceCheckpoint  # noqa: E402
+from models.transaction import Transaction  # noqa: E402
+from setup_db import create_schema  # noqa: E402
+
+TABLES = ('jobs', 'scheduler_state', 'category_spend', 'balance_fenwick', 'balance_checkpoints',
+          'transactions', 'recurring_transactions', 'categories', 'users')
+COLORS = ('#e74c3c', '#3498db', '#2ecc71', '#f1c40f', '#9b59b6', '#1abc9c', '#e67e22', '#34495e')
+BENCH_PASSWORD = 'bench-password'
+INSERT_CHUNK = 1000
+
+
+def reset_database():
+    """Schema anlegen/aktualisieren und alle Tabellen leeren"""
+    if storage.engine() == 'sqlite':
+        # Schema legt das Backend beim Verbinden an; TRUNCATE gibt es nicht
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        for table in TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+        cursor.execute("DELETE FROM sqlite_sequence")
+        conn.commit()
+        cursor.close()
+        conn.close()
+        return
+
+    conn = mysql.connector.connect(
+        host=Config.DB_HOST, port=Config.DB_PORT,
+        user=Config.DB_USER, password=Config.DB_PASSWORD, autocommit=True
+    )
+    cur = conn.cursor()
+    cur.execute(f"CREATE DATABASE IF NOT EXISTS {Config.DB_NAME} "
+                f"CHARACTER SET utf8mb4 COLLATE utf8mb4_general_ci")
+    cur.execute(f"USE {Config.DB_NAME}")
+    create_schema(cur, Config.DB_NAME)
+    cur.execute("SET FOREIGN_KEY_CHECKS = 0")
+    for table in TABLES:
+        cur.execute(f"TRUNCATE TABLE {table}")
+    cur.execute("SET FOREIGN_KEY_CHECKS = 1")
+    cur.close()
+    conn.close()
+
+
+def username_for(index):
+    return f"bench_user_{index:05d}"
+
+
+def create_users(count):
+    """
+    Legt `count` User an (alle mit Passwort BENCH_PASSWORD)
+
+    Returns:
+        Liste der User-IDs (Reihenfolge = Index im Namen)
+    """
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO users (username, password) VALUES (%s, %s)",
+        [(username_for(index), password_hash) for index in range(count)]
+    )
+    conn.commit()
+    cursor.execute("SELECT id FROM users ORDER BY id")
+    user_ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    conn.close()
+    return user_ids
+
+
+def create_categories(user_ids, names):
+    """
+    Legt für jeden User dieselben Kategorien an
+
+    Returns:
+        Dict {user_id: [category_id, ...]} (Reihenfolge wie `names`)
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO categories (user_id, name, color) VALUES (%s, %s, %s)",
+        [(user_id, name, COLORS[index % len(COLORS)])
+         for user_id in user_ids for index, name in enumerate(names)]
+    )
+    conn.commit()
+    cursor.execute("SELECT user_id, id FROM categories ORDER BY user_id, id")
+    category_ids = {}
+    for user_id, category_id in cursor.fetchall():
+        category_ids.setdefault(user_id, []).append(category_id)
+    cursor.close()
+    conn.close()
+    return category_ids
+
+
+def generate_transactions(rng, count, category_ids, days, end):
+    """
+    Zufällige, aber plausible Buchungen: ~10% Einnahmen (grösser),
+    Ausgaben log-normalverteilt, 10% ohne Kategorie
+    """
+    rows = []
+    for _ in range(count):
+        is_income = rng.random() < 0.1
+        amount = rng.lognormvariate(7.5, 0.4) if is_income else rng.lognormvariate(3.3, 0.9)
+        rows.append({
+            'amount': Decimal(f"{min(amount, 99999):.2f}"),
+            'type': 'income' if is_income else 'expense',
+            'description': f"bench {'income' if is_income else 'expense'}",
+            'date': end - timedelta(days=rng.randrange(days), minutes=rng.randrange(24 * 60)),
+            'category_id': None if rng.random() < 0.1 else rng.choice(category_ids),
+            'recurring_id': None,
+            'occurrence': None
+        })
+    return rows
+
+
+def insert_user_ledger(user_id, rows):
+    """Transaktionen eines Users in Blöcken einfügen"""
+    for start in range(0, len(rows), INSERT_CHUNK):
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            Transaction.bulk_create(cursor, user_id, rows[start:start + INSERT_CHUNK])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+
+def seed(users, transactions, categories, days=730, seed_value=42, ledger_sizes=None):
+    """
+    Legt users × categories Kategorien und users × transactions Buchungen an
+
+    Args:
+        ledger_sizes: optional Liste mit Anzahl Transaktionen pro User
+                      (überschreibt `transactions`, z.B. für ungleich grosse User)
+
+    Returns:
+        Dict mit user_ids, category_ids (pro User), Anzahl Transaktionen
+    """
+    rng = random.Random(seed_value)
+    end = datetime.now().replace(microsecond=0)
+
+    reset_database()
+    user_ids = create_users(users)
+    category_ids = create_categories(user_ids, [f"Kategorie {index:02d}" for index in range(categories)])
+
+    sizes = ledger_sizes or [transactions] * users
+    total = 0
+    for user_id, size in zip(user_ids, sizes):
+        rows = generate_transactions(rng, size, category_ids.get(user_id) or [None], days, end)
+        insert_user_ledger(user_id, rows)
+        BalanceCheckpoint.rebuild(user_id)
+        total += size
+
+    return {'user_ids': user_ids, 'category_ids': category_ids, 'transactions': total}
+
+
+def check_target(force):
+    if 'bench' not in storage.database_name() and not force:
+        setting = 'SQLITE_PATH' if storage.engine() == 'sqlite' else 'DB_NAME'
+        print(f"[ERROR] {setting}={storage.database_name()} sieht nicht nach Benchmark-DB aus "
+              f"(alle Tabellen werden geleert). Namen mit 'bench' setzen oder --force.")
+        return False
+    return True
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark-Datenbank befüllen")
+    ap.add_argument("--users", default=10, type=int)
+    ap.add_argument("--transactions", default=2000, type=int, help="Transaktionen pro User")
+    ap.add_argument("--categories", default=10, type=int, help="Kategorien pro User")
+    ap.add_argument("--days", default=730, type=int, help="Zeitraum der Buchungen in Tagen")
+    ap.add_argument("--seed", default=42, type=int)
+    ap.add_argument("--engine", choices=('mysql', 'sqlite'), default=Config.DB_ENGINE)
+    ap.add_argument("--force", action="store_true", help="auch DBs ohne 'bench' im Namen leeren")
+    args = ap.parse_args()
+
+    storage.use_engine(args.engine)
+    if not check_target(args.force):
+        return 2
+
+    started = time.perf_counter()
+    result = seed(args.users, args.transactions, args.categories, args.days, args.seed)
+    print(f"{len(result['user_ids'])} User, {result['transactions']} Transaktionen "
+          f"in {time.perf_counter() - started:.1f}s angelegt ({args.engine}: {storage.database_name()})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,11 +12,80 @@ class Config:
     SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
     PERMANENT_SESSION_LIFETIME = 3600  # 1 hour
     
+    # Storage-Engine (siehe models/storage): 'mysql' oder 'sqlite' (eine Datei, kein DB-Server)
+    DB_ENGINE = os.environ.get('DB_ENGINE', 'mysql')
+    SQLITE_PATH = os.environ.get('SQLITE_PATH', 'budget_tracker.db')
+    SQLITE_CACHE_MB = int(os.environ.get('SQLITE_CACHE_MB', 64))   # Page-Cache pro Verbindung
+    SQLITE_MMAP_MB = int(os.environ.get('SQLITE_MMAP_MB', 256))    # 0 = kein Memory-Mapping
+    
     # Database configuration
-    DB_HOST = 'localhost'
-    DB_USER = 'root'
-    DB_PASSWORD = 'your_password'
-    DB_NAME = 'budget_tracker'
+    DB_HOST = os.environ.get('DB_HOST', 'localhost')
+    DB_PORT = int(os.environ.get('DB_PORT', 3306))
+    DB_USER = os.environ.get('DB_USER', 'root')
+    DB_PASSWORD = os.environ.get('DB_PASSWORD', 'Root1234!')
+    DB_NAME = os.environ.get('DB_NAME', 'budget_tracker')
+    
+    # Read-Replicas: "host:port,host:port" (gleicher User/DB wie Primary)
+    # Leer = alles auf den Primary
+    DB_REPLICAS = [
+        entry.strip() for entry in os.environ.get('DB_REPLICAS', '').split(',') if entry.strip()
+    ]
+    # Nach einem Schreibvorgang liest die Session so lange vom Primary (Read-your-writes)
+    READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+    
+    # Connection pool (pro Prozess und DB-Host, max. 32 beim mysql-connector)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))  # Sekunden warten auf freie Verbindung
+    
+    # Server-side Prepared Statements für feste, häufige Abfragen (siehe models/storage/mysql_backend.py)
+    DB_PREPARED_STATEMENTS = os.environ.get('DB_PREPARED_STATEMENTS', '1') == '1'
+    
+    # Parallele DB-Abfragen (z.B. Dashboard)
+    FANOUT_WORKERS = int(os.environ.get('FANOUT_WORKERS', 8))
+    DASHBOARD_DEADLINE = float(os.environ.get('DASHBOARD_DEADLINE', 2.0))  # Sekunden
+    
+    # SQL-Statistik pro Request (Debug: X-SQL-* Header, sonst JSON-Logzeile)
+    SQL_STATS_ENABLED = os.environ.get('SQL_STATS_ENABLED', '1') == '1'
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', 5))  # gleiche Abfrage so oft → Verdacht
+    
+    # /metrics (Prometheus): bei mehreren Gunicorn-Workern gemeinsames Verzeichnis setzen
+    METRICS_DIR = os.environ.get('METRICS_DIR', '')
+    METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 5))
+    METRICS_DB_QUERIES = os.environ.get('METRICS_DB_QUERIES', '1') == '1'  # SQL-Histogramm, unabhängig von SQL_STATS_ENABLED
+    
+    # Profiling von Live-Requests (siehe utils/profiler.py), standardmässig aus
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # 0.01 = 1% der Requests
+    PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')                    # Header X-Profile-Token
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/budget-tracker-profiles')
+    PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 50))
+    PROFILE_TRACEMALLOC_FRAMES = int(os.environ.get('PROFILE_TRACEMALLOC_FRAMES', 10))
+    
+    # Slow-Query-Log (siehe utils/slow_queries.py), 0 = aus
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+    SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', '')  # Datei (leer = stderr)
+    # Token für interne Auswertungen (Header X-Ops-Token), leer = Endpunkte aus
+    OPS_TOKEN = os.environ.get('OPS_TOKEN', '')
+    
+    # Kategorien pro User im Prozess cachen (siehe models/category.py), 0 = aus
+    CATEGORY_CACHE_SECONDS = float(os.environ.get('CATEGORY_CACHE_SECONDS', 60))  # max. Verzögerung zwischen Prozessen
+    CATEGORY_CACHE_USERS = int(os.environ.get('CATEGORY_CACHE_USERS', 10000))    # Einträge pro Prozess und Cache
+    # Kompilierte Kategorisierungs-Regeln pro User (siehe services/rule_service.py), 0 = aus
+    RULE_CACHE_SECONDS = float(os.environ.get('RULE_CACHE_SECONDS', 60))
+    RULE_REAPPLY_BATCH_SIZE = int(os.environ.get('RULE_REAPPLY_BATCH_SIZE', 1000))  # Job 'reapply_rules': Zeilen pro DB-Transaktion
+    # Kategorie löschen/zusammenführen: Transaktionen blockweise umhängen (siehe services/category_service.py)
+    CATEGORY_MOVE_BATCH_SIZE = int(os.environ.get('CATEGORY_MOVE_BATCH_SIZE', 1000))  # Zeilen pro DB-Transaktion
+    # Statistik pro User (siehe services/analytics_service.py); gültig bis zur nächsten Änderung,
+    # die Laufzeit begrenzt nur den Speicher für inaktive User
+    ANALYTICS_CACHE_SECONDS = float(os.environ.get('ANALYTICS_CACHE_SECONDS', 3600))
+    ANALYTICS_CACHE_USERS = int(os.environ.get('ANALYTICS_CACHE_USERS', 1000))
+    # Saldo-Prognose bis Monatsende (siehe services/forecast_service.py), Cache wie Statistik
+    FORECAST_LOOKBACK_DAYS = int(os.environ.get('FORECAST_LOOKBACK_DAYS', 90))      # Ausgaben-Tempo aus diesen Tagen
+    FORECAST_HALF_LIFE_DAYS = float(os.environ.get('FORECAST_HALF_LIFE_DAYS', 14))  # Gewicht halbiert sich alle N Tage
+    FORECAST_NIGHTLY = os.environ.get('FORECAST_NIGHTLY', '1') == '1'              # Scheduler rechnet täglich vor
+    
+    # Archivierung alter Transaktionen (siehe models/archive.py), 0 = aus
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 0))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 1000))  # Zeilen pro DB-Transaktion
 
 class DevelopmentConfig(Config):
     """Development configuration"""
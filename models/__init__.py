@@ -1,6 +1,17 @@
 """Models Package"""
 from models.user import User
 from models.category import Category
+from models.category_rule import CategoryRule
 from models.transaction import Transaction
+from models.balance_checkpoint import BalanceCheckpoint
+from models.balance_index import BalanceIndex
+from models.budget import Budget
+from models.recurring import RecurringTransaction, SchedulerState
+from models.job import Job
+from models.archive import TransactionArchive
+from models.ledger_version import LedgerVersion
+from models.forecast import BalanceForecast
 
-__all__ = ['User', 'Category', 'Transaction']
\ No newline at end of file
+__all__ = ['User', 'Category', 'CategoryRule', 'Transaction', 'BalanceCheckpoint', 'BalanceIndex', 'Budget',
+           'RecurringTransaction', 'SchedulerState', 'Job', 'TransactionArchive', 'LedgerVersion',
+           'BalanceForecast']
\ No newline at end of file
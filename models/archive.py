@@ -0,0 +1,207 @@
+"""
+TransactionArchive Model - Alte Transaktionen ausserhalb der Haupttabelle
+
+DB-Struktur:
+- transactions_archive: Spalten wie transactions (gleiche IDs) + archived_at
+- archive_totals:
+    - user_id INT
+    - category_id INT       (0 = ohne Kategorie)
+    - type ENUM('income','expense')
+    - total DECIMAL(14,2)   (Summe aller archivierten Beträge)
+    - tx_count INT
+    - PRIMARY KEY (user_id, category_id, type)
+
+Transaktionen älter als Config.ARCHIVE_AFTER_DAYS werden blockweise
+(Config.ARCHIVE_BATCH_SIZE Zeilen pro DB-Transaktion) verschoben. Jeder Block
+erhöht die Summen in archive_totals in derselben DB-Transaktion → Zusammenfassung
+und Kategorie-Chart bleiben über die ganze Historie korrekt, scannen aber nur
+noch die aktuellen Transaktionen + wenige Summenzeilen.
+
+Salden: Checkpoints bis zum jüngsten archivierten Datum werden gelöscht,
+der Saldo vor der ältesten aktuellen Transaktion ist opening_balance().
+Der Fenwick-Baum und die Budget-Zähler bleiben unverändert (enthalten die
+archivierten Beträge weiterhin).
+"""
+from collections import defaultdict
+from datetime import datetime
+from models.storage import get_db_connection
+from models.ledger_version import LedgerVersion
+from utils.money import Money, ZERO
+
+ARCHIVE_COLUMNS = "id, user_id, amount, type, description, date, category_id, recurring_id, occurrence"
+
+UPSERT_TOTALS = """
+    INSERT INTO archive_totals (user_id, category_id, type, total, tx_count)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE total = total + VALUES(total), tx_count = tx_count + VALUES(tx_count)
+"""
+
+
+class TransactionArchive:
+    """Archivierte Transaktionen + Summen pro Kategorie"""
+
+    @staticmethod
+    def users_with_transactions_before(cutoff):
+        """
+        User mit Transaktionen vor `cutoff` (je ein Index-Lookup pro User)
+
+        Returns:
+            Liste von User-IDs
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT u.id FROM users u
+                WHERE EXISTS (SELECT 1 FROM transactions t WHERE t.user_id = u.id AND t.date < %s)
+                ORDER BY u.id
+                """,
+                (cutoff,)
+            )
+            user_ids = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+            conn.close()
+            return user_ids
+        except Exception as e:
+            print(f"Error getting users to archive: {e}")
+            return []
+
+    @staticmethod
+    def archive_batch(user_id, cutoff, batch_size=1000):
+        """
+        Verschiebt die ältesten Transaktionen vor `cutoff` (max. batch_size)
+
+        Eine DB-Transaktion: Zeilen sperren, ins Archiv kopieren, Summen
+        erhöhen, löschen, überholte Checkpoints entfernen.
+
+        Args:
+            user_id: User-ID
+            cutoff: datetime, ältere Transaktionen werden archiviert
+            batch_size: Zeilen pro Block
+
+        Returns:
+            Anzahl verschobener Zeilen (0 = nichts mehr zu tun oder Fehler)
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            cursor.execute(
+                f"""
+                SELECT {ARCHIVE_COLUMNS} FROM transactions
+                WHERE user_id = %s AND date < %s
+                ORDER BY date, id
+                LIMIT %s
+                FOR UPDATE
+                """,
+                (user_id, cutoff, batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                cursor.close()
+                conn.close()
+                return 0
+
+            cursor.executemany(
+                f"INSERT INTO transactions_archive ({ARCHIVE_COLUMNS}, archived_at) "
+                f"VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                [
+                    (row['id'], row['user_id'], row['amount'], row['type'], row['description'], row['date'],
+                     row['category_id'], row['recurring_id'], row['occurrence'], datetime.now())
+                    for row in rows
+                ]
+            )
+
+            totals = defaultdict(lambda: [0, 0])  # [Rappen, Anzahl]
+            for row in rows:
+                item = totals[(row['category_id'] or 0, row['type'])]
+                item[0] += Money.of(row['amount']).cents
+                item[1] += 1
+            cursor.executemany(UPSERT_TOTALS, [
+                (user_id, category_id, tx_type, Money(cents).to_decimal(), count)
+                for (category_id, tx_type), (cents, count) in totals.items()
+            ])
+
+            last_date = rows[-1]['date']
+            placeholders = ', '.join(['%s'] * len(rows))
+            cursor.execute(
+                f"DELETE FROM transactions WHERE user_id = %s AND date <= %s AND id IN ({placeholders})",
+                (user_id, last_date, *[row['id'] for row in rows])
+            )
+            # Checkpoints davor zählen archivierte Zeilen mit → ab opening_balance() neu aufbauen
+            cursor.execute(
+                "DELETE FROM balance_checkpoints WHERE user_id = %s AND date <= %s",
+                (user_id, last_date)
+            )
+            LedgerVersion.bump(cursor, user_id)
+            conn.commit()
+
+            cursor.close()
+            conn.close()
+            return len(rows)
+        except Exception as e:
+            print(f"Error archiving transactions: {e}")
+            return 0
+
+    @staticmethod
+    def opening_balance(user_id, conn=None):
+        """
+        Saldo aller archivierten Transaktionen (= Saldo vor der ältesten aktuellen)
+
+        Args:
+            user_id: User-ID
+            conn: offene Verbindung (optional, sonst eigene)
+
+        Returns:
+            Money
+        """
+        own = conn is None
+        try:
+            if own:
+                conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT COALESCE(SUM(CASE WHEN type = 'income' THEN total ELSE -total END), 0) "
+                "FROM archive_totals WHERE user_id = %s",
+                (user_id,)
+            )
+            balance = cursor.fetchone()[0]
+            cursor.close()
+            if own:
+                conn.close()
+            return Money.of(balance)
+        except Exception as e:
+            print(f"Error getting archived balance: {e}")
+            return ZERO
+
+    @staticmethod
+    def reassign_category(cursor, user_id, category_id, new_category_id=None):
+        """
+        Archivierte Zeilen + Summen einer Kategorie einer anderen zuordnen
+
+        Läuft auf dem Cursor des Aufrufers (gleiche DB-Transaktion).
+        Erwartet einen normalen (Tupel-)Cursor.
+
+        Args:
+            category_id: bisherige Kategorie
+            new_category_id: neue Kategorie (None = ohne Kategorie)
+        """
+        cursor.execute(
+            "UPDATE transactions_archive SET category_id = %s WHERE user_id = %s AND category_id = %s",
+            (new_category_id, user_id, category_id)
+        )
+        cursor.execute(
+            "SELECT type, total, tx_count FROM archive_totals WHERE user_id = %s AND category_id = %s",
+            (user_id, category_id)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        cursor.execute(
+            "DELETE FROM archive_totals WHERE user_id = %s AND category_id = %s",
+            (user_id, category_id)
+        )
+        cursor.executemany(UPSERT_TOTALS, [
+            (user_id, new_category_id or 0, tx_type, total, count) for tx_type, total, count in rows
+        ])
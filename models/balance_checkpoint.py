@@ -0,0 +1,223 @@
+"""
+BalanceCheckpoint Model - Gespeicherte Zwischensalden pro User
+
+DB-Struktur:
+- user_id INT
+- date DATETIME   (Datum der Transaktion, bei der der Checkpoint liegt)
+- tx_id INT       (ID dieser Transaktion)
+- balance DECIMAL(14,2)  (Saldo NACH dieser Transaktion)
+- PRIMARY KEY (user_id, date, tx_id)
+
+Reihenfolge aller Transaktionen eines Users: (date, id) aufsteigend.
+Alle CHECKPOINT_INTERVAL Transaktionen wird ein Checkpoint gespeichert.
+Ein Saldo an beliebiger Stelle kostet damit:
+    1 Lookup (letzter Checkpoint davor) + Scan von max. CHECKPOINT_INTERVAL Zeilen
+
+Schreibt jemand eine Transaktion (auch rückdatiert), werden alle Checkpoints
+ab diesem Datum gelöscht und beim nächsten Lesen wieder aufgebaut.
+refresh() liest ohne Sperren und speichert nur, wenn sich der Datenstand
+(LedgerVersion) seit dem Lesen nicht geändert hat - sonst könnte ein
+gleichzeitiger Schreiber seine Checkpoints löschen, bevor refresh() die aus
+dem alten Stand berechneten einfügt.
+
+Archivierte Transaktionen (models/archive.py) liegen vor allen Checkpoints;
+ihr Saldo ist der Startwert, wenn kein Checkpoint davor existiert.
+"""
+from datetime import datetime, date as date_type
+from models.storage import get_db_connection
+from models.archive import TransactionArchive
+from models.ledger_version import LedgerVersion
+from utils.money import Money, ZERO
+
+# Alle N Transaktionen ein Checkpoint
+CHECKPOINT_INTERVAL = 500
+
+
+def _as_datetime(value):
+    """date → datetime (00:00), datetime bleibt unverändert"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date_type):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+class BalanceCheckpoint:
+    """Checkpoints für laufende Salden"""
+
+    @staticmethod
+    def invalidate_from(cursor, user_id, date):
+        """
+        Löscht alle Checkpoints ab Datum (inkl.)
+
+        Läuft auf dem Cursor des Aufrufers, damit das Löschen in derselben
+        DB-Transaktion passiert wie die eigentliche Änderung.
+
+        Args:
+            cursor: offener Cursor
+            user_id: User-ID
+            date: date oder datetime
+        """
+        query = "DELETE FROM balance_checkpoints WHERE user_id = %s AND date >= %s"
+        cursor.execute(query, (user_id, _as_datetime(date)))
+
+    @staticmethod
+    def refresh(user_id):
+        """
+        Baut fehlende Checkpoints ab dem letzten gültigen Checkpoint auf
+
+        Scannt nur die Transaktionen NACH dem letzten Checkpoint und berechnet
+        Salden + Zeilennummern per Window-Function direkt in MySQL.
+
+        Gespeichert wird nur, wenn die LedgerVersion beim Einfügen (gesperrt
+        gelesen) noch dieselbe ist wie vor dem Lesen. Sonst wird verworfen;
+        der nächste Aufruf rechnet mit dem neuen Stand.
+
+        Returns:
+            Anzahl neu gespeicherter Checkpoints
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            # Vor dem Ledger lesen → jede spätere Änderung ist am Ende sichtbar
+            version = LedgerVersion.current(cursor, user_id)
+
+            cursor.execute(
+                """
+                SELECT date, tx_id, balance FROM balance_checkpoints
+                WHERE user_id = %s
+                ORDER BY date DESC, tx_id DESC
+                LIMIT 1
+                """,
+                (user_id,)
+            )
+            last = cursor.fetchone()
+
+            if last:
+                start_balance = last['balance']
+                # t.date >= %s ist redundant, erlaubt aber Partition Pruning
+                where = "t.user_id = %s AND t.date >= %s AND (t.date > %s OR (t.date = %s AND t.id > %s))"
+                params = (start_balance, user_id, last['date'], last['date'], last['date'], last['tx_id'])
+            else:
+                start_balance = TransactionArchive.opening_balance(user_id, conn).to_decimal()
+                where = "t.user_id = %s"
+                params = (start_balance, user_id)
+
+            query = f"""
+                SELECT x.date, x.id, x.balance FROM (
+                    SELECT
+                        t.date,
+                        t.id,
+                        %s + SUM(CASE WHEN t.type = 'income' THEN t.amount ELSE -t.amount END)
+                            OVER (ORDER BY t.date, t.id) AS balance,
+                        ROW_NUMBER() OVER (ORDER BY t.date, t.id) AS rn
+                    FROM transactions t
+                    WHERE {where}
+                ) x
+                WHERE MOD(x.rn, {CHECKPOINT_INTERVAL}) = 0
+            """
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+            if rows:
+                cursor.executemany(
+                    "INSERT IGNORE INTO balance_checkpoints (user_id, date, tx_id, balance) "
+                    "VALUES (%s, %s, %s, %s)",
+                    [(user_id, r['date'], r['id'], r['balance']) for r in rows]
+                )
+                # Nach dem Einfügen sperren: ein Schreiber, der seine Checkpoints
+                # schon gelöscht hat, hält die Lücke gesperrt → wir warten auf
+                # seinen Commit und sehen dann seine neue Version
+                if LedgerVersion.current(cursor, user_id, for_update=True) == version:
+                    conn.commit()
+                else:
+                    conn.rollback()
+                    rows = []
+
+            cursor.close()
+            conn.close()
+            return len(rows)
+        except Exception as e:
+            print(f"Error refreshing balance checkpoints: {e}")
+            return 0
+
+    @staticmethod
+    def rebuild(user_id):
+        """
+        Löscht alle Checkpoints eines Users und baut sie neu auf
+
+        Returns:
+            Anzahl gespeicherter Checkpoints
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM balance_checkpoints WHERE user_id = %s", (user_id,))
+            conn.commit()
+            cursor.close()
+            conn.close()
+        except Exception as e:
+            print(f"Error resetting balance checkpoints: {e}")
+            return 0
+        return BalanceCheckpoint.refresh(user_id)
+
+    @staticmethod
+    def balance_before(user_id, date, tx_id=None):
+        """
+        Saldo VOR der Position (date, tx_id)
+
+        Ohne tx_id: Saldo vor dem Zeitpunkt `date` (alle Transaktionen mit
+        t.date < date).
+
+        Kosten: Checkpoint-Lookup + Scan bis zur Position
+        (max. CHECKPOINT_INTERVAL Zeilen, wenn Checkpoints aktuell sind).
+
+        Returns:
+            Money
+        """
+        date = _as_datetime(date)
+        if tx_id is None:
+            tx_id = 0  # (date, 0) liegt vor jeder echten Transaktion an diesem Zeitpunkt
+
+        BalanceCheckpoint.refresh(user_id)
+
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            cursor.execute(
+                """
+                SELECT date, tx_id, balance FROM balance_checkpoints
+                WHERE user_id = %s AND (date < %s OR (date = %s AND tx_id < %s))
+                ORDER BY date DESC, tx_id DESC
+                LIMIT 1
+                """,
+                (user_id, date, date, tx_id)
+            )
+            checkpoint = cursor.fetchone()
+
+            query = """
+                SELECT COALESCE(SUM(CASE WHEN type = 'income' THEN amount ELSE -amount END), 0) AS delta
+                FROM transactions
+                WHERE user_id = %s AND date <= %s
+                  AND (date < %s OR (date = %s AND id < %s))
+            """
+            # Einfache Datumsgrenzen zusätzlich zu den (date, id)-Bedingungen →
+            # MySQL liest nur die Partitionen zwischen Checkpoint und `date`
+            params = [user_id, date, date, date, tx_id]
+            if checkpoint:
+                query += " AND date >= %s AND (date > %s OR (date = %s AND id > %s))"
+                params.extend([checkpoint['date'], checkpoint['date'], checkpoint['date'], checkpoint['tx_id']])
+
+            cursor.execute(query, tuple(params))
+            delta = cursor.fetchone()['delta']
+            # Vor conn.close(): eine Pool-Verbindung ist danach nicht mehr nutzbar
+            base = Money.of(checkpoint['balance']) if checkpoint else TransactionArchive.opening_balance(user_id, conn)
+
+            cursor.close()
+            conn.close()
+            return base + Money.of(delta)
+        except Exception as e:
+            print(f"Error getting balance: {e}")
+            return ZERO
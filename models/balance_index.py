@@ -0,0 +1,209 @@
+"""
+BalanceIndex Model - Fenwick-Baum (Binary Indexed Tree) für Salden pro Tag
+
+DB-Struktur:
+- user_id INT
+- node INT        (Knoten-Index im Fenwick-Baum, 1..TREE_SIZE)
+- value DECIMAL(14,2)
+- PRIMARY KEY (user_id, node)
+
+Jeder Tag bekommt einen Index (Tage seit EPOCH + 1). Der Baum speichert
+Teilsummen so, dass
+- eine Transaktion max. log2(TREE_SIZE) = 16 Knoten ändert und
+- ein Saldo "bis Tag X" max. 16 Knoten liest.
+
+Also O(log n) statt SUM() über alle Transaktionen bis X.
+Fehlende Knoten zählen als 0 → nur "benutzte" Knoten liegen in der Tabelle.
+Gerechnet wird in ganzen Rappen (int), Ergebnisse sind Money.
+"""
+from collections import defaultdict
+from datetime import date as date_type, datetime
+from models.storage import get_db_connection
+from utils.money import Money, ZERO
+
+EPOCH = date_type(1970, 1, 1)
+TREE_SIZE = 1 << 16  # 65536 Tage ≈ 179 Jahre ab EPOCH
+
+
+def _to_date(value):
+    """datetime/date/'YYYY-MM-DD' → date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_type):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+def day_index(value):
+    """Datum → Index im Baum (1-basiert, auf gültigen Bereich begrenzt)"""
+    index = (_to_date(value) - EPOCH).days + 1
+    return max(1, min(index, TREE_SIZE))
+
+
+def _update_nodes(index):
+    """Knoten, die bei Änderung an `index` angepasst werden müssen"""
+    while index <= TREE_SIZE:
+        yield index
+        index += index & -index
+
+
+def _prefix_nodes(index):
+    """Knoten, deren Summe den Präfix 1..index ergibt"""
+    while index > 0:
+        yield index
+        index -= index & -index
+
+
+def signed_amount(row):
+    """Betrag mit Vorzeichen (Einnahme +, Ausgabe -) in Rappen (int)"""
+    cents = Money.of(row['amount']).cents
+    return cents if row['type'] == 'income' else -cents
+
+
+class BalanceIndex:
+    """Fenwick-Baum für Saldo-Abfragen nach Datum"""
+
+    @staticmethod
+    def apply(cursor, user_id, day_deltas):
+        """
+        Wendet Tages-Änderungen auf den Baum an
+
+        Läuft auf dem Cursor des Aufrufers (gleiche DB-Transaktion).
+
+        Args:
+            cursor: offener Cursor
+            user_id: User-ID
+            day_deltas: Dict {date: int} - Netto-Änderung pro Tag in Rappen
+        """
+        node_deltas = defaultdict(int)
+        for day, delta in day_deltas.items():
+            if not delta:
+                continue
+            for node in _update_nodes(day_index(day)):
+                node_deltas[node] += delta
+
+        rows = [(user_id, node, Money(delta).to_decimal()) for node, delta in node_deltas.items() if delta]
+        if rows:
+            cursor.executemany(
+                "INSERT INTO balance_fenwick (user_id, node, value) VALUES (%s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE value = value + VALUES(value)",
+                rows
+            )
+
+    @staticmethod
+    def _prefix_sums(user_id, indexes):
+        """
+        Liest alle benötigten Knoten mit EINER Abfrage
+
+        Returns:
+            Dict {index: Präfixsumme 1..index als Money}
+        """
+        wanted = {index: list(_prefix_nodes(index)) for index in indexes}
+        nodes = sorted({node for node_list in wanted.values() for node in node_list})
+        if not nodes:
+            return {index: ZERO for index in indexes}
+
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        placeholders = ', '.join(['%s'] * len(nodes))
+        query = f"SELECT node, value FROM balance_fenwick WHERE user_id = %s AND node IN ({placeholders})"
+        cursor.execute(query, (user_id, *nodes))
+        values = {node: Money.of(value).cents for node, value in cursor.fetchall()}
+
+        cursor.close()
+        conn.close()
+
+        return {
+            index: Money(sum(values.get(node, 0) for node in node_list))
+            for index, node_list in wanted.items()
+        }
+
+    @staticmethod
+    def balance_as_of(user_id, day):
+        """
+        Saldo am Ende des Tages `day` (alle Transaktionen bis inkl. day)
+
+        Returns:
+            Money
+        """
+        try:
+            index = day_index(day)
+            return BalanceIndex._prefix_sums(user_id, [index])[index]
+        except Exception as e:
+            print(f"Error getting balance as of date: {e}")
+            return ZERO
+
+    @staticmethod
+    def balances_as_of(user_id, days):
+        """
+        Saldo am Ende mehrerer Tage (alle Knoten mit EINER Abfrage)
+
+        Returns:
+            Liste von Money (gleiche Reihenfolge wie days) oder None bei Fehler
+        """
+        try:
+            indexes = [day_index(day) for day in days]
+            sums = BalanceIndex._prefix_sums(user_id, indexes)
+            return [sums[index] for index in indexes]
+        except Exception as e:
+            print(f"Error getting balances as of dates: {e}")
+            return None
+
+    @staticmethod
+    def balance_between(user_id, start, end):
+        """
+        Netto-Veränderung zwischen zwei Tagen (beide inklusive)
+
+        Returns:
+            Money
+        """
+        try:
+            start_index = day_index(start) - 1
+            end_index = day_index(end)
+            if end_index <= start_index:
+                return ZERO
+            sums = BalanceIndex._prefix_sums(user_id, [start_index, end_index])
+            return sums[end_index] - sums[start_index]
+        except Exception as e:
+            print(f"Error getting balance between dates: {e}")
+            return ZERO
+
+    @staticmethod
+    def rebuild(user_id):
+        """
+        Baut den Baum eines Users komplett neu auf (z.B. für Bestandsdaten)
+
+        Returns:
+            True bei Erfolg, False bei Fehler
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            # inkl. archivierter Transaktionen (Baum enthält die ganze Historie)
+            cursor.execute(
+                """
+                SELECT DATE(date) AS day,
+                       SUM(CASE WHEN type = 'income' THEN amount ELSE -amount END) AS net
+                FROM (
+                    SELECT date, type, amount FROM transactions WHERE user_id = %s
+                    UNION ALL
+                    SELECT date, type, amount FROM transactions_archive WHERE user_id = %s
+                ) t
+                GROUP BY DATE(date)
+                """,
+                (user_id, user_id)
+            )
+            day_deltas = {day: Money.of(net).cents for day, net in cursor.fetchall()}
+
+            cursor.execute("DELETE FROM balance_fenwick WHERE user_id = %s", (user_id,))
+            BalanceIndex.apply(cursor, user_id, day_deltas)
+            conn.commit()
+
+            cursor.close()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error rebuilding balance index: {e}")
+            return False
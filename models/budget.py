@@ -0,0 +1,188 @@
+"""
+Budget Model - Monatsbudgets pro Kategorie mit Ausgaben-Zählern
+
+DB-Struktur:
+- categories.monthly_budget DECIMAL(12,2) NULL  (NULL = kein Budget)
+- category_spend:
+    - user_id INT
+    - category_id INT
+    - month DATE            (immer der 1. des Monats)
+    - spent DECIMAL(14,2)   (Summe aller Ausgaben in diesem Monat)
+    - PRIMARY KEY (user_id, category_id, month)
+
+Die Zähler werden bei jedem Schreibvorgang einer Ausgabe in derselben
+DB-Transaktion angepasst (INSERT ... ON DUPLICATE KEY UPDATE spent = spent + x).
+Budget-Status = Lookup über Primärschlüssel statt SUM() über alle Ausgaben.
+Beträge im Status sind Money (ganze Rappen).
+"""
+from collections import defaultdict
+from datetime import datetime
+from models.storage import get_db_connection
+from models.balance_index import _to_date
+from utils.money import Money, ZERO
+
+
+def month_start(value):
+    """Datum → erster Tag des Monats"""
+    return _to_date(value).replace(day=1)
+
+
+def _status_from_row(row):
+    """DB-Zeile → Budget-Status-Dict"""
+    budget = Money.of(row['monthly_budget']) if row['monthly_budget'] is not None else None
+    spent = Money.of(row['spent']) if row['spent'] is not None else ZERO
+    return {
+        'category_id': row['id'],
+        'category_name': row['name'],
+        'budget': budget,
+        'spent': spent,
+        'remaining': budget - spent if budget is not None else None,
+        'over_budget': budget is not None and spent > budget
+    }
+
+
+class Budget:
+    """Budget-Zähler pro (User, Kategorie, Monat)"""
+
+    @staticmethod
+    def apply(cursor, user_id, deltas):
+        """
+        Passt Ausgaben-Zähler an
+
+        Läuft auf dem Cursor des Aufrufers (gleiche DB-Transaktion).
+
+        Args:
+            cursor: offener Cursor
+            user_id: User-ID
+            deltas: Dict {(category_id, month): int} - Rappen
+        """
+        rows = [
+            (user_id, category_id, month, Money(delta).to_decimal())
+            for (category_id, month), delta in deltas.items()
+            if category_id is not None and delta
+        ]
+        if rows:
+            cursor.executemany(
+                "INSERT INTO category_spend (user_id, category_id, month, spent) VALUES (%s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE spent = spent + VALUES(spent)",
+                rows
+            )
+
+    @staticmethod
+    def deltas_for(removed=(), added=()):
+        """
+        Berechnet Zähler-Änderungen aus alten/neuen Transaktionszeilen
+
+        Nur Ausgaben mit Kategorie zählen.
+
+        Returns:
+            Dict {(category_id, month): int} - Rappen
+        """
+        deltas = defaultdict(int)
+        for sign, rows in ((-1, removed), (1, added)):
+            for row in rows:
+                if row['type'] != 'expense' or not row.get('category_id'):
+                    continue
+                key = (int(row['category_id']), month_start(row['date']))
+                deltas[key] += sign * Money.of(row['amount']).cents
+        return deltas
+
+    @staticmethod
+    def get_status(user_id, category_id, month=None):
+        """
+        Budget-Status einer Kategorie für einen Monat (Key-Lookup)
+
+        Returns:
+            Dict mit budget, spent, remaining, over_budget oder None
+        """
+        month = month_start(month or datetime.now())
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            query = """
+                SELECT c.id, c.name, c.monthly_budget, s.spent
+                FROM categories c
+                LEFT JOIN category_spend s
+                    ON s.user_id = c.user_id AND s.category_id = c.id AND s.month = %s
+                WHERE c.id = %s AND c.user_id = %s
+            """
+            cursor.execute(query, (month, category_id, user_id))
+            row = cursor.fetchone()
+
+            cursor.close()
+            conn.close()
+
+            return _status_from_row(row) if row else None
+        except Exception as e:
+            print(f"Error getting budget status: {e}")
+            return None
+
+    @staticmethod
+    def get_all_status(user_id, month=None):
+        """
+        Budget-Status aller Kategorien eines Users für einen Monat
+
+        Returns:
+            Liste von Status-Dicts (nach Kategorie-Name sortiert)
+        """
+        month = month_start(month or datetime.now())
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            query = """
+                SELECT c.id, c.name, c.monthly_budget, s.spent
+                FROM categories c
+                LEFT JOIN category_spend s
+                    ON s.user_id = c.user_id AND s.category_id = c.id AND s.month = %s
+                WHERE c.user_id = %s
+                ORDER BY c.name
+            """
+            cursor.execute(query, (month, user_id))
+            rows = cursor.fetchall()
+
+            cursor.close()
+            conn.close()
+
+            return [_status_from_row(row) for row in rows]
+        except Exception as e:
+            print(f"Error getting budget status: {e}")
+            return []
+
+    @staticmethod
+    def rebuild(user_id):
+        """
+        Berechnet alle Zähler eines Users neu (z.B. für Bestandsdaten)
+
+        Returns:
+            True bei Erfolg, False bei Fehler
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("DELETE FROM category_spend WHERE user_id = %s", (user_id,))
+            cursor.execute(
+                """
+                INSERT INTO category_spend (user_id, category_id, month, spent)
+                SELECT user_id, category_id, DATE_FORMAT(date, '%Y-%m-01'), SUM(amount)
+                FROM (
+                    SELECT user_id, category_id, date, amount FROM transactions
+                    WHERE user_id = %s AND type = 'expense' AND category_id IS NOT NULL
+                    UNION ALL
+                    SELECT user_id, category_id, date, amount FROM transactions_archive
+                    WHERE user_id = %s AND type = 'expense' AND category_id IS NOT NULL
+                ) t
+                GROUP BY user_id, category_id, DATE_FORMAT(date, '%Y-%m-01')
+                """,
+                (user_id, user_id)
+            )
+            conn.commit()
+
+            cursor.close()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error rebuilding budget counters: {e}")
+            return False
@@ -6,18 +6,43 @@ DB-Struktur:
 - user_id INT (NOT NULL - alle Kategorien sind user-spezifisch!)
 - name VARCHAR(100)
 - color CHAR(7) (z.B. '#FF6384')
+- monthly_budget DECIMAL(12,2) NULL (Monatsbudget, NULL = keins; im Objekt als Money)
 - UNIQUE (user_id, name) - Jeder User kann eigene "Food" Kategorie haben
+
+Kategorien eines Users werden pro Prozess gecacht (get_all_by_user, by_id,
+name_exists; siehe utils/user_cache.py). Jede Änderung ruft
+Category.invalidate(user_id) auf, der nächste Zugriff lädt neu. Änderungen
+aus anderen Prozessen (Gunicorn-Worker, Job-Worker) werden spätestens nach
+Config.CATEGORY_CACHE_SECONDS sichtbar.
+
+Änderungen (create/update/set_budget/delete) sind je EINE Anweisung bzw.
+DB-Transaktion ohne vorheriges Lesen: Eigentum über "AND user_id = %s" in
+der WHERE-Bedingung, doppelte Namen über den UNIQUE KEY uniq_user_name.
+Die Ursache eines Fehlschlags (NOT_FOUND, DUPLICATE, ERROR) kommt aus
+rowcount bzw. dem Fehlercode.
 """
-from db_config import get_db_connection
+from config import Config
+from models.storage import (
+    get_db_connection, execute_prepared, is_duplicate_key, OK, NOT_FOUND, DUPLICATE, REFERENCE_NOT_FOUND, ERROR
+)
+from models.archive import TransactionArchive
+from models.budget import Budget
+from models.ledger_version import LedgerVersion
+from utils.money import Money
+from utils.user_cache import UserCache
+
+# user_id → (Kategorien nach Name, {id: Category})
+_cache = UserCache('categories', Config.CATEGORY_CACHE_SECONDS, Config.CATEGORY_CACHE_USERS)
 
 class Category:
     """Category Model für Kategorienverwaltung"""
     
-    def __init__(self, id=None, user_id=None, name=None, color=None):
+    def __init__(self, id=None, user_id=None, name=None, color=None, monthly_budget=None):
         self.id = id
         self.user_id = user_id
         self.name = name
         self.color = color
+        self.monthly_budget = Money.of(monthly_budget) if monthly_budget is not None else None
     
     @staticmethod
     def create(user_id, name, color='#999999'):
@@ -30,7 +55,7 @@ class Category:
             color: Hex-Farbe (Standard: #999999)
             
         Returns:
-            Category-ID bei Erfolg, None bei Fehler
+            (Ergebnis, Category-ID): (OK, id), (DUPLICATE, None) oder (ERROR, None)
         """
         try:
             conn = get_db_connection()
@@ -44,43 +69,82 @@ class Category:
             
             cursor.close()
             conn.close()
-            return category_id
+            return OK, category_id
         except Exception as e:
+            if is_duplicate_key(e):
+                return DUPLICATE, None
             print(f"Error creating category: {e}")
-            return None
+            return ERROR, None
     
     @staticmethod
     def get_all_by_user(user_id):
         """
-        Holt alle Kategorien eines Users
+        Holt alle Kategorien eines Users (aus dem Prozess-Cache)
+        
+        Returns:
+            Liste von Category-Objekten (nach Name sortiert)
+        """
+        return list(Category._cached(user_id)[0])
+    
+    @staticmethod
+    def by_id(user_id):
+        """
+        Kategorien eines Users nach ID (aus dem Prozess-Cache)
+        
+        Returns:
+            Dict {category_id: Category}
+        """
+        return Category._cached(user_id)[1]
+    
+    @staticmethod
+    def invalidate(user_id):
+        """Cache eines Users verwerfen (nach jeder Änderung an seinen Kategorien)"""
+        _cache.invalidate(user_id)
+    
+    @staticmethod
+    def _cached(user_id):
+        """
+        Returns:
+            (Tupel von Category nach Name, Dict {id: Category}); bei DB-Fehler leer
+        """
+        def load():
+            categories = Category._load(user_id)
+            if categories is None:
+                return None
+            return tuple(categories), {category.id: category for category in categories}
+        
+        return _cache.get(user_id, load) or ((), {})
+    
+    @staticmethod
+    def _load(user_id):
+        """
+        Liest alle Kategorien eines Users aus der DB
         
         Returns:
-            Liste von Category-Objekten
+            Liste von Category-Objekten oder None bei Fehler
         """
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
+            conn = get_db_connection(readonly=True)
             
             query = "SELECT * FROM categories WHERE user_id = %s ORDER BY name"
-            cursor.execute(query, (user_id,))
+            cursor = execute_prepared(conn, query, (user_id,), dictionary=True)
             categories_data = cursor.fetchall()
             
-            cursor.close()
             conn.close()
             
-            categories = []
-            for data in categories_data:
-                categories.append(Category(
+            return [
+                Category(
                     id=data['id'],
                     user_id=data['user_id'],
                     name=data['name'],
-                    color=data['color']
-                ))
-            
-            return categories
+                    color=data['color'],
+                    monthly_budget=data.get('monthly_budget')
+                )
+                for data in categories_data
+            ]
         except Exception as e:
             print(f"Error getting categories: {e}")
-            return []
+            return None
     
     @staticmethod
     def get_by_id(category_id, user_id):
@@ -96,13 +160,11 @@ class Category:
         """
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
             
             query = "SELECT * FROM categories WHERE id = %s AND user_id = %s"
-            cursor.execute(query, (category_id, user_id))
+            cursor = execute_prepared(conn, query, (category_id, user_id), dictionary=True)
             data = cursor.fetchone()
             
-            cursor.close()
             conn.close()
             
             if data:
@@ -110,7 +172,8 @@ class Category:
                     id=data['id'],
                     user_id=data['user_id'],
                     name=data['name'],
-                    color=data['color']
+                    color=data['color'],
+                    monthly_budget=data.get('monthly_budget')
                 )
             return None
         except Exception as e:
@@ -123,73 +186,156 @@ class Category:
         Aktualisiert Kategorie
         
         Returns:
-            True bei Erfolg, False bei Fehler
+            OK, NOT_FOUND (keine Kategorie dieses Users), DUPLICATE (Name
+            vergeben) oder ERROR
         """
+        if name is None and color is None:
+            return ERROR
+        
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
             
-            updates = []
-            values = []
+            # Feste Anweisung (NULL = Feld unverändert) → einmal vorbereitet
+            query = """
+                UPDATE categories SET
+                    name = COALESCE(%s, name),
+                    color = COALESCE(%s, color)
+                WHERE id = %s AND user_id = %s
+            """
+            cursor = execute_prepared(conn, query, (name, color, category_id, user_id))
+            conn.commit()
             
-            if name is not None:
-                updates.append("name = %s")
-                values.append(name)
-            if color is not None:
-                updates.append("color = %s")
-                values.append(color)
+            affected = cursor.rowcount
+            conn.close()
             
-            if not updates:
-                return False
+            return OK if affected > 0 else NOT_FOUND
+        except Exception as e:
+            if is_duplicate_key(e):
+                return DUPLICATE
+            print(f"Error updating category: {e}")
+            return ERROR
+    
+    @staticmethod
+    def set_budget(category_id, user_id, monthly_budget):
+        """
+        Setzt Monatsbudget einer Kategorie
+        
+        Args:
+            monthly_budget: Betrag oder None (Budget entfernen)
             
-            values.extend([category_id, user_id])
-            query = f"UPDATE categories SET {', '.join(updates)} WHERE id = %s AND user_id = %s"
+        Returns:
+            OK, NOT_FOUND oder ERROR
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
             
-            cursor.execute(query, tuple(values))
+            query = "UPDATE categories SET monthly_budget = %s WHERE id = %s AND user_id = %s"
+            budget = Money.of(monthly_budget).to_decimal() if monthly_budget is not None else None
+            cursor.execute(query, (budget, category_id, user_id))
             conn.commit()
             
             affected = cursor.rowcount
             cursor.close()
             conn.close()
             
-            return affected > 0
+            return OK if affected > 0 else NOT_FOUND
         except Exception as e:
-            print(f"Error updating category: {e}")
-            return False
+            print(f"Error setting category budget: {e}")
+            return ERROR
     
     @staticmethod
-    def delete(category_id, user_id):
+    def delete(category_id, user_id, new_category_id=None):
         """
         Löscht Kategorie
         
-        WICHTIG: Transactions mit dieser Kategorie werden auf category_id=NULL gesetzt
-        (wegen ON DELETE SET NULL in DB)
+        WICHTIG: Transactions mit dieser Kategorie werden auf new_category_id
+        (Standard NULL) umgehängt (explizit: eine partitionierte transactions-
+        Tabelle hat keine Foreign Keys)
+        
+        Zuerst das DELETE (prüft Eigentum), nur wenn es eine Zeile trifft
+        werden die Transaktionen angepasst - alles in einer DB-Transaktion.
+        Grosse Kategorien vorher blockweise leeren (Transaction.move_category_chunk,
+        siehe CategoryService.merge_category), dann bleibt hier nur ein Rest.
+        
+        Mit new_category_id (Zusammenführen) wandern auch Regeln, Vorlagen
+        wiederkehrender Transaktionen und die restlichen Budget-Zähler (inkl.
+        archivierter Ausgaben) zur Ziel-Kategorie.
+        
+        Args:
+            category_id: zu löschende Kategorie
+            user_id: User-ID
+            new_category_id: Ziel-Kategorie (None = Transaktionen ohne Kategorie)
         
         Returns:
-            True bei Erfolg, False bei Fehler
+            OK, NOT_FOUND, REFERENCE_NOT_FOUND (Ziel gehört nicht dem User) oder ERROR
         """
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
             
+            if new_category_id is not None:
+                # Ziel sperren (darf nicht gleichzeitig gelöscht werden)
+                cursor.execute(
+                    "SELECT id FROM categories WHERE id = %s AND user_id = %s AND id <> %s FOR UPDATE",
+                    (new_category_id, user_id, category_id)
+                )
+                if cursor.fetchone() is None:
+                    conn.rollback()
+                    cursor.close()
+                    conn.close()
+                    return REFERENCE_NOT_FOUND
+                # Regeln hängen per ON DELETE CASCADE an der Kategorie → vor dem DELETE umhängen
+                cursor.execute(
+                    "UPDATE category_rules SET category_id = %s WHERE user_id = %s AND category_id = %s",
+                    (new_category_id, user_id, category_id)
+                )
+                cursor.execute(
+                    "UPDATE recurring_transactions SET category_id = %s WHERE user_id = %s AND category_id = %s",
+                    (new_category_id, user_id, category_id)
+                )
+                # Restliche Budget-Zähler (Rest + archivierte Ausgaben) dem Ziel gutschreiben,
+                # die eigenen fallen mit der Kategorie weg (ON DELETE CASCADE)
+                cursor.execute(
+                    "SELECT month, spent FROM category_spend WHERE user_id = %s AND category_id = %s",
+                    (user_id, category_id)
+                )
+                Budget.apply(cursor, user_id, {
+                    (new_category_id, month): Money.of(spent).cents for month, spent in cursor.fetchall()
+                })
+            
             query = "DELETE FROM categories WHERE id = %s AND user_id = %s"
             cursor.execute(query, (category_id, user_id))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                cursor.close()
+                conn.close()
+                return NOT_FOUND
+            
+            cursor.execute(
+                "UPDATE transactions SET category_id = %s WHERE user_id = %s AND category_id = %s",
+                (new_category_id, user_id, category_id)
+            )
+            LedgerVersion.bump(cursor, user_id)
+            TransactionArchive.reassign_category(cursor, user_id, category_id, new_category_id)
             conn.commit()
             
-            affected = cursor.rowcount
             cursor.close()
             conn.close()
             
-            return affected > 0
+            return OK
         except Exception as e:
             print(f"Error deleting category: {e}")
-            return False
+            return ERROR
     
     @staticmethod
     def name_exists(user_id, name, exclude_id=None):
         """
         Prüft ob Kategorie-Name bereits existiert (für diesen User!)
         
+        Aus dem Prozess-Cache; Gross-/Kleinschreibung egal wie beim
+        UNIQUE KEY in MySQL (Collation *_ci).
+        
         Args:
             user_id: User-ID
             name: Kategorie-Name
@@ -198,26 +344,11 @@ class Category:
         Returns:
             True wenn existiert, False sonst
         """
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            if exclude_id:
-                query = "SELECT COUNT(*) FROM categories WHERE user_id = %s AND name = %s AND id != %s"
-                cursor.execute(query, (user_id, name, exclude_id))
-            else:
-                query = "SELECT COUNT(*) FROM categories WHERE user_id = %s AND name = %s"
-                cursor.execute(query, (user_id, name))
-            
-            count = cursor.fetchone()[0]
-            
-            cursor.close()
-            conn.close()
-            
-            return count > 0
-        except Exception as e:
-            print(f"Error checking category name: {e}")
-            return False
+        key = name.casefold()
+        return any(
+            category.name.casefold() == key and category.id != exclude_id
+            for category in Category._cached(user_id)[0]
+        )
     
     @staticmethod
     def create_default_categories(user_id):
@@ -243,7 +374,9 @@ class Category:
         
         count = 0
         for name, color in default_categories:
-            if Category.create(user_id, name, color):
+            status, _ = Category.create(user_id, name, color)
+            if status == OK:
                 count += 1
         
+        Category.invalidate(user_id)
         return count
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+CategoryRule Model - Regeln für die automatische Kategorisierung
+
+DB-Struktur:
+- id INT
+- user_id INT
+- category_id INT                (Ziel-Kategorie, ON DELETE CASCADE)
+- kind ENUM('contains','regex')  (Text kommt vor / regulärer Ausdruck, ohne Gross-/Kleinschreibung)
+- pattern VARCHAR(255) NULL      (für die Beschreibung, NULL = jede Beschreibung)
+- min_amount / max_amount DECIMAL(12,2) NULL  (Betragsbereich inkl. Grenzen, im Objekt als Money)
+- type ENUM('income','expense') NULL          (NULL = beide)
+- priority INT                   (kleiner = zuerst geprüft, bei Gleichstand kleinere ID)
+- KEY idx_rules_user (user_id, priority, id)
+
+Die Regeln eines Users werden zu EINEM Matcher kompiliert und gecacht
+(siehe services/rule_service.py).
+"""
+from models.storage import get_db_connection, OK, NOT_FOUND, REFERENCE_NOT_FOUND, ERROR
+from utils.money import Money
+
+RULE_KINDS = ('contains', 'regex')
+
+
+class CategoryRule:
+    """Model für Kategorisierungs-Regeln"""
+
+    def __init__(self, id=None, user_id=None, category_id=None, kind='contains', pattern=None,
+                 min_amount=None, max_amount=None, transaction_type=None, priority=100):
+        self.id = id
+        self.user_id = user_id
+        self.category_id = category_id
+        self.kind = kind
+        self.pattern = pattern
+        self.min_amount = Money.of(min_amount) if min_amount is not None else None
+        self.max_amount = Money.of(max_amount) if max_amount is not None else None
+        self.transaction_type = transaction_type
+        self.priority = priority
+
+    @staticmethod
+    def create(user_id, category_id, kind, pattern, min_amount, max_amount, transaction_type, priority):
+        """
+        Legt Regel an
+
+        Die Kategorie muss dem User gehören - geprüft im INSERT ... SELECT selbst.
+
+        Returns:
+            (Ergebnis, Regel-ID): (OK, id), (REFERENCE_NOT_FOUND, None) oder (ERROR, None)
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            cursor.execute(
+                """
+                INSERT INTO category_rules
+                    (user_id, category_id, kind, pattern, min_amount, max_amount, type, priority)
+                SELECT %s, id, %s, %s, %s, %s, %s, %s
+                FROM categories WHERE id = %s AND user_id = %s
+                """,
+                (user_id, kind, pattern,
+                 min_amount.to_decimal() if min_amount is not None else None,
+                 max_amount.to_decimal() if max_amount is not None else None,
+                 transaction_type, priority, category_id, user_id)
+            )
+            if cursor.rowcount == 0:
+                cursor.close()
+                conn.close()
+                return REFERENCE_NOT_FOUND, None
+            conn.commit()
+
+            rule_id = cursor.lastrowid
+            cursor.close()
+            conn.close()
+            return OK, rule_id
+        except Exception as e:
+            print(f"Error creating category rule: {e}")
+            return ERROR, None
+
+    @staticmethod
+    def get_all_by_user(user_id):
+        """
+        Holt alle Regeln eines Users in Prüfreihenfolge
+
+        Returns:
+            Liste von CategoryRule-Objekten oder None bei Fehler
+        """
+        try:
+            conn = get_db_connection(readonly=True)
+            cursor = conn.cursor(dictionary=True)
+
+            cursor.execute(
+                "SELECT * FROM category_rules WHERE user_id = %s ORDER BY priority, id",
+                (user_id,)
+            )
+            rows = cursor.fetchall()
+
+            cursor.close()
+            conn.close()
+
+            return [
+                CategoryRule(
+                    id=row['id'],
+                    user_id=row['user_id'],
+                    category_id=row['category_id'],
+                    kind=row['kind'],
+                    pattern=row.get('pattern'),
+                    min_amount=row.get('min_amount'),
+                    max_amount=row.get('max_amount'),
+                    transaction_type=row.get('type'),
+                    priority=row['priority']
+                )
+                for row in rows
+            ]
+        except Exception as e:
+            print(f"Error getting category rules: {e}")
+            return None
+
+    @staticmethod
+    def delete(rule_id, user_id):
+        """
+        Löscht Regel
+
+        Returns:
+            OK, NOT_FOUND oder ERROR
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("DELETE FROM category_rules WHERE id = %s AND user_id = %s", (rule_id, user_id))
+            conn.commit()
+
+            affected = cursor.rowcount
+            cursor.close()
+            conn.close()
+
+            return OK if affected > 0 else NOT_FOUND
+        except Exception as e:
+            print(f"Error deleting category rule: {e}")
+            return ERROR
@@ -0,0 +1,68 @@
+"""
+BalanceForecast Model - Zuletzt berechnete Saldo-Prognose pro User
+
+DB-Struktur:
+- user_id INT PRIMARY KEY
+- version BIGINT       (LedgerVersion bei der Berechnung)
+- day DATE             (Stichtag der Berechnung)
+- data MEDIUMTEXT      (Prognose als JSON, Beträge in Rappen)
+- computed_at DATETIME
+
+Eine gespeicherte Prognose gilt, solange Version und Stichtag passen
+(siehe services/forecast_service.py). Der Scheduler rechnet sie nachts für
+alle aktiven User vor; Web-Prozesse lesen sie dann mit einem PK-Lookup.
+"""
+import json
+from datetime import datetime
+from models.storage import get_db_connection
+from models.balance_index import _to_date
+
+
+class BalanceForecast:
+    """Gespeicherte Prognosen"""
+
+    @staticmethod
+    def get(user_id):
+        """
+        Returns:
+            (version, day, data) oder None (keine oder Fehler)
+        """
+        try:
+            conn = get_db_connection(readonly=True)
+            cursor = conn.cursor()
+            cursor.execute("SELECT version, day, data FROM balance_forecasts WHERE user_id = %s", (user_id,))
+            row = cursor.fetchone()
+            cursor.close()
+            conn.close()
+            if row is None:
+                return None
+            return row[0], _to_date(row[1]), json.loads(row[2])
+        except Exception as e:
+            print(f"Error getting balance forecast: {e}")
+            return None
+
+    @staticmethod
+    def save(user_id, version, day, data):
+        """
+        Speichert (ersetzt) die Prognose eines Users
+
+        Returns:
+            True bei Erfolg, False bei Fehler
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO balance_forecasts (user_id, version, day, data, computed_at) "
+                "VALUES (%s, %s, %s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE version = VALUES(version), day = VALUES(day), "
+                "data = VALUES(data), computed_at = VALUES(computed_at)",
+                (user_id, version, day, json.dumps(data), datetime.now())
+            )
+            conn.commit()
+            cursor.close()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error saving balance forecast: {e}")
+            return False
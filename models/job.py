@@ -0,0 +1,504 @@
+"""
+Job Model - Dauerhafte Job-Queue für lange Operationen
+
+DB-Struktur:
+- id INT
+- user_id INT
+- kind VARCHAR(50)            (z.B. 'export_transactions', 'rebuild_balances')
+- params MEDIUMTEXT           (JSON)
+- status ENUM('queued','running','done','failed','cancelled')
+- progress INT / total INT    (Fortschritt, z.B. 300 / 1000 Zeilen)
+- result MEDIUMTEXT           (JSON, bei 'done')
+- error VARCHAR(500)          (bei 'failed')
+- cancel_requested TINYINT(1)
+- created_at / started_at / finished_at DATETIME
+- heartbeat_at DATETIME       (letztes Lebenszeichen des Workers)
+- attempts INT                (Anzahl Starts; Kennung des aktuellen Laufs)
+- KEY idx_jobs_status (status, id)        → nächster Job für den Worker
+- KEY idx_jobs_user (user_id, status)     → Limit pro User, Liste pro User
+
+Ein neu eingereihter Job (requeue_stale) kann weiterlaufen, wenn sein Worker
+nur hing statt tot war. Alle Schreibzugriffe des Workers (Fortschritt,
+Lebenszeichen, Ausgabe, Abschluss) gelten deshalb nur für status = 'running'
+und den eigenen Lauf (attempts = Wert beim Start) → der alte Lauf kann den
+neuen nicht überschreiben und merkt beim nächsten Fortschritt, dass er
+aufhören muss.
+
+Grosse Ausgaben (CSV-Export) liegen nicht in result, sondern blockweise in
+job_output (job_id, seq, data) → kein 16-MB-Limit, Download als Stream.
+"""
+import json
+from datetime import datetime
+from models.storage import get_db_connection
+
+FINISHED = ('done', 'failed', 'cancelled')
+
+# Spalten für Listen (ohne params/result, die gross sein können)
+LIST_COLUMNS = ("id, user_id, kind, status, progress, total, error, cancel_requested, "
+                "created_at, started_at, finished_at, attempts")
+
+# Nur der eigene, noch laufende Lauf darf schreiben (attempt None → nur status)
+OWN_RUN = "id = %s AND status = 'running' AND (%s IS NULL OR attempts = %s)"
+
+
+class Job:
+    """Job Model für Hintergrund-Operationen"""
+
+    def __init__(self, id=None, user_id=None, kind=None, params=None, status=None,
+                 progress=0, total=None, result=None, error=None, cancel_requested=False,
+                 created_at=None, started_at=None, finished_at=None, attempts=0):
+        self.id = id
+        self.user_id = user_id
+        self.kind = kind
+        self.params = params or {}
+        self.status = status
+        self.progress = progress
+        self.total = total
+        self.result = result
+        self.error = error
+        self.cancel_requested = cancel_requested
+        self.created_at = created_at
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.attempts = attempts
+
+    @staticmethod
+    def _from_row(data):
+        return Job(
+            id=data['id'],
+            user_id=data['user_id'],
+            kind=data['kind'],
+            params=json.loads(data['params']) if data.get('params') else {},
+            status=data['status'],
+            progress=data['progress'],
+            total=data.get('total'),
+            result=json.loads(data['result']) if data.get('result') else None,
+            error=data.get('error'),
+            cancel_requested=bool(data['cancel_requested']),
+            created_at=data.get('created_at'),
+            started_at=data.get('started_at'),
+            finished_at=data.get('finished_at'),
+            attempts=data.get('attempts') or 0
+        )
+
+    @staticmethod
+    def create(user_id, kind, params=None):
+        """
+        Legt neuen Job an (Status 'queued')
+
+        Returns:
+            Job-ID bei Erfolg, None bei Fehler
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            query = """
+                INSERT INTO jobs (user_id, kind, params, status, progress, created_at)
+                VALUES (%s, %s, %s, 'queued', 0, %s)
+            """
+            cursor.execute(query, (user_id, kind, json.dumps(params or {}), datetime.now()))
+            conn.commit()
+
+            job_id = cursor.lastrowid
+            cursor.close()
+            conn.close()
+            return job_id
+        except Exception as e:
+            print(f"Error creating job: {e}")
+            return None
+
+    @staticmethod
+    def get_by_id(job_id, user_id=None):
+        """
+        Holt Job (mit user_id: nur wenn er diesem User gehört)
+
+        Returns:
+            Job-Objekt oder None
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            if user_id is None:
+                cursor.execute("SELECT * FROM jobs WHERE id = %s", (job_id,))
+            else:
+                cursor.execute("SELECT * FROM jobs WHERE id = %s AND user_id = %s", (job_id, user_id))
+            data = cursor.fetchone()
+
+            cursor.close()
+            conn.close()
+
+            return Job._from_row(data) if data else None
+        except Exception as e:
+            print(f"Error getting job: {e}")
+            return None
+
+    @staticmethod
+    def get_all_by_user(user_id, limit=50):
+        """
+        Neueste Jobs eines Users (ohne params und result)
+
+        Returns:
+            Liste von Job-Objekten
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            query = f"SELECT {LIST_COLUMNS} FROM jobs WHERE user_id = %s ORDER BY id DESC LIMIT %s"
+            cursor.execute(query, (user_id, limit))
+            rows = cursor.fetchall()
+
+            cursor.close()
+            conn.close()
+
+            return [Job._from_row(row) for row in rows]
+        except Exception as e:
+            print(f"Error getting jobs: {e}")
+            return []
+
+    @staticmethod
+    def count_active(user_id):
+        """Anzahl wartender + laufender Jobs eines Users"""
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            query = "SELECT COUNT(*) FROM jobs WHERE user_id = %s AND status IN ('queued', 'running')"
+            cursor.execute(query, (user_id,))
+            count = cursor.fetchone()[0]
+
+            cursor.close()
+            conn.close()
+            return count
+        except Exception as e:
+            print(f"Error counting jobs: {e}")
+            return 0
+
+    @staticmethod
+    def claim_next(max_running_per_user):
+        """
+        Holt den nächsten wartenden Job und setzt ihn auf 'running'
+
+        - SKIP LOCKED: mehrere Worker blockieren sich nicht gegenseitig
+        - Users mit bereits max_running_per_user laufenden Jobs werden übersprungen
+
+        Die Zählung im Vorfilter liest einen Snapshot ohne Sperre - zwei Worker
+        könnten beide 0 laufende Jobs sehen. Deshalb wird vor dem Start die
+        User-Zeile gesperrt (serialisiert pro User) und gesperrt nachgezählt.
+
+        Returns:
+            Job-Objekt oder None (auch wenn der User inzwischen am Limit ist)
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            conn.start_transaction()
+            cursor.execute(
+                """
+                SELECT j.* FROM jobs j
+                WHERE j.status = 'queued'
+                  AND (SELECT COUNT(*) FROM jobs r
+                       WHERE r.user_id = j.user_id AND r.status = 'running') < %s
+                ORDER BY j.id
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+                """,
+                (max_running_per_user,)
+            )
+            data = cursor.fetchone()
+            if not data:
+                conn.commit()
+                return None
+
+            cursor.execute("SELECT id FROM users WHERE id = %s FOR UPDATE", (data['user_id'],))
+            cursor.fetchone()
+            cursor.execute(
+                "SELECT COUNT(*) AS running FROM jobs WHERE user_id = %s AND status = 'running' FOR UPDATE",
+                (data['user_id'],)
+            )
+            if cursor.fetchone()['running'] >= max_running_per_user:
+                conn.commit()
+                return None
+
+            started_at = datetime.now()
+            cursor.execute(
+                "UPDATE jobs SET status = 'running', started_at = %s, heartbeat_at = %s, "
+                "attempts = attempts + 1 WHERE id = %s",
+                (started_at, started_at, data['id'])
+            )
+            conn.commit()
+
+            data['status'] = 'running'
+            data['started_at'] = started_at
+            data['attempts'] = (data.get('attempts') or 0) + 1
+            return Job._from_row(data)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def update_progress(job_id, progress, total=None, attempt=None):
+        """
+        Speichert Fortschritt
+
+        Returns:
+            True wenn Abbruch angefordert wurde oder der Job nicht mehr diesem
+            Lauf gehört (neu eingereiht/abgebrochen), sonst False
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            if not Job.record_progress(cursor, job_id, progress, total, attempt):
+                conn.rollback()
+                cursor.close()
+                conn.close()
+                return True
+            cursor.execute("SELECT cancel_requested FROM jobs WHERE id = %s", (job_id,))
+            row = cursor.fetchone()
+            conn.commit()
+
+            cursor.close()
+            conn.close()
+            return bool(row and row[0])
+        except Exception as e:
+            print(f"Error updating job progress: {e}")
+            return False
+
+    @staticmethod
+    def record_progress(cursor, job_id, progress, total=None, attempt=None):
+        """
+        Speichert Fortschritt auf dem Cursor des Aufrufers (gleiche DB-Transaktion)
+
+        Für Handler, die nach einem Neustart exakt dort weitermachen müssen,
+        wo der letzte Block committet wurde (z.B. Import).
+
+        Returns:
+            True wenn der Job noch diesem Lauf gehört (sonst zurückrollen!)
+        """
+        cursor.execute(
+            f"UPDATE jobs SET progress = %s, total = COALESCE(%s, total), heartbeat_at = %s WHERE {OWN_RUN}",
+            (progress, total, datetime.now(), job_id, attempt, attempt)
+        )
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def heartbeat(job_id, attempt=None):
+        """
+        Lebenszeichen eines laufenden Jobs (unabhängig vom Fortschritt)
+
+        Returns:
+            True bei Erfolg, False bei Fehler
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            cursor.execute(
+                f"UPDATE jobs SET heartbeat_at = %s WHERE {OWN_RUN}",
+                (datetime.now(), job_id, attempt, attempt)
+            )
+            conn.commit()
+
+            cursor.close()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error writing job heartbeat: {e}")
+            return False
+
+    @staticmethod
+    def finish(job_id, status, result=None, error=None, attempt=None):
+        """
+        Schliesst Job ab ('done', 'failed' oder 'cancelled')
+
+        Nur solange der Job noch 'running' ist und diesem Lauf gehört.
+
+        Returns:
+            True bei Erfolg, False wenn der Job nicht mehr diesem Lauf gehört
+            oder bei Fehler
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            query = f"""
+                UPDATE jobs SET status = %s, result = %s, error = %s, finished_at = %s
+                WHERE {OWN_RUN}
+            """
+            cursor.execute(query, (
+                status,
+                json.dumps(result) if result is not None else None,
+                error[:500] if error else None,
+                datetime.now(),
+                job_id, attempt, attempt
+            ))
+            finished = cursor.rowcount > 0
+            conn.commit()
+
+            cursor.close()
+            conn.close()
+            return finished
+        except Exception as e:
+            print(f"Error finishing job: {e}")
+            return False
+
+    @staticmethod
+    def append_output(job_id, seq, data, attempt=None):
+        """
+        Speichert einen Block Ausgabe (ersetzt einen vorhandenen mit gleicher seq)
+
+        Das Lebenszeichen im selben Commit sperrt die Job-Zeile und prüft, dass
+        der Job noch diesem Lauf gehört.
+
+        Returns:
+            True bei Erfolg, False wenn der Job nicht mehr diesem Lauf gehört
+            oder bei Fehler
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            cursor.execute(
+                f"UPDATE jobs SET heartbeat_at = %s WHERE {OWN_RUN}",
+                (datetime.now(), job_id, attempt, attempt)
+            )
+            if cursor.rowcount == 0:
+                conn.rollback()
+                cursor.close()
+                conn.close()
+                return False
+            cursor.execute(
+                "INSERT INTO job_output (job_id, seq, data) VALUES (%s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE data = VALUES(data)",
+                (job_id, seq, data)
+            )
+            conn.commit()
+
+            cursor.close()
+            conn.close()
+            return True
+        except Exception as e:
+            print(f"Error saving job output: {e}")
+            return False
+
+    @staticmethod
+    def clear_output(job_id):
+        """Löscht die Ausgabe eines Jobs (vor einem erneuten Lauf)"""
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM job_output WHERE job_id = %s", (job_id,))
+            conn.commit()
+            cursor.close()
+            conn.close()
+        except Exception as e:
+            print(f"Error clearing job output: {e}")
+
+    @staticmethod
+    def iter_output(job_id, blocks_per_query=20):
+        """
+        Liefert die Ausgabe eines Jobs Block für Block (Keyset über seq)
+
+        Jede Abfrage ist kurz und liest nur blocks_per_query Blöcke → der
+        Export muss nie ganz im Speicher liegen. Gelesen wird vom Primary:
+        geschrieben hat der Worker, nicht die Session (kein read-your-writes).
+
+        Yields:
+            Text-Blöcke in Reihenfolge
+        """
+        last_seq = -1
+        while True:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT seq, data FROM job_output WHERE job_id = %s AND seq > %s ORDER BY seq LIMIT %s",
+                (job_id, last_seq, blocks_per_query)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            conn.close()
+
+            for seq, data in rows:
+                yield data
+            if len(rows) < blocks_per_query:
+                return
+            last_seq = rows[-1][0]
+
+    @staticmethod
+    def request_cancel(job_id, user_id):
+        """
+        Bricht Job ab
+
+        - wartend  → sofort 'cancelled'
+        - laufend  → cancel_requested = 1, der Worker bricht beim nächsten
+                     Fortschritts-Update ab
+
+        Returns:
+            True wenn ein offener Job gefunden wurde, sonst False
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            cursor.execute(
+                """
+                UPDATE jobs SET status = 'cancelled', finished_at = %s
+                WHERE id = %s AND user_id = %s AND status = 'queued'
+                """,
+                (datetime.now(), job_id, user_id)
+            )
+            affected = cursor.rowcount
+            cursor.execute(
+                """
+                UPDATE jobs SET cancel_requested = 1
+                WHERE id = %s AND user_id = %s AND status = 'running'
+                """,
+                (job_id, user_id)
+            )
+            affected += cursor.rowcount
+            conn.commit()
+
+            cursor.close()
+            conn.close()
+            return affected > 0
+        except Exception as e:
+            print(f"Error cancelling job: {e}")
+            return False
+
+    @staticmethod
+    def requeue_stale(heartbeat_before):
+        """
+        Setzt laufende Jobs zurück, deren Worker gestorben ist
+        (kein Lebenszeichen seit heartbeat_before)
+
+        progress bleibt erhalten → Handler können dort weitermachen (Import).
+
+        Returns:
+            Anzahl zurückgesetzter Jobs
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            cursor.execute(
+                """
+                UPDATE jobs SET status = 'queued', started_at = NULL, heartbeat_at = NULL
+                WHERE status = 'running' AND heartbeat_at < %s
+                """,
+                (heartbeat_before,)
+            )
+            affected = cursor.rowcount
+            conn.commit()
+
+            cursor.close()
+            conn.close()
+            return affected
+        except Exception as e:
+            print(f"Error requeueing jobs: {e}")
+            return 0
@@ -0,0 +1,69 @@
+"""
+LedgerVersion Model - Datenstand der Transaktionen eines Users
+
+DB-Struktur:
+- user_id INT PRIMARY KEY
+- version BIGINT  (steigt bei jeder Änderung an transactions und Vorlagen)
+
+Jeder Schreibvorgang auf transactions (anlegen, ändern, löschen, Import,
+Kategorien umhängen, archivieren) und auf recurring_transactions (anlegen,
+löschen) ruft bump() in seiner eigenen DB-Transaktion auf. Abgeleitete
+Auswertungen (services/analytics_service.py, services/forecast_service.py)
+werden mit der Version gecacht und sind gültig, solange sie sich nicht
+ändert - auch über Prozessgrenzen hinweg (ein PK-Lookup pro Abfrage).
+"""
+from models.storage import get_db_connection
+
+
+class LedgerVersion:
+    """Versionszähler pro User"""
+
+    @staticmethod
+    def bump(cursor, user_id):
+        """
+        Erhöht die Version (auf dem Cursor des Aufrufers, gleiche DB-Transaktion)
+        """
+        cursor.execute(
+            "INSERT INTO ledger_versions (user_id, version) VALUES (%s, 1) "
+            "ON DUPLICATE KEY UPDATE version = version + 1",
+            (user_id,)
+        )
+
+    @staticmethod
+    def current(cursor, user_id, for_update=False):
+        """
+        Liest die Version auf dem Cursor des Aufrufers
+
+        Args:
+            for_update: Zeile bis zum Commit sperren und den neuesten
+                        committeten Stand lesen (statt des Snapshots)
+
+        Returns:
+            Version (0 = noch nie geschrieben)
+        """
+        cursor.execute(
+            "SELECT version FROM ledger_versions WHERE user_id = %s" + (" FOR UPDATE" if for_update else ""),
+            (user_id,)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return 0
+        return row['version'] if isinstance(row, dict) else row[0]
+
+    @staticmethod
+    def get(user_id):
+        """
+        Returns:
+            Aktuelle Version (0 = noch nie geschrieben) oder None bei Fehler
+        """
+        try:
+            conn = get_db_connection(readonly=True)
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM ledger_versions WHERE user_id = %s", (user_id,))
+            row = cursor.fetchone()
+            cursor.close()
+            conn.close()
+            return row[0] if row else 0
+        except Exception as e:
+            print(f"Error getting ledger version: {e}")
+            return None
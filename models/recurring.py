@@ -0,0 +1,344 @@
+"""
+RecurringTransaction Model - Vorlagen für wiederkehrende Transaktionen
+
+DB-Struktur:
+- id INT
+- user_id INT
+- amount DECIMAL(12,2)  (im Objekt als Money)
+- type ENUM('income','expense')
+- description VARCHAR(255)
+- category_id INT NULL
+- freq ENUM('daily','weekly','monthly','yearly')   (wie RRULE FREQ)
+- interval_count INT                                (wie RRULE INTERVAL)
+- start_date DATE                                   (wie DTSTART)
+- until_date DATE NULL                              (wie RRULE UNTIL)
+- next_run DATE                                     (nächste fällige Ausführung)
+- active TINYINT(1)
+- KEY idx_rec_due (active, next_run, id)  → fällige Vorlagen mit EINER Index-Abfrage
+
+Erzeugte Transaktionen tragen recurring_id + occurrence (UNIQUE),
+dadurch kann dieselbe Ausführung nie doppelt gebucht werden.
+"""
+import calendar
+from datetime import datetime, timedelta
+from models.storage import get_db_connection, OK, REFERENCE_NOT_FOUND, ERROR
+from models.balance_index import _to_date
+from models.ledger_version import LedgerVersion
+from utils.money import Money
+
+FREQUENCIES = ('daily', 'weekly', 'monthly', 'yearly')
+
+
+def occurrence_after(start_date, freq, interval_count, current):
+    """
+    Nächste Ausführung nach `current`
+
+    Monatlich/jährlich wird immer vom start_date aus gerechnet, damit z.B.
+    31.01. → 28.02. → 31.03. nicht "wegdriftet".
+    """
+    start_date = _to_date(start_date)
+    current = _to_date(current)
+
+    if freq == 'daily':
+        return current + timedelta(days=interval_count)
+    if freq == 'weekly':
+        return current + timedelta(weeks=interval_count)
+
+    step_months = interval_count * (12 if freq == 'yearly' else 1)
+    months_done = (current.year - start_date.year) * 12 + current.month - start_date.month
+    months = months_done + step_months
+    year = start_date.year + (start_date.month - 1 + months) // 12
+    month = (start_date.month - 1 + months) % 12 + 1
+    day = min(start_date.day, calendar.monthrange(year, month)[1])
+    return current.replace(year=year, month=month, day=day)
+
+
+class RecurringTransaction:
+    """Model für wiederkehrende Transaktionen"""
+
+    def __init__(self, id=None, user_id=None, amount=None, transaction_type=None,
+                 description=None, category_id=None, freq=None, interval_count=1,
+                 start_date=None, until_date=None, next_run=None, active=True):
+        self.id = id
+        self.user_id = user_id
+        self.amount = Money.of(amount) if amount is not None else None
+        self.transaction_type = transaction_type
+        self.description = description
+        self.category_id = category_id
+        self.freq = freq
+        self.interval_count = interval_count
+        self.start_date = start_date
+        self.until_date = until_date
+        self.next_run = next_run
+        self.active = active
+
+    @staticmethod
+    def _from_row(data):
+        return RecurringTransaction(
+            id=data['id'],
+            user_id=data['user_id'],
+            amount=data['amount'],
+            transaction_type=data['type'],
+            description=data.get('description'),
+            category_id=data.get('category_id'),
+            freq=data['freq'],
+            interval_count=data['interval_count'],
+            start_date=data['start_date'],
+            until_date=data.get('until_date'),
+            next_run=data['next_run'],
+            active=bool(data['active'])
+        )
+
+    @staticmethod
+    def create(user_id, amount, transaction_type, description, category_id,
+               freq, interval_count, start_date, until_date=None):
+        """
+        Erstellt neue Vorlage (erste Ausführung = start_date)
+
+        Eine Kategorie muss dem User gehören - geprüft im INSERT ... SELECT selbst
+        (sonst trügen alle gebuchten Transaktionen die fremde Kategorie).
+
+        Returns:
+            (Ergebnis, Vorlagen-ID): (OK, id), (REFERENCE_NOT_FOUND, None) oder (ERROR, None)
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            params = (user_id, Money.of(amount).to_decimal(), transaction_type, description,
+                      freq, interval_count, start_date, until_date, start_date)
+            if category_id is None:
+                cursor.execute(
+                    """
+                    INSERT INTO recurring_transactions
+                        (user_id, amount, type, description, freq, interval_count,
+                         start_date, until_date, next_run, active, category_id)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 1, NULL)
+                    """,
+                    params
+                )
+            else:
+                cursor.execute(
+                    """
+                    INSERT INTO recurring_transactions
+                        (user_id, amount, type, description, freq, interval_count,
+                         start_date, until_date, next_run, active, category_id)
+                    SELECT %s, %s, %s, %s, %s, %s, %s, %s, %s, 1, id
+                    FROM categories WHERE id = %s AND user_id = %s
+                    """,
+                    params + (category_id, user_id)
+                )
+            if cursor.rowcount == 0:
+                cursor.close()
+                conn.close()
+                return REFERENCE_NOT_FOUND, None
+            recurring_id = cursor.lastrowid
+            LedgerVersion.bump(cursor, user_id)  # Prognose plant mit den Vorlagen
+            conn.commit()
+
+            cursor.close()
+            conn.close()
+            return OK, recurring_id
+        except Exception as e:
+            print(f"Error creating recurring transaction: {e}")
+            return ERROR, None
+
+    @staticmethod
+    def get_all_by_user(user_id):
+        """
+        Holt alle Vorlagen eines Users
+
+        Returns:
+            Liste von RecurringTransaction-Objekten
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            query = "SELECT * FROM recurring_transactions WHERE user_id = %s ORDER BY next_run, id"
+            cursor.execute(query, (user_id,))
+            rows = cursor.fetchall()
+
+            cursor.close()
+            conn.close()
+
+            return [RecurringTransaction._from_row(row) for row in rows]
+        except Exception as e:
+            print(f"Error getting recurring transactions: {e}")
+            return []
+
+    @staticmethod
+    def delete(recurring_id, user_id):
+        """
+        Löscht Vorlage (bereits gebuchte Transaktionen bleiben erhalten,
+        recurring_id wird NULL - explizit, da partitioniert ohne Foreign Key)
+
+        Returns:
+            True bei Erfolg, False bei Fehler
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            cursor.execute(
+                "UPDATE transactions SET recurring_id = NULL WHERE user_id = %s AND recurring_id = %s",
+                (user_id, recurring_id)
+            )
+            query = "DELETE FROM recurring_transactions WHERE id = %s AND user_id = %s"
+            cursor.execute(query, (recurring_id, user_id))
+            affected = cursor.rowcount
+            if affected > 0:
+                LedgerVersion.bump(cursor, user_id)
+                conn.commit()
+            else:
+                conn.rollback()  # fremde/unbekannte ID: Caches der Prognose bleiben gültig
+
+            cursor.close()
+            conn.close()
+
+            return affected > 0
+        except Exception as e:
+            print(f"Error deleting recurring transaction: {e}")
+            return False
+
+    @staticmethod
+    def lock_due(cursor, today, limit):
+        """
+        Holt + sperrt fällige Vorlagen (Index idx_rec_due)
+
+        SKIP LOCKED → mehrere Scheduler-Prozesse teilen sich die Arbeit,
+        ohne aufeinander zu warten.
+
+        Returns:
+            Liste von Dicts (Rohzeilen)
+        """
+        cursor.execute(
+            """
+            SELECT * FROM recurring_transactions
+            WHERE active = 1 AND next_run <= %s
+            ORDER BY next_run, id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+            """,
+            (today, limit)
+        )
+        return cursor.fetchall()
+
+    @staticmethod
+    def save_progress(cursor, updates):
+        """
+        Speichert neue next_run/active Werte
+
+        Args:
+            updates: Liste von (next_run, active, id)
+        """
+        if updates:
+            cursor.executemany(
+                "UPDATE recurring_transactions SET next_run = %s, active = %s WHERE id = %s",
+                updates
+            )
+
+
+class SchedulerState:
+    """
+    Checkpoint des Schedulers (Tabelle scheduler_state)
+
+    - name VARCHAR(50) PRIMARY KEY
+    - last_tick DATETIME       (Beginn des letzten Laufs)
+    - last_completed DATETIME  (Ende des letzten vollständigen Laufs)
+    - processed BIGINT         (insgesamt gebuchte Ausführungen)
+    """
+
+    @staticmethod
+    def record(cursor, name, tick=None, completed=None, processed=0):
+        """Aktualisiert Checkpoint (auf dem Cursor des Aufrufers)"""
+        cursor.execute(
+            """
+            INSERT INTO scheduler_state (name, last_tick, last_completed, processed)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                last_tick = COALESCE(VALUES(last_tick), last_tick),
+                last_completed = COALESCE(VALUES(last_completed), last_completed),
+                processed = processed + VALUES(processed)
+            """,
+            (name, tick, completed, processed)
+        )
+
+    @staticmethod
+    def claim_day(name, day):
+        """
+        Beansprucht eine tägliche Aufgabe für `day` (über Prozesse hinweg)
+
+        Die Zeile ist gesperrt, während last_tick gesetzt wird → von mehreren
+        Schedulern (Cron-Läufen) bekommt nur einer True. Gestartet, aber nicht
+        abgeschlossen → release() gibt den Tag wieder frei.
+
+        Returns:
+            True wenn die Aufgabe heute noch nicht gestartet wurde
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("INSERT IGNORE INTO scheduler_state (name) VALUES (%s)", (name,))
+            cursor.execute("SELECT last_tick FROM scheduler_state WHERE name = %s FOR UPDATE", (name,))
+            last_tick = cursor.fetchone()[0]
+            claimed = last_tick is None or last_tick.date() < day
+            if claimed:
+                SchedulerState.record(cursor, name, tick=datetime.now())
+                conn.commit()
+            else:
+                conn.rollback()
+
+            cursor.close()
+            conn.close()
+            return claimed
+        except Exception as e:
+            print(f"Error claiming scheduler day: {e}")
+            return False
+
+    @staticmethod
+    def finish_day(name, success=True):
+        """
+        Schliesst die mit claim_day() beanspruchte Aufgabe ab
+
+        Args:
+            success: False → Tag freigeben (last_tick auf letzten Abschluss zurück),
+                     der nächste Lauf versucht es erneut
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            if success:
+                SchedulerState.record(cursor, name, completed=datetime.now())
+            else:
+                cursor.execute(
+                    "UPDATE scheduler_state SET last_tick = last_completed WHERE name = %s", (name,)
+                )
+            conn.commit()
+
+            cursor.close()
+            conn.close()
+        except Exception as e:
+            print(f"Error finishing scheduler day: {e}")
+
+    @staticmethod
+    def get(name):
+        """
+        Returns:
+            Dict mit last_tick, last_completed, processed oder None
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            cursor.execute("SELECT * FROM scheduler_state WHERE name = %s", (name,))
+            row = cursor.fetchone()
+
+            cursor.close()
+            conn.close()
+            return row
+        except Exception as e:
+            print(f"Error getting scheduler state: {e}")
+            return None
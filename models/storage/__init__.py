@@ -0,0 +1,100 @@
+"""
+Storage-Schicht: Datenbank-Verbindungen unabhängig von der Engine
+
+    Config.DB_ENGINE = 'mysql'   → mysql_backend (Server, Connection Pools, Read-Replicas)
+    Config.DB_ENGINE = 'sqlite'  → sqlite_backend (eine Datei, Einzelplatz/Tests)
+
+Die Models schreiben weiterhin MySQL-SQL mit %s-Platzhaltern; Unterschiede
+(Platzhalter, ENUM, Upserts, FOR UPDATE, fehlende Funktionen) übersetzt
+das SQLite-Backend zentral (siehe dialect.py). Beide liefern Verbindungen
+mit derselben Schnittstelle:
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(sql, params); cursor.fetchall(); cursor.rowcount; cursor.lastrowid
+    conn.start_transaction(); conn.commit(); conn.rollback(); conn.close()
+
+cursor.rowcount nach UPDATE zählt bei beiden die GEFUNDENEN Zeilen (MySQL mit
+CLIENT_FOUND_ROWS), auch wenn sich kein Wert ändert → 0 heisst "keine Zeile
+passt zur WHERE-Bedingung" (z.B. fremde oder gelöschte ID).
+
+Änderungs-Methoden der Models melden die Ursache statt nur True/False
+(OK, NOT_FOUND, DUPLICATE, ...), abgeleitet aus rowcount und Fehlercode
+(is_duplicate_key).
+"""
+from config import Config
+
+# Ergebnis von Änderungen (create/update/delete)
+OK = 'ok'
+NOT_FOUND = 'not_found'                       # keine Zeile mit dieser ID für diesen User
+DUPLICATE = 'duplicate'                       # eindeutiger Schlüssel verletzt (z.B. uniq_user_name)
+REFERENCE_NOT_FOUND = 'reference_not_found'   # verknüpfte Zeile (z.B. Kategorie) gehört nicht dem User
+ERROR = 'error'
+
+_backend = None
+
+
+def use_engine(name):
+    """
+    Wählt das Backend zur Laufzeit (z.B. Benchmarks, die beide vergleichen)
+
+    Returns:
+        Backend-Modul
+    """
+    global _backend
+    if name == 'mysql':
+        from models.storage import mysql_backend as module
+    elif name == 'sqlite':
+        from models.storage import sqlite_backend as module
+    else:
+        raise ValueError(f"Unbekannte DB-Engine: {name}")
+    _backend = module
+    return module
+
+
+def backend():
+    """Aktives Backend-Modul (beim ersten Zugriff aus Config.DB_ENGINE)"""
+    return _backend or use_engine(Config.DB_ENGINE)
+
+
+def engine():
+    """'mysql' oder 'sqlite'"""
+    return backend().ENGINE
+
+
+def database_name():
+    """DB-Name (MySQL) bzw. Dateipfad (SQLite)"""
+    return backend().database_name()
+
+
+def get_db_connection(readonly=False):
+    """
+    Args:
+        readonly: True → darf von einer Replica gelesen werden (nur MySQL)
+
+    Returns:
+        Verbindung (Interface wie mysql.connector-Verbindung)
+    """
+    return backend().get_db_connection(readonly)
+
+
+def execute_prepared(conn, query, params=(), dictionary=False):
+    """
+    Führt eine FESTE Abfrage aus (MySQL: Server-side Prepared Statement)
+
+    Der zurückgegebene Cursor wird vom Aufrufer NICHT geschlossen.
+    """
+    return backend().execute_prepared(conn, query, params, dictionary)
+
+
+def is_duplicate_key(error):
+    """True, wenn `error` eine Verletzung eines UNIQUE/PRIMARY KEY ist"""
+    return backend().is_duplicate_key(error)
+
+
+def pool_stats():
+    """
+    Returns:
+        Dict {endpoint-name: {'in_use', 'idle', 'waiting'}}
+    """
+    return backend().pool_stats()
@@ -0,0 +1,221 @@
+"""
+SQL-Dialekt: MySQL-Anweisungen der Models für SQLite umschreiben
+
+Die Models schreiben MySQL-SQL. Für SQLite wird jede Anweisung einmal
+übersetzt (gecacht pro SQL-Text, Stringliterale bleiben unverändert):
+
+    %s                                → ?
+    INSERT IGNORE INTO                → INSERT OR IGNORE INTO
+    ON DUPLICATE KEY UPDATE ...       → ON CONFLICT DO UPDATE SET ...
+    VALUES(spalte) im Update-Teil     → excluded.spalte
+    IF(a, b, c)                       → IIF(a, b, c)
+    ... FOR UPDATE [SKIP LOCKED]      → entfällt, stattdessen Schreibsperre
+                                        vorab (siehe sqlite_backend)
+
+MOD() und DATE_FORMAT() gibt es in SQLite nicht; mysql_mod() und
+mysql_date_format() werden pro Verbindung als Funktionen registriert.
+
+DDL aus setup_db.py:
+    INT AUTO_INCREMENT PRIMARY KEY    → INTEGER PRIMARY KEY AUTOINCREMENT
+    spalte ENUM('a','b') ...          → spalte TEXT ... CHECK (spalte IN ('a','b'))
+    [UNIQUE] KEY name (spalten)       → CREATE [UNIQUE] INDEX IF NOT EXISTS name ON tabelle (spalten)
+    Optionen nach der Spaltenliste (ENGINE=..., PARTITION BY ...) entfallen
+"""
+import math
+import re
+from datetime import datetime
+from functools import lru_cache
+
+_INSERT_IGNORE = re.compile(r'\bINSERT\s+IGNORE\s+INTO\b', re.I)
+_ON_DUPLICATE = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.I)
+_VALUES_FUNC = re.compile(r'\bVALUES\s*\(\s*(\w+)\s*\)', re.I)
+_IF_FUNC = re.compile(r'(?<![\w.])IF\s*\(', re.I)
+_FOR_UPDATE = re.compile(r'\s*\bFOR\s+UPDATE(\s+SKIP\s+LOCKED|\s+NOWAIT)?\b', re.I)
+
+_CREATE_TABLE = re.compile(r'CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s*\(', re.I)
+_AUTO_INCREMENT = re.compile(r'^(\w+)\s+INT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY$', re.I)
+_ENUM_COLUMN = re.compile(r'^(\w+)\s+ENUM\s*\(([^)]*)\)(.*)$', re.I | re.S)
+_INDEX = re.compile(r'^(UNIQUE\s+)?(?:KEY|INDEX)\s+(\w+)\s*\((.*)\)$', re.I | re.S)
+
+# MySQL DATE_FORMAT → strftime (nur die im Projekt sinnvollen Angaben)
+_DATE_FORMAT_CODES = {
+    '%Y': '%Y', '%y': '%y', '%m': '%m', '%d': '%d',
+    '%H': '%H', '%i': '%M', '%s': '%S', '%S': '%S', '%%': '%%',
+}
+
+
+def _segments(sql):
+    """
+    Zerlegt SQL in Code- und Stringliteral-Abschnitte
+
+    Yields:
+        tuple: (ist_literal, text)
+    """
+    start = index = 0
+    length = len(sql)
+    while index < length:
+        if sql[index] != "'":
+            index += 1
+            continue
+        if index > start:
+            yield False, sql[start:index]
+        end = index + 1
+        while end < length:
+            if sql[end] == '\\':
+                end += 2
+                continue
+            if sql[end] == "'":
+                if end + 1 < length and sql[end + 1] == "'":
+                    end += 2
+                    continue
+                break
+            end += 1
+        yield True, sql[index:end + 1]
+        start = index = end + 1
+    if start < length:
+        yield False, sql[start:]
+
+
+@lru_cache(maxsize=1024)
+def to_sqlite(sql):
+    """
+    Übersetzt eine MySQL-Anweisung
+
+    Returns:
+        tuple: (SQLite-SQL, locking) - locking = war SELECT ... FOR UPDATE
+    """
+    parts = []
+    locking = False
+    in_upsert = False
+    for is_literal, text in _segments(sql):
+        if is_literal:
+            parts.append(text)
+            continue
+        text = text.replace('%s', '?')
+        text = _INSERT_IGNORE.sub('INSERT OR IGNORE INTO', text)
+        text = _IF_FUNC.sub('IIF(', text)
+        text, count = _FOR_UPDATE.subn('', text)
+        locking = locking or count > 0
+        match = _ON_DUPLICATE.search(text)
+        if match:
+            in_upsert = True
+            text = (text[:match.start()] + 'ON CONFLICT DO UPDATE SET'
+                    + _VALUES_FUNC.sub(r'excluded.\1', text[match.end():]))
+        elif in_upsert:
+            text = _VALUES_FUNC.sub(r'excluded.\1', text)
+        parts.append(text)
+    return ''.join(parts), locking
+
+
+def _closing_paren(sql, open_index):
+    """Index der schliessenden Klammer zu sql[open_index] == '('"""
+    depth = 0
+    position = open_index
+    for is_literal, text in _segments(sql[open_index:]):
+        if not is_literal:
+            for offset, char in enumerate(text):
+                if char == '(':
+                    depth += 1
+                elif char == ')':
+                    depth -= 1
+                    if depth == 0:
+                        return position + offset
+        position += len(text)
+    raise ValueError("Klammer nicht geschlossen")
+
+
+def _split_top_level(body):
+    """Spaltenliste an Kommas ausserhalb von Klammern/Literalen trennen"""
+    items, current, depth = [], [], 0
+    for is_literal, text in _segments(body):
+        if is_literal:
+            current.append(text)
+            continue
+        for char in text:
+            if char == ',' and depth == 0:
+                items.append(''.join(current))
+                current = []
+                continue
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            current.append(char)
+    items.append(''.join(current))
+    return [item.strip() for item in items if item.strip()]
+
+
+def column_to_sqlite(definition):
+    """Eine Spaltendefinition (z.B. "type ENUM('a','b') NOT NULL") übersetzen"""
+    definition = ' '.join(definition.split())
+    match = _AUTO_INCREMENT.match(definition)
+    if match:
+        return f"{match.group(1)} INTEGER PRIMARY KEY AUTOINCREMENT"
+    match = _ENUM_COLUMN.match(definition)
+    if match:
+        name, values, rest = match.groups()
+        return f"{name} TEXT{rest} CHECK ({name} IN ({values}))"
+    return definition
+
+
+def index_to_sqlite(table, definition):
+    """
+    "[UNIQUE] KEY name (spalten)" → CREATE INDEX-Anweisung
+
+    Returns:
+        SQL oder None (keine Index-Definition)
+    """
+    match = _INDEX.match(' '.join(definition.split()))
+    if not match:
+        return None
+    unique, name, columns = match.groups()
+    return f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({columns})"
+
+
+def ddl_to_sqlite(sql):
+    """
+    Übersetzt ein CREATE TABLE aus setup_db.py
+
+    Returns:
+        Liste von Anweisungen (CREATE TABLE, danach CREATE INDEX)
+    """
+    match = _CREATE_TABLE.search(sql)
+    if not match:
+        raise ValueError(f"Kein CREATE TABLE: {sql[:60]}")
+    table = match.group(1)
+    body_end = _closing_paren(sql, match.end() - 1)
+
+    columns, indexes = [], []
+    for item in _split_top_level(sql[match.end():body_end]):
+        index = index_to_sqlite(table, item)
+        if index:
+            indexes.append(index)
+        else:
+            columns.append(column_to_sqlite(item))
+    create = f"CREATE TABLE IF NOT EXISTS {table} (\n  " + ",\n  ".join(columns) + "\n)"
+    return [create] + indexes
+
+
+def parse_datetime(value):
+    """Text aus einer DATE/DATETIME-Spalte → datetime"""
+    if isinstance(value, bytes):
+        value = value.decode()
+    return datetime.fromisoformat(value)
+
+
+def mysql_mod(dividend, divisor):
+    """MOD() wie MySQL: Vorzeichen des Dividenden, NULL bei Division durch 0"""
+    if dividend is None or divisor is None or divisor == 0:
+        return None
+    result = math.fmod(dividend, divisor)
+    if isinstance(dividend, int) and isinstance(divisor, int):
+        return int(result)
+    return result
+
+
+def mysql_date_format(value, fmt):
+    """DATE_FORMAT(wert, format) mit MySQL-Formatangaben (%Y, %m, %d, %H, %i, %s)"""
+    if value is None or fmt is None:
+        return None
+    strftime_format = re.sub(r'%.', lambda m: _DATE_FORMAT_CODES.get(m.group(), m.group()), fmt)
+    return parse_datetime(value).strftime(strftime_format)
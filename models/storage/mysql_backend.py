@@ -0,0 +1,265 @@
+"""
+MySQL-Backend: Verbindungen über Connection Pools (pro Prozess)
+
+get_db_connection() liefert eine Verbindung aus dem Pool; conn.close() gibt
+sie zurück statt sie zu schliessen. Sind alle Verbindungen belegt, wartet
+der Aufrufer bis zu Config.DB_POOL_TIMEOUT Sekunden.
+
+Read/Write-Splitting:
+    get_db_connection()               → Primary (Schreiben + alles Übrige)
+    get_db_connection(readonly=True)  → Replica (reihum), falls konfiguriert
+
+Read-your-writes: Nach jedem commit() in einem Request liest diese Session
+für Config.READ_YOUR_WRITES_SECONDS nur noch vom Primary, damit man die
+eigene Änderung sofort sieht, auch wenn die Replica hinterherhinkt.
+
+Prepared Statements: execute_prepared() bereitet eine feste Abfrage einmal
+pro gepoolter Verbindung vor und verwendet das Handle danach wieder.
+Deshalb werden Verbindungen bei der Rückgabe nicht per reset_session()
+zurückgesetzt (das würde alle Statements verwerfen), sondern nur per
+rollback() aus einer offenen Transaktion geholt.
+
+CLIENT_FOUND_ROWS: cursor.rowcount nach UPDATE = gefundene statt geänderte
+Zeilen (wie SQLite) → ein UPDATE ohne Änderung ist kein "nicht gefunden".
+"""
+import itertools
+import threading
+import time
+
+import mysql.connector
+from flask import has_request_context, session
+from mysql.connector import pooling
+from mysql.connector.constants import ClientFlag
+
+from config import Config
+from utils import metrics, sql_stats
+
+ENGINE = 'mysql'
+STICKY_SESSION_KEY = '_rw_until'
+ER_UNKNOWN_STMT_HANDLER = 1243
+ER_DUP_ENTRY = 1062
+
+
+class _Endpoint:
+    """Ein DB-Host mit eigenem Pool + Platz-Semaphore"""
+
+    def __init__(self, name, host, port):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.slots = threading.BoundedSemaphore(Config.DB_POOL_SIZE)
+        self._pool = None
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.waiting = 0
+
+    def _get_pool(self):
+        """Erstellt den Pool beim ersten Zugriff (erst nach dem Fork der Gunicorn-Worker)"""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = pooling.MySQLConnectionPool(
+                        pool_name=f"budget_tracker_{self.name}",
+                        pool_size=Config.DB_POOL_SIZE,
+                        host=self.host,
+                        port=self.port,
+                        user=Config.DB_USER,
+                        password=Config.DB_PASSWORD,
+                        database=Config.DB_NAME,
+                        client_flags=[ClientFlag.FOUND_ROWS],
+                        pool_reset_session=False
+                    )
+        return self._pool
+
+    def connect(self, readonly):
+        with self._lock:
+            self.waiting += 1
+        try:
+            acquired = self.slots.acquire(timeout=Config.DB_POOL_TIMEOUT)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not acquired:
+            raise mysql.connector.errors.PoolError(
+                f"Keine freie DB-Verbindung ({self.name}: Pool erschöpft)"
+            )
+        try:
+            connection = PooledConnection(self._get_pool().get_connection(), self, readonly)
+        except Exception:
+            self.slots.release()
+            raise
+        with self._lock:
+            self.in_use += 1
+        return connection
+
+    def release(self):
+        with self._lock:
+            self.in_use -= 1
+        self.slots.release()
+
+    def stats(self):
+        """Momentaufnahme für /metrics (belegt, frei, wartend)"""
+        with self._lock:
+            in_use, waiting = self.in_use, self.waiting
+        idle = Config.DB_POOL_SIZE - in_use if self._pool is not None else 0
+        return {'in_use': in_use, 'idle': idle, 'waiting': waiting}
+
+
+def _parse_replica(entry):
+    host, _, port = entry.partition(':')
+    return host, int(port or 3306)
+
+
+_primary = _Endpoint('primary', Config.DB_HOST, Config.DB_PORT)
+_replicas = [
+    _Endpoint(f'replica{index}', *_parse_replica(entry))
+    for index, entry in enumerate(Config.DB_REPLICAS)
+]
+_replica_cycle = itertools.cycle(_replicas) if _replicas else None
+_replica_lock = threading.Lock()
+
+
+class PooledConnection:
+    """Verbindung aus dem Pool; close() gibt den Pool-Platz wieder frei"""
+
+    def __init__(self, connection, endpoint, readonly=False):
+        self._connection = connection
+        self._endpoint = endpoint
+        self._closed = False
+        self.readonly = readonly
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return sql_stats.instrument(self._connection.cursor(*args, **kwargs))
+
+    def commit(self):
+        self._connection.commit()
+        _mark_write()
+
+    def raw_connection(self):
+        """Die eigentliche (langlebige) Verbindung hinter dem Pool-Wrapper"""
+        return self._connection._cnx
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            # Ersetzt reset_session(): offene (Lese-)Transaktion beenden,
+            # damit der nächste Nutzer keinen alten Snapshot sieht
+            self._connection.rollback()
+        except Exception:
+            pass
+        try:
+            self._connection.close()
+        finally:
+            self._endpoint.release()
+
+    def __del__(self):
+        # Models schliessen im Fehlerfall nicht immer → beim Aufräumen zurückgeben
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _mark_write():
+    """Session für READ_YOUR_WRITES_SECONDS an den Primary binden"""
+    if _replicas and has_request_context():
+        session[STICKY_SESSION_KEY] = time.time() + Config.READ_YOUR_WRITES_SECONDS
+
+
+def _is_sticky():
+    return has_request_context() and session.get(STICKY_SESSION_KEY, 0) > time.time()
+
+
+def pool_stats():
+    """
+    Returns:
+        Dict {endpoint-name: {'in_use', 'idle', 'waiting'}}
+    """
+    return {endpoint.name: endpoint.stats() for endpoint in [_primary, *_replicas]}
+
+
+def database_name():
+    return Config.DB_NAME
+
+
+def get_db_connection(readonly=False):
+    """
+    Args:
+        readonly: True → darf von einer Replica gelesen werden
+
+    Returns:
+        PooledConnection (Interface wie mysql.connector-Verbindung)
+    """
+    if readonly and _replicas and not _is_sticky():
+        with _replica_lock:
+            replica = next(_replica_cycle)
+        try:
+            return replica.connect(readonly=True)
+        except Exception as e:
+            # Replica nicht erreichbar → Primary übernimmt
+            print(f"Replica {replica.name} unavailable, using primary: {e}")
+    return _primary.connect(readonly=False)
+
+
+def is_duplicate_key(error):
+    return isinstance(error, mysql.connector.Error) and error.errno == ER_DUP_ENTRY
+
+
+def execute_prepared(conn, query, params=(), dictionary=False):
+    """
+    Führt eine FESTE Abfrage als Server-side Prepared Statement aus
+
+    Pro (Verbindung, SQL-Text) gibt es einen gecachten Cursor; MySQL parst
+    die Abfrage nur beim ersten Aufruf. `query` muss ein konstanter String
+    sein (kein f-String), sonst wächst der Cache.
+
+    Der zurückgegebene Cursor gehört dem Cache → Ergebnis lesen, aber
+    NICHT cursor.close() aufrufen.
+
+    Returns:
+        Cursor nach execute()
+    """
+    if not Config.DB_PREPARED_STATEMENTS:
+        cursor = conn.cursor(dictionary=dictionary)
+        cursor.execute(query, params)
+        return cursor
+
+    raw = conn.raw_connection()
+    cache = getattr(raw, '_prepared_cursors', None)
+    if cache is None:
+        cache = raw._prepared_cursors = {}
+
+    entry = cache.get((query, dictionary))
+    metrics.record_cache('prepared_statements', entry is not None)
+    if entry is not None:
+        cursor, cached_query = entry
+        cursor = sql_stats.instrument(cursor)
+        try:
+            cursor.execute(cached_query, params)
+            return cursor
+        except mysql.connector.errors.Error as e:
+            # Nach Reconnect kennt der Server die Statement-Handles nicht mehr
+            # (doppelter Schlüssel ist ein normales Ergebnis → Cache bleibt)
+            if not is_duplicate_key(e):
+                cache.clear()
+            if e.errno != ER_UNKNOWN_STMT_HANDLER:
+                raise
+
+    # Der Connector bereitet nur neu vor, wenn sich das SQL-OBJEKT ändert →
+    # immer dasselbe String-Objekt übergeben
+    cursor = raw.cursor(prepared=True, dictionary=dictionary)
+    cache[(query, dictionary)] = (cursor, query)
+    cursor = sql_stats.instrument(cursor)
+    cursor.execute(query, params)
+    return cursor
+
+# MySQL Root user und pw
+# user: root
+# pw: Root1234!
+# Temp pw testing: IabkOVlT@g76eA_IKzT.fm
+#prod =6-.MWH7u3fo0wy1ws_KRV
\ No newline at end of file
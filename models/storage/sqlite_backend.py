@@ -0,0 +1,285 @@
+"""
+SQLite-Backend für Einzelplatz-Installationen und Tests (kein DB-Server nötig)
+
+    DB_ENGINE=sqlite SQLITE_PATH=/var/lib/budget-tracker/budget.db python app.py
+
+Verbindungen gehören einem Thread (threading.local) und bleiben offen;
+conn.close() beendet nur eine offene Transaktion und legt die Verbindung
+für den nächsten get_db_connection() desselben Threads zurück. Meist hat
+ein Thread genau eine Verbindung, verschachtelte Aufrufe bekommen eine
+eigene (eigene Transaktion, wie bei MySQL).
+
+Pragmas pro Verbindung:
+    journal_mode=WAL        Leser und Schreiber blockieren sich nicht
+    synchronous=NORMAL      fsync nur beim WAL-Checkpoint (bleibt konsistent)
+    foreign_keys=ON         ON DELETE CASCADE / SET NULL wie in MySQL
+    temp_store=MEMORY, cache_size, mmap_size (Config.SQLITE_*)
+    Wartezeit auf die Schreibsperre = Config.DB_POOL_TIMEOUT
+
+SQLite hat EINEN Schreiber pro Datenbank. Schreibende Transaktionen holen
+die Sperre deshalb gleich am Anfang (BEGIN IMMEDIATE) statt erst beim
+ersten Schreiben mit "database is locked" zu scheitern. SELECT ... FOR UPDATE
+und start_transaction() holen sie ebenfalls vorab → dieselbe Garantie wie
+die Zeilensperren in MySQL, nur gröber (SKIP LOCKED entfällt).
+
+Typen: DECIMAL/DATE/DATETIME-Spalten kommen als Decimal/date/datetime
+zurück (PARSE_DECLTYPES). Berechnete Beträge (SUM() ...) liefert SQLite als
+float; sie werden auf 2 Nachkommastellen gerundet als Decimal zurückgegeben,
+wie MySQL es bei DECIMAL-Summen tut.
+
+Das Schema (setup_db.TABLES_SQL, übersetzt per dialect.ddl_to_sqlite) wird
+beim ersten Zugriff pro Prozess angelegt bzw. ergänzt.
+"""
+import sqlite3
+import threading
+import weakref
+from datetime import date, datetime
+from decimal import Decimal
+
+from config import Config
+from models.storage import dialect
+from utils import sql_stats
+
+ENGINE = 'sqlite'
+CENTS = Decimal('0.01')
+SQLITE_CONSTRAINT_UNIQUE = 2067
+SQLITE_CONSTRAINT_PRIMARYKEY = 1555
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime, lambda value: value.strftime('%Y-%m-%d %H:%M:%S'))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter('DECIMAL', lambda raw: Decimal(raw.decode()).quantize(CENTS))
+sqlite3.register_converter('DATETIME', dialect.parse_datetime)
+sqlite3.register_converter('DATE', lambda raw: dialect.parse_datetime(raw[:10]).date())
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+_stats_lock = threading.Lock()
+_open = 0
+_in_use = 0
+
+
+def _normalize(value):
+    return Decimal(repr(value)).quantize(CENTS) if type(value) is float else value
+
+
+def _tuple_row(cursor, row):
+    return tuple(_normalize(value) for value in row)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: _normalize(value) for column, value in zip(cursor.description, row)}
+
+
+class _Connection(sqlite3.Connection):
+    """Unterklasse, damit weakref.finalize() geschlossene Verbindungen zählen kann"""
+
+
+def _closed():
+    global _open
+    with _stats_lock:
+        _open -= 1
+
+
+def _connect():
+    """Neue Verbindung mit Pragmas + MySQL-Funktionen"""
+    global _open
+    connection = sqlite3.connect(
+        Config.SQLITE_PATH,
+        timeout=Config.DB_POOL_TIMEOUT,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        isolation_level='IMMEDIATE',
+        cached_statements=256,
+        factory=_Connection
+    )
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.execute("PRAGMA temp_store = MEMORY")
+    connection.execute(f"PRAGMA cache_size = -{Config.SQLITE_CACHE_MB * 1024}")
+    connection.execute(f"PRAGMA mmap_size = {Config.SQLITE_MMAP_MB * 1024 * 1024}")
+    connection.create_function('MOD', 2, dialect.mysql_mod, deterministic=True)
+    connection.create_function('DATE_FORMAT', 2, dialect.mysql_date_format, deterministic=True)
+    _ensure_schema(connection)
+
+    with _stats_lock:
+        _open += 1
+    weakref.finalize(connection, _closed)
+    return connection
+
+
+def _ensure_schema(connection):
+    """Tabellen/Indizes aus setup_db.py anlegen (einmal pro Prozess)"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        from setup_db import ADDED_COLUMNS, ADDED_INDEXES, TABLES_SQL
+
+        for table_sql in TABLES_SQL:
+            for statement in dialect.ddl_to_sqlite(table_sql):
+                connection.execute(statement)
+        for table, column, definition in ADDED_COLUMNS:
+            existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                connection.execute(
+                    f"ALTER TABLE {table} ADD COLUMN {dialect.column_to_sqlite(f'{column} {definition}')}"
+                )
+        for table, _, definition in ADDED_INDEXES:
+            connection.execute(dialect.index_to_sqlite(table, definition))
+        connection.commit()
+        _schema_ready = True
+
+
+class SQLiteCursor:
+    """Cursor mit der Schnittstelle des MySQL-Connectors (%s, dictionary=True, with_rows)"""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.cursor()
+        self._cursor.row_factory = _dict_row if dictionary else _tuple_row
+
+    def _translate(self, operation):
+        sql, locking = dialect.to_sqlite(operation)
+        if locking and not self._connection.in_transaction:
+            self._connection.execute("BEGIN IMMEDIATE")
+        return sql
+
+    def execute(self, operation, params=None):
+        self._cursor.execute(self._translate(operation), params or ())
+
+    def executemany(self, operation, seq_params):
+        self._cursor.executemany(self._translate(operation), seq_params)
+
+    @property
+    def with_rows(self):
+        return self._cursor.description is not None
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Verbindung des aktuellen Threads; close() gibt sie an den Thread zurück"""
+
+    def __init__(self, connection, idle):
+        self._connection = connection
+        self._idle = idle
+        self._closed = False
+        self.readonly = False
+
+    def cursor(self, dictionary=False, **kwargs):
+        return sql_stats.instrument(SQLiteCursor(self._connection, dictionary))
+
+    def start_transaction(self):
+        if not self._connection.in_transaction:
+            self._connection.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def raw_connection(self):
+        return self._connection
+
+    def close(self):
+        global _in_use
+        if self._closed:
+            return
+        self._closed = True
+        with _stats_lock:
+            _in_use -= 1
+        try:
+            if self._connection.in_transaction:
+                self._connection.rollback()
+        except sqlite3.Error:
+            # z.B. Aufräumen aus einem anderen Thread → Verbindung verwerfen
+            return
+        self._idle.append(self._connection)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def database_name():
+    return Config.SQLITE_PATH
+
+
+def is_duplicate_key(error):
+    if not isinstance(error, sqlite3.IntegrityError):
+        return False
+    code = getattr(error, 'sqlite_errorcode', None)  # ab Python 3.11
+    if code is not None:
+        return code in (SQLITE_CONSTRAINT_UNIQUE, SQLITE_CONSTRAINT_PRIMARYKEY)
+    return str(error).startswith('UNIQUE constraint failed')
+
+
+def pool_stats():
+    """
+    Returns:
+        Dict {'sqlite': {'in_use', 'idle', 'waiting'}} (alle Threads dieses Prozesses)
+    """
+    with _stats_lock:
+        return {'sqlite': {'in_use': _in_use, 'idle': max(_open - _in_use, 0), 'waiting': 0}}
+
+
+def get_db_connection(readonly=False):
+    """
+    Args:
+        readonly: ohne Bedeutung (keine Replicas; WAL erlaubt parallele Leser)
+
+    Returns:
+        SQLiteConnection (Interface wie mysql.connector-Verbindung)
+    """
+    global _in_use
+    idle = getattr(_local, 'idle', None)
+    if idle is None:
+        idle = _local.idle = []
+    connection = idle.pop() if idle else _connect()
+    with _stats_lock:
+        _in_use += 1
+    return SQLiteConnection(connection, idle)
+
+
+def execute_prepared(conn, query, params=(), dictionary=False):
+    """
+    Wie mysql_backend.execute_prepared
+
+    sqlite3 hält kompilierte Anweisungen ohnehin pro Verbindung im Cache
+    (cached_statements) → normaler Cursor, Aufrufer schliesst ihn nicht.
+    """
+    cursor = conn.cursor(dictionary=dictionary)
+    cursor.execute(query, params)
+    return cursor
@@ -4,30 +4,99 @@ Transaction Model - Angepasst an DB-Struktur
 DB-Struktur:
 - id INT
 - user_id INT
-- amount DECIMAL(12,2)
+- amount DECIMAL(12,2)  (im Objekt als Money, ganze Rappen)
 - type ENUM('income','expense')
 - description VARCHAR(255)
 - date DATETIME (nicht nur DATE!)
 - category_id INT (Foreign Key zu categories, kann NULL sein)
+- recurring_id INT NULL + occurrence DATE NULL (UNIQUE, nur bei wiederkehrenden Buchungen)
+
+Alte Transaktionen können nach transactions_archive verschoben werden
+(siehe models/archive.py); Summen und Salden berücksichtigen sie weiterhin.
+
+Listen-Abfragen lesen nur transactions (ohne JOIN auf categories); Name und
+Farbe der Kategorie kommen aus dem Kategorie-Cache (Category.by_id).
 """
-from datetime import datetime
-from db_config import get_db_connection
+from datetime import datetime, timedelta
+from models.storage import get_db_connection, execute_prepared, OK, NOT_FOUND, REFERENCE_NOT_FOUND, ERROR
+from collections import defaultdict
+from models.archive import TransactionArchive, ARCHIVE_COLUMNS
+from models.balance_checkpoint import BalanceCheckpoint, _as_datetime
+from models.balance_index import BalanceIndex, signed_amount, _to_date
+from models.budget import Budget
+from models.category import Category
+from models.ledger_version import LedgerVersion
+from utils.money import Money, ZERO
+
+
+def _apply_ledger_changes(cursor, user_id, removed=(), added=()):
+    """
+    Hält abgeleitete Daten (Checkpoints, Fenwick-Baum, Budget-Zähler,
+    Datenstand) nach einem Schreibvorgang aktuell
+
+    Läuft auf dem Cursor des Aufrufers → gleiche DB-Transaktion wie die Änderung.
+
+    Args:
+        cursor: offener Cursor
+        user_id: User-ID
+        removed: Zeilen (Dicts mit amount, type, date, category_id), die wegfallen
+        added: Zeilen, die neu dazukommen
+    """
+    dates = [_as_datetime(row['date']) for row in list(removed) + list(added)]
+    if dates:
+        BalanceCheckpoint.invalidate_from(cursor, user_id, min(dates))
+
+    day_deltas = defaultdict(int)
+    for row in removed:
+        day_deltas[_to_date(row['date'])] -= signed_amount(row)
+    for row in added:
+        day_deltas[_to_date(row['date'])] += signed_amount(row)
+    BalanceIndex.apply(cursor, user_id, day_deltas)
+
+    Budget.apply(cursor, user_id, Budget.deltas_for(removed, added))
+    LedgerVersion.bump(cursor, user_id)
+
+
+def _attach_categories(user_id, rows):
+    """
+    Ergänzt category_name/category_color aus dem Kategorie-Cache (statt JOIN)
+
+    Fehlt eine Kategorie im Cache (z.B. in einem anderen Prozess angelegt),
+    wird einmal neu geladen.
+
+    Args:
+        rows: Liste von Dicts mit category_id (werden verändert)
+
+    Returns:
+        rows
+    """
+    categories = Category.by_id(user_id)
+    if any(row['category_id'] and row['category_id'] not in categories for row in rows):
+        Category.invalidate(user_id)
+        categories = Category.by_id(user_id)
+    for row in rows:
+        category = categories.get(row['category_id'])
+        row['category_name'] = category.name if category else None
+        row['category_color'] = category.color if category else None
+    return rows
 
 class Transaction:
     """Transaction Model für Transaktionsverwaltung"""
     
     def __init__(self, id=None, user_id=None, amount=None, transaction_type=None,
                  description=None, date=None, category_id=None, category_name=None, 
-                 category_color=None):
+                 category_color=None, balance=None, archived=False):
         self.id = id
         self.user_id = user_id
-        self.amount = amount
+        self.amount = Money.of(amount) if amount is not None else None
         self.transaction_type = transaction_type
         self.description = description
         self.date = date
         self.category_id = category_id
-        self.category_name = category_name  # Wird bei JOIN gefüllt
-        self.category_color = category_color  # Wird bei JOIN gefüllt
+        self.category_name = category_name  # aus dem Kategorie-Cache
+        self.category_color = category_color  # aus dem Kategorie-Cache
+        self.balance = Money.of(balance) if balance is not None else None  # Laufender Saldo (nur bei get_page_with_balance)
+        self.archived = archived  # aus transactions_archive (nur bei include_archived)
     
     @staticmethod
     def create(user_id, amount, transaction_type, description, category_id=None, date=None):
@@ -36,7 +105,7 @@ class Transaction:
         
         Args:
             user_id: User-ID
-            amount: Betrag (Decimal)
+            amount: Betrag (Money, Decimal oder Text)
             transaction_type: 'income' oder 'expense'
             description: Beschreibung
             category_id: Kategorie-ID (optional, kann NULL sein)
@@ -51,12 +120,17 @@ class Transaction:
             
             if date is None:
                 date = datetime.now()
+            date = _as_datetime(date)  # DATETIME-Spalte: date → 00:00 wie MySQL (auch in SQLite)
             
             query = """
                 INSERT INTO transactions (user_id, amount, type, description, date, category_id)
                 VALUES (%s, %s, %s, %s, %s, %s)
             """
-            cursor.execute(query, (user_id, amount, transaction_type, description, date, category_id))
+            amount = Money.of(amount)
+            cursor.execute(query, (user_id, amount.to_decimal(), transaction_type, description, date, category_id))
+            _apply_ledger_changes(cursor, user_id, added=[{
+                'amount': amount, 'type': transaction_type, 'date': date, 'category_id': category_id
+            }])
             conn.commit()
             
             cursor.close()
@@ -67,35 +141,446 @@ class Transaction:
             return False
     
     @staticmethod
-    def get_all_by_user(user_id):
+    def bulk_create(cursor, user_id, rows):
         """
-        Holt alle Transaktionen eines Users MIT Kategorie-Info
+        Fügt viele Transaktionen eines Users auf einmal ein
         
-        WICHTIG: Macht LEFT JOIN mit categories Tabelle!
+        executemany() mit INSERT ... VALUES wird vom Connector zu EINEM
+        mehrzeiligen INSERT zusammengefasst. Läuft auf dem Cursor des Aufrufers,
+        der auch committet.
         
+        Args:
+            cursor: offener Cursor
+            user_id: User-ID
+            rows: Liste von Dicts mit amount, type, description, date, category_id
+                  und optional recurring_id, occurrence
+                  
         Returns:
-            Liste von Transaction-Objekten (mit category_name, category_color)
+            Anzahl eingefügter Zeilen
+        """
+        if not rows:
+            return 0
+        
+        query = """
+            INSERT INTO transactions
+                (user_id, amount, type, description, date, category_id, recurring_id, occurrence)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        cursor.executemany(query, [
+            (user_id, Money.of(row['amount']).to_decimal(), row['type'], row.get('description'), _as_datetime(row['date']),
+             row.get('category_id'), row.get('recurring_id'), row.get('occurrence'))
+            for row in rows
+        ])
+        _apply_ledger_changes(cursor, user_id, added=rows)
+        return len(rows)
+    
+    @staticmethod
+    def import_rows(user_id, rows, before_commit=None):
+        """
+        Importiert viele (bereits validierte) Transaktionen in EINER DB-Transaktion
+        
+        Args:
+            user_id: User-ID
+            rows: Liste von Dicts (siehe bulk_create)
+            before_commit: optional, Funktion(cursor) - läuft in derselben
+                           DB-Transaktion (z.B. Job-Fortschritt speichern);
+                           liefert sie False, wird alles zurückgerollt
+            
+        Returns:
+            Anzahl importierter Zeilen (0 bei Fehler)
         """
         try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            count = Transaction.bulk_create(cursor, user_id, rows)
+            if before_commit and before_commit(cursor) is False:
+                conn.rollback()
+                cursor.close()
+                conn.close()
+                return 0
+            conn.commit()
+            
+            cursor.close()
+            conn.close()
+            return count
+        except Exception as e:
+            print(f"Error importing transactions: {e}")
+            return 0
+    
+    @staticmethod
+    def iter_chunks(user_id, chunk_size=1000):
+        """
+        Liefert alle Transaktionen eines Users in Blöcken (Keyset-Pagination über id)
+        
+        Jeder Block ist eine eigene kurze Abfrage → kein riesiges Resultset im Speicher.
+        
+        Yields:
+            Listen von Dicts (Rohzeilen inkl. category_name, category_color)
+        """
+        last_id = 0
+        while True:
             conn = get_db_connection()
             cursor = conn.cursor(dictionary=True)
             
             query = """
-                SELECT 
-                    t.*,
-                    c.name as category_name,
-                    c.color as category_color
-                FROM transactions t
-                LEFT JOIN categories c ON t.category_id = c.id
-                WHERE t.user_id = %s
-                ORDER BY t.date DESC, t.id DESC
+                SELECT * FROM transactions
+                WHERE user_id = %s AND id > %s
+                ORDER BY id
+                LIMIT %s
             """
-            cursor.execute(query, (user_id,))
-            transactions_data = cursor.fetchall()
+            cursor.execute(query, (user_id, last_id, chunk_size))
+            rows = cursor.fetchall()
+            
+            cursor.close()
+            conn.close()
+            
+            rows = _attach_categories(user_id, rows)  # nach close(): nie zwei Verbindungen gleichzeitig
+            if not rows:
+                return
+            yield rows
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1]['id']
+    
+    @staticmethod
+    def recategorize_chunk(user_id, after, categorize, chunk_size=1000, only_uncategorized=True):
+        """
+        Ordnet einen Block Transaktionen neu zu - eine kurze DB-Transaktion
+        
+        Liest bis zu chunk_size Zeilen nach `after` (Keyset über date, id →
+        Index idx_tx_user_date, sperrt nur Zeilen dieses Users), bestimmt die
+        neue Kategorie pro Zeile und schreibt je Ziel-Kategorie EIN
+        UPDATE ... WHERE id IN (...). Budget-Zähler werden mitgeführt.
+        
+        Args:
+            user_id: User-ID
+            after: (date, id) der letzten Zeile des vorigen Blocks, None = Anfang
+            categorize: Funktion(Zeile) → category_id oder None (unverändert lassen)
+            chunk_size: Zeilen pro Block
+            only_uncategorized: nur Transaktionen ohne Kategorie
+            
+        Returns:
+            (after für den nächsten Block oder None wenn fertig, Anzahl gelesen, Anzahl geändert)
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+            
+            conditions = ["user_id = %s"]
+            params = [user_id]
+            if after is not None:
+                conditions.append("(date > %s OR (date = %s AND id > %s))")
+                params.extend([after[0], after[0], after[1]])
+            if only_uncategorized:
+                conditions.append("category_id IS NULL")
+            cursor.execute(
+                f"""
+                SELECT id, amount, type, description, date, category_id FROM transactions
+                WHERE {' AND '.join(conditions)}
+                ORDER BY date, id
+                LIMIT %s
+                FOR UPDATE
+                """,
+                (*params, chunk_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                cursor.close()
+                conn.close()
+                return None, 0, 0
+            
+            changes = defaultdict(list)  # neue Kategorie → Zeilen
+            for row in rows:
+                category_id = categorize(row)
+                if category_id and category_id != row['category_id']:
+                    changes[category_id].append(row)
+            
+            # Datumsbereich des Blocks → bei partitionierter Tabelle nur betroffene Partitionen
+            first_date, last_date = rows[0]['date'], rows[-1]['date']
+            for category_id, changed in changes.items():
+                placeholders = ', '.join(['%s'] * len(changed))
+                cursor.execute(
+                    f"UPDATE transactions SET category_id = %s "
+                    f"WHERE user_id = %s AND date BETWEEN %s AND %s AND id IN ({placeholders})",
+                    (category_id, user_id, first_date, last_date, *[row['id'] for row in changed])
+                )
+            
+            removed = [row for changed in changes.values() for row in changed]
+            added = [dict(row, category_id=category_id) for category_id, changed in changes.items() for row in changed]
+            Budget.apply(cursor, user_id, Budget.deltas_for(removed, added))
+            if removed:
+                LedgerVersion.bump(cursor, user_id)
+            conn.commit()
             
             cursor.close()
             conn.close()
             
+            after = (last_date, rows[-1]['id'])
+            return (after if len(rows) == chunk_size else None), len(rows), len(removed)
+        except Exception as e:
+            print(f"Error recategorizing transactions: {e}")
+            return None, 0, 0
+
+    @staticmethod
+    def ledger_columns(user_id, since=None):
+        """
+        Nur die Spalten für Auswertungen, spaltenweise (für NumPy)
+
+        Tupel-Cursor, keine Transaction-Objekte, kein JOIN; Bereich über
+        idx_tx_user_date.
+
+        Args:
+            user_id: User-ID
+            since: optional, nur Transaktionen ab diesem Datum
+
+        Returns:
+            (days 'YYYY-MM-DD', cents, is_expense, category_ids) - je ein Tupel
+            gleicher Länge (category_id 0 = ohne Kategorie), oder None bei Fehler
+        """
+        try:
+            conn = get_db_connection(readonly=True)
+            cursor = conn.cursor()
+
+            # Datum als Text 'YYYY-MM-DD' und Betrag in Rappen: NumPy wandelt beides
+            # ohne datetime-/Decimal-Objekte um
+            query = (
+                "SELECT SUBSTR(date, 1, 10), CAST(amount * 100 AS SIGNED), "
+                "type = 'expense', COALESCE(category_id, 0) "
+                "FROM transactions WHERE user_id = %s"
+            )
+            params = [user_id]
+            if since is not None:
+                query += " AND date >= %s"
+                params.append(_as_datetime(since))
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+            cursor.close()
+            conn.close()
+            return tuple(zip(*rows)) if rows else ((), (), (), ())
+        except Exception as e:
+            print(f"Error getting ledger columns: {e}")
+            return None
+
+    @staticmethod
+    def daily_spending(user_id, since, until):
+        """
+        Ausgaben pro Tag und Kategorie, in SQL aggregiert (für NumPy)
+
+        Ohne Buchungen aus Vorlagen (recurring_id gesetzt) - die plant die
+        Prognose separat. Bereich über idx_tx_user_date.
+
+        Args:
+            since, until: Tage (beide inklusive)
+
+        Returns:
+            (days 'YYYY-MM-DD', category_ids, cents) - je ein Tupel gleicher
+            Länge (category_id 0 = ohne Kategorie), oder None bei Fehler
+        """
+        try:
+            conn = get_db_connection(readonly=True)
+            cursor = conn.cursor()
+
+            cursor.execute(
+                """
+                SELECT SUBSTR(date, 1, 10), COALESCE(category_id, 0), CAST(SUM(amount) * 100 AS SIGNED)
+                FROM transactions
+                WHERE user_id = %s AND date >= %s AND date < %s
+                  AND type = 'expense' AND recurring_id IS NULL
+                GROUP BY SUBSTR(date, 1, 10), COALESCE(category_id, 0)
+                """,
+                (user_id, _as_datetime(since), _as_datetime(until + timedelta(days=1)))
+            )
+            rows = cursor.fetchall()
+
+            cursor.close()
+            conn.close()
+            return tuple(zip(*rows)) if rows else ((), (), ())
+        except Exception as e:
+            print(f"Error getting daily spending: {e}")
+            return None
+
+    @staticmethod
+    def users_active_since(since):
+        """
+        User mit Transaktionen ab `since` (je ein Index-Lookup pro User)
+
+        Returns:
+            Liste von User-IDs
+        """
+        try:
+            conn = get_db_connection(readonly=True)
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT u.id FROM users u
+                WHERE EXISTS (SELECT 1 FROM transactions t WHERE t.user_id = u.id AND t.date >= %s)
+                ORDER BY u.id
+                """,
+                (_as_datetime(since),)
+            )
+            user_ids = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+            conn.close()
+            return user_ids
+        except Exception as e:
+            print(f"Error getting active users: {e}")
+            return []
+
+    @staticmethod
+    def count_in_category(user_id, category_id):
+        """
+        Anzahl Transaktionen einer Kategorie (nur Index idx_tx_user_cat)
+
+        Returns:
+            Anzahl (0 bei Fehler)
+        """
+        try:
+            conn = get_db_connection(readonly=True)
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT COUNT(*) FROM transactions WHERE user_id = %s AND category_id = %s",
+                (user_id, category_id)
+            )
+            count = cursor.fetchone()[0]
+            cursor.close()
+            conn.close()
+            return count
+        except Exception as e:
+            print(f"Error counting transactions: {e}")
+            return 0
+
+    @staticmethod
+    def move_category_chunk(user_id, category_id, new_category_id, chunk_size=1000):
+        """
+        Hängt einen Block Transaktionen in eine andere Kategorie um - eine kurze DB-Transaktion
+
+        Liest die ältesten chunk_size Zeilen der Kategorie über idx_tx_user_cat
+        (user_id, category_id, date, id) und sperrt nur diese. Umgehängte Zeilen
+        fallen aus der Bedingung → der nächste Aufruf macht ohne Keyset weiter.
+        Die Ziel-Kategorie muss dem User gehören (EXISTS im UPDATE selbst),
+        Budget-Zähler werden mitgeführt.
+
+        Args:
+            user_id: User-ID
+            category_id: bisherige Kategorie
+            new_category_id: Ziel-Kategorie (None = ohne Kategorie)
+            chunk_size: Zeilen pro Block
+
+        Returns:
+            (Ergebnis, Anzahl umgehängter Zeilen): (OK, n) - n = 0 heisst fertig,
+            (REFERENCE_NOT_FOUND, 0) wenn das Ziel nicht dem User gehört, (ERROR, 0)
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor(dictionary=True)
+
+            cursor.execute(
+                """
+                SELECT id, amount, type, date, category_id FROM transactions
+                WHERE user_id = %s AND category_id = %s
+                ORDER BY date, id
+                LIMIT %s
+                FOR UPDATE
+                """,
+                (user_id, category_id, chunk_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                cursor.close()
+                conn.close()
+                return OK, 0
+
+            placeholders = ', '.join(['%s'] * len(rows))
+            cursor.execute(
+                f"""
+                UPDATE transactions SET category_id = %s
+                WHERE user_id = %s AND category_id = %s AND date BETWEEN %s AND %s AND id IN ({placeholders})
+                  AND (%s IS NULL OR EXISTS (SELECT 1 FROM categories WHERE id = %s AND user_id = %s))
+                """,
+                (new_category_id, user_id, category_id, rows[0]['date'], rows[-1]['date'],
+                 *[row['id'] for row in rows], new_category_id, new_category_id, user_id)
+            )
+            if cursor.rowcount == 0:
+                # Zeilen sind gesperrt und vorhanden → nur die Ziel-Kategorie kann fehlen
+                conn.rollback()
+                cursor.close()
+                conn.close()
+                return REFERENCE_NOT_FOUND, 0
+
+            added = [dict(row, category_id=new_category_id) for row in rows]
+            Budget.apply(cursor, user_id, Budget.deltas_for(rows, added))
+            LedgerVersion.bump(cursor, user_id)
+            conn.commit()
+
+            cursor.close()
+            conn.close()
+            return OK, len(rows)
+        except Exception as e:
+            print(f"Error moving transactions to category: {e}")
+            return ERROR, 0
+
+    @staticmethod
+    def existing_occurrences(cursor, recurring_ids, since):
+        """
+        Bereits gebuchte Ausführungen wiederkehrender Transaktionen
+        
+        Nutzt den UNIQUE KEY (recurring_id, occurrence).
+        Erwartet einen dictionary=True Cursor.
+        
+        Returns:
+            Set von (recurring_id, occurrence)
+        """
+        if not recurring_ids:
+            return set()
+        placeholders = ', '.join(['%s'] * len(recurring_ids))
+        cursor.execute(
+            f"SELECT recurring_id, occurrence FROM transactions "
+            f"WHERE recurring_id IN ({placeholders}) AND occurrence >= %s",
+            (*recurring_ids, since)
+        )
+        return {(row['recurring_id'], row['occurrence']) for row in cursor.fetchall()}
+    
+    @staticmethod
+    def get_all_by_user(user_id, include_archived=False):
+        """
+        Holt alle Transaktionen eines Users MIT Kategorie-Info
+        
+        Kategorie-Name/-Farbe aus dem Kategorie-Cache (kein JOIN).
+        
+        Args:
+            user_id: User-ID
+            include_archived: True → auch archivierte Transaktionen (.archived = True)
+        
+        Returns:
+            Liste von Transaction-Objekten (mit category_name, category_color)
+        """
+        try:
+            conn = get_db_connection(readonly=True)
+            
+            if include_archived:
+                query = f"""
+                    SELECT {ARCHIVE_COLUMNS}, 0 AS archived FROM transactions WHERE user_id = %s
+                    UNION ALL
+                    SELECT {ARCHIVE_COLUMNS}, 1 AS archived FROM transactions_archive WHERE user_id = %s
+                    ORDER BY date DESC, id DESC
+                """
+                params = (user_id, user_id)
+            else:
+                query = """
+                    SELECT * FROM transactions
+                    WHERE user_id = %s
+                    ORDER BY date DESC, id DESC
+                """
+                params = (user_id,)
+            cursor = execute_prepared(conn, query, params, dictionary=True)
+            transactions_data = cursor.fetchall()
+            
+            conn.close()
+            
+            _attach_categories(user_id, transactions_data)
+            
             transactions = []
             for data in transactions_data:
                 transactions.append(Transaction(
@@ -107,7 +592,8 @@ class Transaction:
                     date=data['date'],
                     category_id=data.get('category_id'),
                     category_name=data.get('category_name'),
-                    category_color=data.get('category_color')
+                    category_color=data.get('category_color'),
+                    archived=bool(data.get('archived'))
                 ))
             
             return transactions
@@ -116,33 +602,100 @@ class Transaction:
             return []
     
     @staticmethod
-    def get_by_id(transaction_id, user_id):
+    def get_page_with_balance(user_id, page=1, per_page=50):
         """
-        Holt spezifische Transaktion (mit Sicherheitscheck!)
+        Holt eine Seite Transaktionen MIT laufendem Saldo pro Zeile
+        
+        Der Saldo innerhalb der Seite wird per Window-Function in MySQL berechnet
+        (SUM() OVER), der Startsaldo vor der Seite kommt aus den Checkpoints
+        (siehe BalanceCheckpoint) → kein Durchlauf über alle Transaktionen.
         
+        Args:
+            user_id: User-ID
+            page: Seite (1-basiert), None = alle Transaktionen
+            per_page: Einträge pro Seite
+            
         Returns:
-            Transaction-Objekt oder None
+            Liste von Transaction-Objekten (neueste zuerst, mit .balance)
         """
         try:
             conn = get_db_connection()
             cursor = conn.cursor(dictionary=True)
             
-            query = """
+            limit = ""
+            params = [user_id]
+            if page is not None:
+                limit = "LIMIT %s OFFSET %s"
+                params.extend([per_page, (max(page, 1) - 1) * per_page])
+            
+            query = f"""
                 SELECT 
-                    t.*,
-                    c.name as category_name,
-                    c.color as category_color
-                FROM transactions t
-                LEFT JOIN categories c ON t.category_id = c.id
-                WHERE t.id = %s AND t.user_id = %s
+                    p.*,
+                    SUM(CASE WHEN p.type = 'income' THEN p.amount ELSE -p.amount END)
+                        OVER (ORDER BY p.date, p.id) AS running_total
+                FROM (
+                    SELECT * FROM transactions
+                    WHERE user_id = %s
+                    ORDER BY date DESC, id DESC
+                    {limit}
+                ) p
+                ORDER BY p.date DESC, p.id DESC
             """
-            cursor.execute(query, (transaction_id, user_id))
-            data = cursor.fetchone()
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
             
             cursor.close()
             conn.close()
             
+            if not rows:
+                return []
+            _attach_categories(user_id, rows)
+            
+            # Saldo vor der ältesten Zeile dieser Seite
+            oldest = rows[-1]
+            if page is None or (page <= 1 and len(rows) < per_page):
+                base = TransactionArchive.opening_balance(user_id)
+            else:
+                base = BalanceCheckpoint.balance_before(user_id, oldest['date'], oldest['id'])
+            
+            return [
+                Transaction(
+                    id=data['id'],
+                    user_id=data['user_id'],
+                    amount=data['amount'],
+                    transaction_type=data['type'],
+                    description=data.get('description'),
+                    date=data['date'],
+                    category_id=data.get('category_id'),
+                    category_name=data.get('category_name'),
+                    category_color=data.get('category_color'),
+                    balance=base + Money.of(data['running_total'])
+                )
+                for data in rows
+            ]
+        except Exception as e:
+            print(f"Error getting transactions with balance: {e}")
+            return []
+    
+    @staticmethod
+    def get_by_id(transaction_id, user_id):
+        """
+        Holt spezifische Transaktion (mit Sicherheitscheck!)
+        
+        Returns:
+            Transaction-Objekt oder None
+        """
+        try:
+            conn = get_db_connection()
+            
+            query = "SELECT * FROM transactions WHERE id = %s AND user_id = %s"
+            cursor = execute_prepared(conn, query, (transaction_id, user_id), dictionary=True)
+            data = cursor.fetchone()
+            
+            conn.close()
+            
             if data:
+                _attach_categories(user_id, [data])
                 return Transaction(
                     id=data['id'],
                     user_id=data['user_id'],
@@ -159,57 +712,102 @@ class Transaction:
             print(f"Error getting transaction: {e}")
             return None
     
+    @staticmethod
+    def _fetch_for_update(cursor, transaction_id, user_id):
+        """
+        Liest alte Werte einer Transaktion und sperrt die Zeile (FOR UPDATE)
+
+        Erwartet einen dictionary=True Cursor.
+
+        Returns:
+            Dict mit amount, type, date, category_id oder None
+        """
+        cursor.execute(
+            """
+            SELECT amount, type, date, category_id FROM transactions
+            WHERE id = %s AND user_id = %s
+            FOR UPDATE
+            """,
+            (transaction_id, user_id)
+        )
+        return cursor.fetchone()
+    
     @staticmethod
     def update(transaction_id, user_id, amount=None, transaction_type=None,
                description=None, date=None, category_id=None):
         """
         Aktualisiert Transaktion
         
-        WICHTIG: category_id kann auf None gesetzt werden!
+        WICHTIG: category_id = 0 entfernt die Kategorie (None = unverändert)!
+        Eine neue Kategorie muss dem User gehören (EXISTS im UPDATE selbst).
         
         Returns:
-            True bei Erfolg, False bei Fehler
+            OK, NOT_FOUND (keine Transaktion dieses Users),
+            REFERENCE_NOT_FOUND (Kategorie gehört nicht dem User) oder ERROR
         """
+        if (amount is None and transaction_type is None and description is None
+                and date is None and category_id is None):
+            return ERROR
+        
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
+            cursor = conn.cursor(dictionary=True)
             
-            updates = []
-            values = []
+            # Alte Werte sperren + merken (für abgeleitete Daten)
+            old = Transaction._fetch_for_update(cursor, transaction_id, user_id)
+            if old is None:
+                cursor.close()
+                conn.close()
+                return NOT_FOUND
+            
+            # Immer dieselbe Anweisung (NULL = Feld unverändert) → wird nur
+            # einmal pro Verbindung vorbereitet statt je Feld-Kombination neu
+            query = """
+                UPDATE transactions SET
+                    amount = COALESCE(%s, amount),
+                    type = COALESCE(%s, type),
+                    description = COALESCE(%s, description),
+                    date = COALESCE(%s, date),
+                    category_id = IF(%s, %s, category_id)
+                WHERE id = %s AND user_id = %s AND date = %s
+                  AND (%s IS NULL OR EXISTS (SELECT 1 FROM categories WHERE id = %s AND user_id = %s))
+            """
+            # date = alter Wert → bei partitionierter Tabelle nur eine Partition
+            new_category = category_id or None  # 0 → Kategorie entfernen
+            update_cursor = execute_prepared(conn, query, (
+                Money.of(amount).to_decimal() if amount is not None else None,
+                transaction_type, description, _as_datetime(date),
+                1 if category_id is not None else 0,
+                new_category,
+                transaction_id, user_id, old['date'],
+                new_category, new_category, user_id
+            ))
+            if update_cursor.rowcount == 0:
+                # Zeile ist gesperrt und vorhanden → nur die Kategorie kann scheitern
+                conn.rollback()
+                cursor.close()
+                conn.close()
+                return REFERENCE_NOT_FOUND
             
+            new = dict(old)
             if amount is not None:
-                updates.append("amount = %s")
-                values.append(amount)
+                new['amount'] = amount
             if transaction_type is not None:
-                updates.append("type = %s")
-                values.append(transaction_type)
-            if description is not None:
-                updates.append("description = %s")
-                values.append(description)
+                new['type'] = transaction_type
             if date is not None:
-                updates.append("date = %s")
-                values.append(date)
-            if category_id is not None or category_id == 0:  # Explizit None setzen erlauben
-                updates.append("category_id = %s")
-                values.append(category_id if category_id != 0 else None)
-            
-            if not updates:
-                return False
-            
-            values.extend([transaction_id, user_id])
-            query = f"UPDATE transactions SET {', '.join(updates)} WHERE id = %s AND user_id = %s"
-            
-            cursor.execute(query, tuple(values))
+                new['date'] = date
+            if category_id is not None or category_id == 0:
+                new['category_id'] = category_id if category_id != 0 else None
+            _apply_ledger_changes(cursor, user_id, removed=[old], added=[new])
             conn.commit()
             
-            affected = cursor.rowcount
             cursor.close()
             conn.close()
             
-            return affected > 0
+            return OK
         except Exception as e:
             print(f"Error updating transaction: {e}")
-            return False
+            return ERROR
     
     @staticmethod
     def delete(transaction_id, user_id):
@@ -217,52 +815,70 @@ class Transaction:
         Löscht Transaktion
         
         Returns:
-            True bei Erfolg, False bei Fehler
+            OK, NOT_FOUND (keine Transaktion dieses Users) oder ERROR
         """
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
+            cursor = conn.cursor(dictionary=True)
             
-            query = "DELETE FROM transactions WHERE id = %s AND user_id = %s"
-            cursor.execute(query, (transaction_id, user_id))
+            old = Transaction._fetch_for_update(cursor, transaction_id, user_id)
+            if old is None:
+                cursor.close()
+                conn.close()
+                return NOT_FOUND
+            
+            query = "DELETE FROM transactions WHERE id = %s AND user_id = %s AND date = %s"
+            cursor.execute(query, (transaction_id, user_id, old['date']))
+            
+            _apply_ledger_changes(cursor, user_id, removed=[old])
             conn.commit()
             
-            affected = cursor.rowcount
             cursor.close()
             conn.close()
             
-            return affected > 0
+            return OK
         except Exception as e:
             print(f"Error deleting transaction: {e}")
-            return False
+            return ERROR
     
     @staticmethod
     def get_summary_by_user(user_id):
         """
         Erstellt Zusammenfassung: Einnahmen, Ausgaben, Saldo
         
+        Archivierte Transaktionen zählen über archive_totals mit (wenige Zeilen).
+        
         Returns:
-            Dict mit total_income, total_expenses, balance
+            Dict mit total_income, total_expenses, balance (Money)
         """
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
+            conn = get_db_connection(readonly=True)
             
             query = """
                 SELECT 
-                    COALESCE(SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END), 0) as total_income,
-                    COALESCE(SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END), 0) as total_expenses
-                FROM transactions 
-                WHERE user_id = %s
+                    COALESCE(SUM(x.income), 0) as total_income,
+                    COALESCE(SUM(x.expenses), 0) as total_expenses
+                FROM (
+                    SELECT
+                        SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END) AS income,
+                        SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END) AS expenses
+                    FROM transactions 
+                    WHERE user_id = %s
+                    UNION ALL
+                    SELECT
+                        SUM(CASE WHEN type = 'income' THEN total ELSE 0 END),
+                        SUM(CASE WHEN type = 'expense' THEN total ELSE 0 END)
+                    FROM archive_totals
+                    WHERE user_id = %s
+                ) x
             """
-            cursor.execute(query, (user_id,))
+            cursor = execute_prepared(conn, query, (user_id, user_id), dictionary=True)
             result = cursor.fetchone()
             
-            cursor.close()
             conn.close()
             
-            total_income = float(result['total_income']) if result else 0
-            total_expenses = float(result['total_expenses']) if result else 0
+            total_income = Money.of(result['total_income']) if result else ZERO
+            total_expenses = Money.of(result['total_expenses']) if result else ZERO
             
             return {
                 'total_income': total_income,
@@ -271,7 +887,30 @@ class Transaction:
             }
         except Exception as e:
             print(f"Error getting summary: {e}")
-            return {'total_income': 0, 'total_expenses': 0, 'balance': 0}
+            return {'total_income': ZERO, 'total_expenses': ZERO, 'balance': ZERO}
+    
+    @staticmethod
+    def get_balance_as_of(user_id, date):
+        """
+        Saldo am Ende eines Tages (für Kontoauszug / Abgleich)
+        
+        O(log n) über den Fenwick-Baum (siehe BalanceIndex),
+        statt SUM() über alle Transaktionen bis zu diesem Datum.
+        
+        Returns:
+            Money
+        """
+        return BalanceIndex.balance_as_of(user_id, date)
+    
+    @staticmethod
+    def get_balance_between(user_id, start_date, end_date):
+        """
+        Netto-Veränderung zwischen zwei Tagen (beide inklusive), O(log n)
+        
+        Returns:
+            Money
+        """
+        return BalanceIndex.balance_between(user_id, start_date, end_date)
     
     @staticmethod
     def get_by_category(user_id):
@@ -280,34 +919,42 @@ class Transaction:
         
         WICHTIG: Macht JOIN mit categories Tabelle
         
+        Archivierte Ausgaben kommen aus archive_totals (category_id 0 = ohne).
+        
         Returns:
-            Dict mit Kategorie-Name → Betrag
-            Beispiel: {'Lebensmittel': 150.00, 'Transport': 50.00}
+            Dict mit Kategorie-Name → {'total': Money, 'color'}
+            Beispiel: {'Lebensmittel': {'total': Money('150.00'), 'color': '#FF6384'}}
         """
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
+            conn = get_db_connection(readonly=True)
             
             query = """
                 SELECT 
                     COALESCE(c.name, 'Ohne Kategorie') as category_name,
                     c.color as category_color,
-                    SUM(t.amount) as total
-                FROM transactions t
-                LEFT JOIN categories c ON t.category_id = c.id
-                WHERE t.user_id = %s AND t.type = 'expense'
-                GROUP BY t.category_id, c.name, c.color
+                    SUM(x.total) as total
+                FROM (
+                    SELECT category_id, SUM(amount) AS total
+                    FROM transactions
+                    WHERE user_id = %s AND type = 'expense'
+                    GROUP BY category_id
+                    UNION ALL
+                    SELECT category_id, total
+                    FROM archive_totals
+                    WHERE user_id = %s AND type = 'expense'
+                ) x
+                LEFT JOIN categories c ON x.category_id = c.id
+                GROUP BY c.id, c.name, c.color
             """
-            cursor.execute(query, (user_id,))
+            cursor = execute_prepared(conn, query, (user_id, user_id), dictionary=True)
             results = cursor.fetchall()
             
-            cursor.close()
             conn.close()
             
             # Gibt Dict zurück mit Name, Color UND Total
             return {
                 row['category_name']: {
-                    'total': float(row['total']),
+                    'total': Money.of(row['total']),
                     'color': row.get('category_color', '#999999')
                 }
                 for row in results
@@ -7,7 +7,7 @@ DB-Struktur:
 - password VARCHAR(255)  (gehashtes Passwort)
 """
 from werkzeug.security import generate_password_hash, check_password_hash
-from db_config import get_db_connection
+from models.storage import get_db_connection, execute_prepared, OK, NOT_FOUND, ERROR
 
 class User:
     """User Model für Benutzerverwaltung"""
@@ -55,14 +55,12 @@ class User:
             User-Objekt oder None
         """
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
+            conn = get_db_connection(readonly=True)
             
             query = "SELECT * FROM users WHERE username = %s"
-            cursor.execute(query, (username,))
+            cursor = execute_prepared(conn, query, (username,), dictionary=True)
             user_data = cursor.fetchone()
             
-            cursor.close()
             conn.close()
             
             if user_data:
@@ -85,14 +83,12 @@ class User:
             User-Objekt oder None
         """
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor(dictionary=True)
+            conn = get_db_connection(readonly=True)
             
             query = "SELECT * FROM users WHERE id = %s"
-            cursor.execute(query, (user_id,))
+            cursor = execute_prepared(conn, query, (user_id,), dictionary=True)
             user_data = cursor.fetchone()
             
-            cursor.close()
             conn.close()
             
             if user_data:
@@ -128,16 +124,46 @@ class User:
         """
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
             
             query = "SELECT COUNT(*) FROM users WHERE username = %s"
-            cursor.execute(query, (username,))
+            cursor = execute_prepared(conn, query, (username,))
             count = cursor.fetchone()[0]
             
-            cursor.close()
             conn.close()
             
             return count > 0
         except Exception as e:
             print(f"Error checking username: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    @staticmethod
+    def delete(user_id):
+        """
+        Löscht User samt allen Daten
+        
+        Fast alle Tabellen hängen per ON DELETE CASCADE am User. transactions
+        nicht mehr, sobald sie partitioniert ist (setup_db.py entfernt dort
+        die Foreign Keys) → Transaktionen explizit löschen, in derselben
+        DB-Transaktion wie den User.
+        
+        Returns:
+            OK, NOT_FOUND oder ERROR
+        """
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute("DELETE FROM transactions WHERE user_id = %s", (user_id,))
+            cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+            if cursor.rowcount == 0:
+                cursor.close()
+                conn.close()
+                return NOT_FOUND
+            conn.commit()
+            
+            cursor.close()
+            conn.close()
+            return OK
+        except Exception as e:
+            print(f"Error deleting user: {e}")
+            return ERROR
@@ -1,9 +1,15 @@
 """
 API Routes - RESTful API Endpunkte
 """
-from flask import Blueprint, request, session, jsonify
+from flask import Blueprint, Response, request, session, jsonify, stream_with_context
 from services.auth_service import AuthService
 from services.transaction_service import TransactionService
+from services.category_service import CategoryService
+from services.recurring_service import RecurringService
+from services.rule_service import RuleService
+from services.analytics_service import AnalyticsService
+from services.forecast_service import ForecastService
+from services.job_service import JobService
 from utils.decorators import api_login_required
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
@@ -56,15 +62,31 @@ def api_logout():
     session.clear()
     return jsonify({'message': 'Logout successful'}), 200
 
+@api_bp.route('/account', methods=['DELETE'])
+@api_login_required
+def api_delete_account():
+    """API: Eigenes Konto mit allen Daten löschen ({"password": "..."})"""
+    user_id = session.get('user_id')
+    data = request.get_json(silent=True) or {}
+    
+    success, message = AuthService.delete_user(user_id, data.get('password'))
+    
+    if success:
+        session.clear()
+        return jsonify({'message': message}), 200
+    else:
+        return jsonify({'error': message}), 400
+
 # Transaction Endpoints
 
 @api_bp.route('/transactions', methods=['GET'])
 @api_login_required
 def api_get_transactions():
-    """API: Alle Transaktionen abrufen"""
+    """API: Alle Transaktionen abrufen (?include_archived=1 → inkl. archivierter)"""
     user_id = session.get('user_id')
+    include_archived = request.args.get('include_archived', '0').lower() in ('1', 'true', 'yes')
     
-    transactions = TransactionService.get_transactions_as_dict(user_id)
+    transactions = TransactionService.get_transactions_as_dict(user_id, include_archived)
     
     return jsonify(transactions), 200
 
@@ -81,15 +103,53 @@ def api_add_transaction():
     description = data.get('description')
     date = data.get('date')
     
-    success, message = TransactionService.add_transaction(
+    success, message, budget = TransactionService.add_transaction_with_budget(
         user_id, amount, transaction_type, category, description, date
     )
     
     if success:
-        return jsonify({'message': message}), 201
+        return jsonify({
+            'message': message,
+            'over_budget': bool(budget and budget['over_budget']),
+            'budget': budget
+        }), 201
     else:
         return jsonify({'error': message}), 400
 
+@api_bp.route('/transactions/balance', methods=['GET'])
+@api_login_required
+def api_get_running_balance():
+    """API: Transaktionen mit laufendem Saldo (seitenweise)"""
+    user_id = session.get('user_id')
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+    
+    transactions = TransactionService.get_running_balance(user_id, page, per_page)
+    
+    return jsonify({
+        'page': page,
+        'per_page': per_page,
+        'transactions': transactions
+    }), 200
+
+@api_bp.route('/balance', methods=['GET'])
+@api_login_required
+def api_get_balance():
+    """API: Saldo an einem Datum (?date=) oder Veränderung im Zeitraum (?start=&end=)"""
+    user_id = session.get('user_id')
+    
+    success, result = TransactionService.get_balance(
+        user_id,
+        as_of=request.args.get('date'),
+        start=request.args.get('start'),
+        end=request.args.get('end')
+    )
+    
+    if success:
+        return jsonify(result), 200
+    else:
+        return jsonify({'error': result}), 400
+
 @api_bp.route('/transactions/<int:transaction_id>', methods=['GET'])
 @api_login_required
 def api_get_transaction(transaction_id):
@@ -101,9 +161,9 @@ def api_get_transaction(transaction_id):
     if transaction:
         return jsonify({
             'id': transaction.id,
-            'amount': float(transaction.amount),
+            'amount': transaction.amount,
             'type': transaction.transaction_type,
-            'category': transaction.category,
+            'category': transaction.category_name,
             'description': transaction.description,
             'date': transaction.date.strftime('%Y-%m-%d') if transaction.date else None
         }), 200
@@ -123,7 +183,7 @@ def api_update_transaction(transaction_id):
     if 'type' in data:
         update_data['transaction_type'] = data['type']
     if 'category' in data:
-        update_data['category'] = data['category']
+        update_data['category_id'] = data['category']
     if 'description' in data:
         update_data['description'] = data['description']
     if 'date' in data:
@@ -151,12 +211,281 @@ def api_delete_transaction(transaction_id):
     else:
         return jsonify({'error': message}), 400
 
+@api_bp.route('/transactions/import', methods=['POST'])
+@api_login_required
+def api_import_transactions():
+    """API: Transaktionen importieren (läuft als Hintergrund-Job)"""
+    user_id = session.get('user_id')
+    data = request.get_json()
+    
+    rows = data.get('rows') if isinstance(data, dict) else data
+    if not isinstance(rows, list):
+        return jsonify({'error': 'Liste von Transaktionen erwartet'}), 400
+    
+    return _enqueue_job(user_id, 'import_transactions', {'rows': rows})
+
+@api_bp.route('/transactions/export', methods=['POST'])
+@api_login_required
+def api_export_transactions():
+    """API: CSV-Export starten (Status über /api/jobs/<id>, Datei über /api/jobs/<id>/download)"""
+    user_id = session.get('user_id')
+    
+    return _enqueue_job(user_id, 'export_transactions')
+
+# Job Endpoints
+
+def _enqueue_job(user_id, kind, params=None):
+    """Job anlegen → 202 + Job-ID (Status über /api/jobs/<id>)"""
+    success, result = JobService.enqueue(user_id, kind, params)
+    
+    if success:
+        return jsonify({'job_id': result, 'status': 'queued'}), 202
+    else:
+        return jsonify({'error': result}), 400
+
+@api_bp.route('/jobs', methods=['GET'])
+@api_login_required
+def api_get_jobs():
+    """API: Eigene Jobs (neueste zuerst, ohne Ergebnis)"""
+    user_id = session.get('user_id')
+    
+    return jsonify(JobService.get_jobs(user_id)), 200
+
+@api_bp.route('/jobs', methods=['POST'])
+@api_login_required
+def api_create_job():
+    """API: Job starten ({"kind": "rebuild_balances", "params": {...}})"""
+    user_id = session.get('user_id')
+    data = request.get_json()
+    
+    return _enqueue_job(user_id, data.get('kind'), data.get('params'))
+
+@api_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@api_login_required
+def api_get_job(job_id):
+    """API: Status + Fortschritt eines Jobs"""
+    user_id = session.get('user_id')
+    
+    job = JobService.get_job(job_id, user_id)
+    
+    if job:
+        return jsonify(job), 200
+    else:
+        return jsonify({'error': 'Job not found'}), 404
+
+@api_bp.route('/jobs/<int:job_id>/download', methods=['GET'])
+@api_login_required
+def api_download_job(job_id):
+    """API: Datei eines abgeschlossenen Jobs (z.B. CSV-Export) als Stream"""
+    user_id = session.get('user_id')
+    
+    output = JobService.get_output(job_id, user_id)
+    
+    if output is None:
+        return jsonify({'error': 'No output for this job'}), 404
+    filename, chunks = output
+    return Response(
+        stream_with_context(chunks),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+@api_bp.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+@api_login_required
+def api_cancel_job(job_id):
+    """API: Job abbrechen"""
+    user_id = session.get('user_id')
+    
+    success, message = JobService.cancel_job(job_id, user_id)
+    
+    if success:
+        return jsonify({'message': message}), 200
+    else:
+        return jsonify({'error': message}), 400
+
+# Recurring Transaction Endpoints
+
+@api_bp.route('/recurring', methods=['GET'])
+@api_login_required
+def api_get_recurring():
+    """API: Alle wiederkehrenden Transaktionen abrufen"""
+    user_id = session.get('user_id')
+    
+    return jsonify(RecurringService.get_recurring_as_dict(user_id)), 200
+
+@api_bp.route('/recurring', methods=['POST'])
+@api_login_required
+def api_add_recurring():
+    """API: Wiederkehrende Transaktion anlegen"""
+    user_id = session.get('user_id')
+    data = request.get_json()
+    
+    success, message = RecurringService.add_recurring(
+        user_id,
+        data.get('amount'),
+        data.get('type'),
+        data.get('category'),
+        data.get('description'),
+        data.get('freq'),
+        data.get('interval', 1),
+        data.get('start_date'),
+        data.get('until_date')
+    )
+    
+    if success:
+        return jsonify({'message': message}), 201
+    else:
+        return jsonify({'error': message}), 400
+
+@api_bp.route('/recurring/<int:recurring_id>', methods=['DELETE'])
+@api_login_required
+def api_delete_recurring(recurring_id):
+    """API: Wiederkehrende Transaktion löschen"""
+    user_id = session.get('user_id')
+    
+    success, message = RecurringService.delete_recurring(recurring_id, user_id)
+    
+    if success:
+        return jsonify({'message': message}), 200
+    else:
+        return jsonify({'error': message}), 400
+
+# Category Rule Endpoints
+
+@api_bp.route('/rules', methods=['GET'])
+@api_login_required
+def api_get_rules():
+    """API: Kategorisierungs-Regeln in Prüfreihenfolge"""
+    user_id = session.get('user_id')
+    
+    return jsonify(RuleService.get_rules_as_dict(user_id)), 200
+
+@api_bp.route('/rules', methods=['POST'])
+@api_login_required
+def api_add_rule():
+    """API: Regel anlegen ({"category": 3, "pattern": "migros", "kind": "contains", ...})"""
+    user_id = session.get('user_id')
+    data = request.get_json()
+    
+    success, message = RuleService.add_rule(
+        user_id,
+        data.get('category'),
+        data.get('pattern'),
+        data.get('kind', 'contains'),
+        data.get('min_amount'),
+        data.get('max_amount'),
+        data.get('type'),
+        data.get('priority', 100)
+    )
+    
+    if success:
+        return jsonify({'message': message}), 201
+    else:
+        return jsonify({'error': message}), 400
+
+@api_bp.route('/rules/<int:rule_id>', methods=['DELETE'])
+@api_login_required
+def api_delete_rule(rule_id):
+    """API: Regel löschen"""
+    user_id = session.get('user_id')
+    
+    success, message = RuleService.delete_rule(rule_id, user_id)
+    
+    if success:
+        return jsonify({'message': message}), 200
+    else:
+        return jsonify({'error': message}), 400
+
+@api_bp.route('/rules/apply', methods=['POST'])
+@api_login_required
+def api_reapply_rules():
+    """API: Regeln auf bestehende Transaktionen anwenden (Job, {"overwrite": false})"""
+    user_id = session.get('user_id')
+    data = request.get_json(silent=True) or {}
+    
+    return _enqueue_job(user_id, 'reapply_rules', {'overwrite': bool(data.get('overwrite'))})
+
+# Budget Endpoints
+
+@api_bp.route('/budgets', methods=['GET'])
+@api_login_required
+def api_get_budgets():
+    """API: Budget-Status aller Kategorien (?month=YYYY-MM)"""
+    user_id = session.get('user_id')
+    
+    success, result = CategoryService.get_budget_status(user_id, request.args.get('month'))
+    
+    if success:
+        return jsonify(result), 200
+    else:
+        return jsonify({'error': result}), 400
+
+@api_bp.route('/categories/<int:category_id>/budget', methods=['PUT'])
+@api_login_required
+def api_set_budget(category_id):
+    """API: Monatsbudget einer Kategorie setzen ({"amount": 500} oder null)"""
+    user_id = session.get('user_id')
+    data = request.get_json()
+    
+    success, message = CategoryService.set_budget(category_id, user_id, data.get('amount'))
+    
+    if success:
+        return jsonify({'message': message}), 200
+    else:
+        return jsonify({'error': message}), 400
+
+@api_bp.route('/categories/<int:category_id>/merge', methods=['POST'])
+@api_login_required
+def api_merge_category(category_id):
+    """API: Kategorie in eine andere überführen und löschen ({"target": 5}; ohne target: nur löschen)"""
+    user_id = session.get('user_id')
+    data = request.get_json(silent=True) or {}
+    
+    return _enqueue_job(user_id, 'merge_category', {'category_id': category_id, 'target_id': data.get('target')})
+
+@api_bp.route('/categories/<int:category_id>', methods=['DELETE'])
+@api_login_required
+def api_delete_category(category_id):
+    """API: Kategorie löschen (Transaktionen blockweise ohne Kategorie, als Job)"""
+    user_id = session.get('user_id')
+    
+    return _enqueue_job(user_id, 'merge_category', {'category_id': category_id})
+
+# Analytics Endpoints
+
+@api_bp.route('/analytics/stats', methods=['GET'])
+@api_login_required
+def api_get_stats():
+    """API: Ausgaben-Statistik pro Kategorie (Mittelwert, Median, Perzentile, Monatsvergleich, Volatilität)"""
+    user_id = session.get('user_id')
+    
+    success, result = AnalyticsService.get_stats(user_id)
+    
+    if success:
+        return jsonify(result), 200
+    else:
+        return jsonify({'error': result}), 500
+
+@api_bp.route('/forecast', methods=['GET'])
+@api_login_required
+def api_get_forecast():
+    """API: Saldo-Prognose bis Monatsende (gebucht + Vorlagen + Ausgaben-Tempo)"""
+    user_id = session.get('user_id')
+    
+    success, result = ForecastService.get_forecast(user_id)
+    
+    if success:
+        return jsonify(result), 200
+    else:
+        return jsonify({'error': result}), 500
+
 @api_bp.route('/dashboard', methods=['GET'])
 @api_login_required
 def api_get_dashboard():
     """API: Dashboard-Daten abrufen"""
     user_id = session.get('user_id')
+    page = request.args.get('page', type=int)
     
-    dashboard_data = TransactionService.get_dashboard_data(user_id)
+    dashboard_data = TransactionService.get_dashboard_data(user_id, page=page)
     
     return jsonify(dashboard_data), 200
\ No newline at end of file
@@ -5,6 +5,7 @@ from flask import Blueprint, render_template, request, session, redirect, url_fo
 from utils.decorators import login_required
 from services.transaction_service import TransactionService
 from services.category_service import CategoryService
+from services.job_service import JobService
 
 main_bp = Blueprint('main', __name__)
 
@@ -18,13 +19,19 @@ def index():
 def dashboard():
     """Dashboard mit Transaktionsübersicht"""
     user_id = session.get('user_id')
-    dashboard_data = TransactionService.get_dashboard_data(user_id)
+    page = request.args.get('page', 1, type=int)
+    dashboard_data = TransactionService.get_dashboard_data(user_id, page=max(page, 1))
+    if dashboard_data['partial']:
+        flash('Einige Daten konnten nicht rechtzeitig geladen werden', 'error')
 
     return render_template('dashboard.html', 
                           transactions=dashboard_data['transactions'],
                           summary=dashboard_data['summary'],
                           categories=dashboard_data['categories'],
-                          category_chart=dashboard_data.get('category_chart', {}))
+                          category_chart=dashboard_data.get('category_chart', {}),
+                          balance_chart=dashboard_data.get('balance_chart', []),
+                          page=dashboard_data['page'],
+                          per_page=dashboard_data['per_page'])
 
 
 @main_bp.route('/categories')
@@ -56,9 +63,31 @@ def add_category():
 @main_bp.route('/category/delete/<int:category_id>', methods=['POST'])
 @login_required
 def delete_category(category_id):
+    """Kategorie löschen - läuft als Job (Transaktionen werden blockweise umgehängt)"""
     user_id = session.get('user_id')
 
-    success, message = CategoryService.delete_category(category_id, user_id)
+    target_id = request.form.get('target_id', type=int)  # leer → Transaktionen ohne Kategorie
+
+    success, result = JobService.enqueue(
+        user_id, 'merge_category', {'category_id': category_id, 'target_id': target_id}
+    )
+    if success:
+        flash(f"Löschen gestartet (Job #{result}) - die Kategorie verschwindet, sobald alle "
+              "Transaktionen umgehängt sind", 'success')
+    else:
+        flash(result, 'error')
+
+    return redirect(url_for('main.manage_categories'))
+
+@main_bp.route('/category/budget/<int:category_id>', methods=['POST'])
+@login_required
+def set_category_budget(category_id):
+    """Monatsbudget einer Kategorie setzen/entfernen"""
+    user_id = session.get('user_id')
+
+    success, message = CategoryService.set_budget(
+        category_id, user_id, request.form.get('monthly_budget')
+    )
     flash(message, 'success' if success else 'error')
 
     return redirect(url_for('main.manage_categories'))
@@ -75,11 +104,12 @@ def add_transaction():
     description = request.form.get('description')
     date = request.form.get('date')
 
-    success, message = TransactionService.add_transaction(
+    success, message, budget = TransactionService.add_transaction_with_budget(
         user_id, amount, transaction_type, category_id, description, date
     )
     
-    flash(message, 'success' if success else 'error')
+    # Über Budget → als Warnung (rot) anzeigen
+    flash(message, 'success' if success and not (budget and budget['over_budget']) else 'error')
     return redirect(url_for('main.dashboard'))
 
 @main_bp.route('/transaction/edit/<int:transaction_id>', methods=['POST'])
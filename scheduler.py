@@ -0,0 +1,132 @@
+"""
+scheduler.py - Bucht wiederkehrende Transaktionen (Miete, Lohn, Abos)
+
+Eigener Prozess neben der Web-App:
+    python scheduler.py            # Endlosschleife, ein Tick pro Minute
+    python scheduler.py --once     # genau ein Tick (z.B. per Cron)
+
+Mehrere Scheduler-Prozesse dürfen parallel laufen: fällige Vorlagen werden
+mit FOR UPDATE SKIP LOCKED verteilt. Verpasste Ticks werden beim nächsten
+Lauf nachgeholt (siehe services/recurring_service.py).
+
+Einmal pro Tag läuft die Wartung (daily_maintenance): der Tag wird in
+scheduler_state ('daily_maintenance') beansprucht → auch bei einem
+--once-Lauf pro Minute per Cron oder mehreren Prozessen nur einmal täglich.
+
+Ist transactions nach Jahr partitioniert (setup_db.py --partition-transactions),
+legt die Wartung die künftigen Jahres-Partitionen an (nur MySQL). Mit ARCHIVE_AFTER_DAYS > 0 werden
+ebenfalls einmal pro Tag alte Transaktionen archiviert (services/archive_service.py).
+Danach werden die Saldo-Prognosen aller aktiven User vorgerechnet
+(services/forecast_service.py, abschaltbar mit FORECAST_NIGHTLY=0).
+"""
+import argparse
+import sys
+import time
+from datetime import date, datetime
+
+from models import storage
+from config import Config
+from models.recurring import SchedulerState
+from services.archive_service import ArchiveService
+from services.forecast_service import ForecastService
+from services.recurring_service import RecurringService, SCHEDULER_NAME, BATCH_SIZE
+from utils import metrics
+
+MAINTENANCE_NAME = 'daily_maintenance'
+
+
+def tick(batch_size):
+    started = time.perf_counter()
+    result = RecurringService.run_due(batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {result['schedules']} Vorlagen, "
+          f"{result['created']} Transaktionen gebucht ({elapsed:.2f}s)")
+
+
+def maintain_partitions():
+    """Künftige Jahres-Partitionen von transactions anlegen (falls partitioniert)"""
+    if storage.engine() != 'mysql':
+        return
+    from setup_db import ensure_future_partitions
+
+    conn = storage.get_db_connection()
+    cursor = conn.cursor()
+    try:
+        created = ensure_future_partitions(cursor, storage.database_name())
+    finally:
+        cursor.close()
+        conn.close()
+    if created:
+        print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] Partitionen angelegt: {', '.join(created)}")
+
+
+def archive():
+    """Alte Transaktionen archivieren (falls ARCHIVE_AFTER_DAYS gesetzt)"""
+    if Config.ARCHIVE_AFTER_DAYS <= 0:
+        return
+    started = time.perf_counter()
+    result = ArchiveService.run(Config.ARCHIVE_AFTER_DAYS)
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {result['archived']} Transaktionen von "
+          f"{result['users']} Usern archiviert ({time.perf_counter() - started:.2f}s)")
+
+
+def forecast():
+    """Saldo-Prognosen vorrechnen (falls FORECAST_NIGHTLY)"""
+    if not Config.FORECAST_NIGHTLY:
+        return
+    started = time.perf_counter()
+    result = ForecastService.run()
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {result['computed']} von {result['users']} "
+          f"Prognosen berechnet ({time.perf_counter() - started:.2f}s)")
+
+
+def daily_maintenance(today=None):
+    """
+    Partitionen, Archivierung, Prognosen - höchstens einmal pro Tag über alle Prozesse
+
+    Returns:
+        True wenn die Wartung in diesem Aufruf gelaufen ist
+    """
+    today = today or date.today()
+    if not SchedulerState.claim_day(MAINTENANCE_NAME, today):
+        return False
+    try:
+        maintain_partitions()
+        archive()
+        forecast()
+    except Exception as e:
+        SchedulerState.finish_day(MAINTENANCE_NAME, success=False)
+        print(f"[ERROR] Tägliche Wartung fehlgeschlagen: {e}")
+        return False
+    SchedulerState.finish_day(MAINTENANCE_NAME)
+    return True
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Scheduler für wiederkehrende Transaktionen")
+    ap.add_argument("--once", action="store_true", help="nur einen Tick ausführen")
+    ap.add_argument("--interval", default=60, type=int, help="Sekunden zwischen Ticks")
+    ap.add_argument("--batch-size", default=BATCH_SIZE, type=int)
+    args = ap.parse_args()
+
+    state = SchedulerState.get(SCHEDULER_NAME)
+    if state:
+        print(f"Letzter Tick: {state['last_tick']}, zuletzt abgeschlossen: {state['last_completed']}")
+
+    while True:
+        next_tick = time.monotonic() + args.interval
+        daily_maintenance()
+        try:
+            tick(args.batch_size)
+        except Exception as e:
+            print(f"[ERROR] Scheduler-Tick fehlgeschlagen: {e}")
+            if args.once:
+                return 1
+        if args.once:
+            return 0
+        metrics.flush()
+        time.sleep(max(0.0, next_tick - time.monotonic()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Analytics Service - Ausgaben-Statistik pro Kategorie (vektorisiert mit NumPy)
+
+Die Transaktionen eines Users werden einmal spaltenweise geladen
+(Transaction.ledger_columns: date, amount, type, category_id) und als
+NumPy-Arrays ausgewertet - gruppiert mit bincount bzw. einer Sortierung
+nach (Gruppe, Betrag), ohne Python-Schleife über Transaktionen:
+
+- pro Kategorie und gesamt: Anzahl, Summe, Mittelwert, Median, Perzentile
+  der einzelnen Ausgaben
+- Monatssummen der letzten abgeschlossenen Monate (höchstens
+  STATS_MONTHS): Veränderung letzter Monat gegenüber Vormonat und
+  Volatilität (Standardabweichung und Variationskoeffizient)
+
+Gerechnet wird in ganzen Rappen. Das Ergebnis wird pro User mit dem
+Datenstand (LedgerVersion) und dem Monat gecacht → neu gerechnet wird erst
+nach einer Änderung an den Transaktionen, auch wenn sie aus einem anderen
+Prozess kommt. Archivierte Transaktionen zählen nicht mit.
+"""
+from datetime import date
+import numpy as np
+from config import Config
+from models.category import Category
+from models.ledger_version import LedgerVersion
+from models.transaction import Transaction
+from utils.money import Money
+from utils.user_cache import UserCache
+
+PERCENTILES = (10, 25, 50, 75, 90)
+STATS_MONTHS = 12  # abgeschlossene Monate für Monatssummen und Volatilität
+
+# user_id → (Version, Monat, Statistik ohne Kategorie-Namen)
+_stats = UserCache('analytics', Config.ANALYTICS_CACHE_SECONDS, Config.ANALYTICS_CACHE_USERS)
+
+
+def ledger_arrays(columns):
+    """
+    Spalten aus Transaction.ledger_columns → NumPy-Arrays
+
+    Returns:
+        (days datetime64[D], cents int64, is_expense bool, category_ids int64)
+    """
+    days, cents, is_expense, category_ids = columns
+    days = np.array(days, dtype='datetime64[D]')
+    cents = np.rint(np.array(cents, dtype=np.float64)).astype(np.int64)  # SQLite: Rappen ggf. als float
+    return days, cents, np.array(is_expense, dtype=bool), np.array(category_ids, dtype=np.int64)
+
+
+def grouped_percentiles(groups, values, n_groups, percentiles):
+    """
+    Perzentile pro Gruppe, lineare Interpolation wie np.percentile
+
+    Einmal nach (Gruppe, Wert) sortieren; Anfang und Grösse jeder Gruppe
+    ergeben die Positionen aller Perzentile direkt.
+
+    Returns:
+        float-Array (n_groups, len(percentiles)), NaN bei leeren Gruppen
+    """
+    result = np.full((n_groups, len(percentiles)), np.nan)
+    if len(values) == 0:
+        return result
+
+    sorted_values = values[np.lexsort((values, groups))].astype(np.float64)
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+
+    q = np.asarray(percentiles, dtype=np.float64) / 100
+    pos = np.maximum(counts[:, None] - 1, 0) * q[None, :]
+    lower = np.floor(pos).astype(np.int64)
+    upper = np.minimum(lower + 1, np.maximum(counts[:, None] - 1, 0))
+    last = len(sorted_values) - 1
+    low_values = sorted_values[np.minimum(starts[:, None] + lower, last)]
+    high_values = sorted_values[np.minimum(starts[:, None] + upper, last)]
+
+    filled = counts > 0
+    result[filled] = (low_values + (high_values - low_values) * (pos - lower))[filled]
+    return result
+
+
+def _money(cents):
+    """float-Rappen (NaN = kein Wert) → Money oder None"""
+    return None if np.isnan(cents) else Money(int(round(float(cents))))
+
+
+def _group_stats(groups, n_groups, cents, months, first_month, n_months):
+    """
+    Kennzahlen für n_groups Gruppen (groups[i] = Gruppe der Ausgabe i)
+
+    Returns:
+        Liste von Dicts (eine pro Gruppe)
+    """
+    counts = np.bincount(groups, minlength=n_groups)
+    totals = np.bincount(groups, weights=cents, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = totals / counts
+    percentiles = grouped_percentiles(groups, cents, n_groups, PERCENTILES)
+
+    # Monatssummen (Gruppe × Monat) der abgeschlossenen Monate
+    in_window = (months >= first_month) & (months < first_month + n_months)
+    month_index = (months[in_window] - first_month).astype(np.int64)
+    monthly = np.bincount(
+        groups[in_window] * n_months + month_index,
+        weights=cents[in_window],
+        minlength=n_groups * n_months
+    ).reshape(n_groups, n_months)
+
+    change = np.full(n_groups, np.nan)
+    if n_months >= 2:
+        previous = monthly[:, -2]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            change = np.where(previous > 0, (monthly[:, -1] - previous) / previous * 100, np.nan)
+    monthly_mean = monthly.mean(axis=1) if n_months else np.full(n_groups, np.nan)
+    volatility = monthly.std(axis=1, ddof=1) if n_months >= 2 else np.full(n_groups, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variation = np.where(monthly_mean > 0, volatility / monthly_mean, np.nan)
+
+    return [{
+        'count': int(counts[i]),
+        'total': _money(totals[i]),
+        'mean': _money(means[i]),
+        'median': _money(percentiles[i, PERCENTILES.index(50)]),
+        'percentiles': {f'p{p}': _money(percentiles[i, k]) for k, p in enumerate(PERCENTILES)},
+        'monthly': [_money(value) for value in monthly[i]],
+        'monthly_mean': _money(monthly_mean[i]),
+        'change_pct': None if np.isnan(change[i]) else round(float(change[i]), 1),
+        'volatility': _money(volatility[i]),
+        'variation': None if np.isnan(variation[i]) else round(float(variation[i]), 3)
+    } for i in range(n_groups)]
+
+
+def compute_stats(days, cents, is_expense, category_ids, today=None):
+    """
+    Alle Kennzahlen aus den Arrays von ledger_arrays()
+
+    Args:
+        today: Stichtag (Standard heute) - der laufende Monat zählt nicht
+               zu den Monatssummen
+
+    Returns:
+        Dict mit months, overall, categories (ohne Namen)
+    """
+    current_month = np.datetime64(today or date.today(), 'M')
+    expense_days = days[is_expense]
+    cents = cents[is_expense]
+    months = expense_days.astype('datetime64[M]')
+
+    # ab dem ersten Monat mit Ausgaben, sonst zählen leere Monate in die Volatilität
+    first_month = max(current_month - STATS_MONTHS, months.min()) if len(months) else current_month
+    n_months = max(int((current_month - first_month).astype(np.int64)), 0)
+
+    category_list, groups = np.unique(category_ids[is_expense], return_inverse=True)
+    groups = groups.reshape(-1)  # NumPy 2.x: gleiche Form wie die Eingabe
+    per_category = _group_stats(groups, len(category_list), cents, months, first_month, n_months)
+    overall = _group_stats(np.zeros(len(cents), dtype=np.int64), 1, cents, months, first_month, n_months)[0]
+
+    return {
+        'months': [str(first_month + i) for i in range(n_months)],
+        'overall': overall,
+        'categories': [
+            dict(stats, category_id=int(category_id) or None)
+            for category_id, stats in zip(category_list, per_category)
+        ]
+    }
+
+
+class AnalyticsService:
+    """Service für Auswertungen"""
+
+    @staticmethod
+    def get_stats(user_id):
+        """
+        Ausgaben-Statistik eines Users (gecacht bis zur nächsten Änderung)
+
+        Returns:
+            tuple: (success: bool, dict | message: str)
+        """
+        version = LedgerVersion.get(user_id)
+        if version is None:
+            return False, "Fehler beim Laden der Statistik"
+        month = date.today().strftime('%Y-%m')
+
+        def load():
+            columns = Transaction.ledger_columns(user_id)
+            if columns is None:
+                return None
+            return version, month, compute_stats(*ledger_arrays(columns))
+
+        entry = _stats.get(user_id, load)
+        if entry is not None and entry[:2] != (version, month):
+            _stats.invalidate(user_id)
+            entry = _stats.get(user_id, load)
+        if entry is None:
+            return False, "Fehler beim Laden der Statistik"
+
+        stats = entry[2]
+        categories = Category.by_id(user_id)
+        return True, {
+            'version': entry[0],
+            'months': stats['months'],
+            'overall': stats['overall'],
+            'categories': [
+                dict(item, category_name=categories[item['category_id']].name
+                     if item['category_id'] in categories else None)
+                for item in stats['categories']
+            ]
+        }
@@ -0,0 +1,67 @@
+"""
+Archive Service - Alte Transaktionen blockweise archivieren
+
+Der Scheduler (scheduler.py) ruft ArchiveService.run() einmal pro Tag auf,
+wenn Config.ARCHIVE_AFTER_DAYS > 0. Einzelne User lassen sich auch per Job
+archivieren ({"kind": "archive_transactions", "params": {"older_than_days": 365}}).
+
+Jeder Block (Config.ARCHIVE_BATCH_SIZE Zeilen) ist eine eigene kurze
+DB-Transaktion → keine langen Sperren, Abbruch jederzeit möglich, ein
+erneuter Lauf macht dort weiter.
+"""
+from datetime import datetime, time, timedelta
+from config import Config
+from models.archive import TransactionArchive
+
+
+def archive_cutoff(older_than_days):
+    """Stichtag: Mitternacht vor `older_than_days` Tagen"""
+    return datetime.combine(datetime.now().date() - timedelta(days=older_than_days), time.min)
+
+
+class ArchiveService:
+    """Service für die Archivierung"""
+
+    @staticmethod
+    def archive_user(user_id, older_than_days, batch_size=None, progress=None):
+        """
+        Archiviert alle Transaktionen eines Users vor dem Stichtag
+
+        Args:
+            user_id: User-ID
+            older_than_days: Alter in Tagen
+            batch_size: Zeilen pro Block (Standard Config.ARCHIVE_BATCH_SIZE)
+            progress: optional, wird nach jedem Block mit der Anzahl bisher
+                      verschobener Zeilen aufgerufen
+
+        Returns:
+            Anzahl archivierter Transaktionen
+        """
+        batch_size = batch_size or Config.ARCHIVE_BATCH_SIZE
+        cutoff = archive_cutoff(older_than_days)
+        moved = 0
+        while True:
+            count = TransactionArchive.archive_batch(user_id, cutoff, batch_size)
+            moved += count
+            if progress:
+                progress(moved)
+            if count < batch_size:
+                return moved
+
+    @staticmethod
+    def run(older_than_days=None, batch_size=None):
+        """
+        Archiviert alte Transaktionen aller User
+
+        Returns:
+            Dict mit users, archived
+        """
+        older_than_days = older_than_days or Config.ARCHIVE_AFTER_DAYS
+        if older_than_days <= 0:
+            return {'users': 0, 'archived': 0}
+
+        user_ids = TransactionArchive.users_with_transactions_before(archive_cutoff(older_than_days))
+        archived = 0
+        for user_id in user_ids:
+            archived += ArchiveService.archive_user(user_id, older_than_days, batch_size)
+        return {'users': len(user_ids), 'archived': archived}
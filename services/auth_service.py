@@ -4,6 +4,8 @@ Angepasst an deine DB (ohne email)
 """
 from models.user import User
 from models.category import Category
+from models.storage import OK
+from services.rule_service import RuleService
 
 class AuthService:
     """Authentication Service - Alle Auth-Logik"""
@@ -69,4 +71,26 @@ class AuthService:
     @staticmethod
     def get_user_by_id(user_id):
         """Holt User anhand ID"""
-        return User.find_by_id(user_id)
\ No newline at end of file
+        return User.find_by_id(user_id)
+    
+    @staticmethod
+    def delete_user(user_id, password):
+        """
+        Löscht das Konto des Users mit allen Daten (Passwort zur Bestätigung)
+        
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        user = User.find_by_id(user_id)
+        if not user:
+            return False, "User nicht gefunden"
+        
+        if not password or not user.verify_password(password):
+            return False, "Ungültiges Passwort"
+        
+        if User.delete(user_id) != OK:
+            return False, "Fehler beim Löschen des Kontos"
+        
+        Category.invalidate(user_id)
+        RuleService.invalidate(user_id)
+        return True, "Konto gelöscht"
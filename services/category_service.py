@@ -1,8 +1,22 @@
 """Category Service - Business-Logik für Kategorien (korrekte Version)
 
 Dieses Modul benutzt die Methoden aus `models.category`.
+Nach jedem Schreibzugriff wird der Kategorie-Cache des Users verworfen
+(Category.invalidate), auch bei Fehlern (Zustand unbekannt).
+
+Änderungen brauchen EINEN Aufruf ans Model (kein get_by_id/name_exists
+vorab); die Meldung richtet sich nach dem Ergebnis (OK, NOT_FOUND, DUPLICATE).
+Ausnahme Löschen/Zusammenführen: Transaktionen werden vorher blockweise
+umgehängt (merge_category).
 """
+from config import Config
 from models.category import Category
+from models.storage import OK, NOT_FOUND, DUPLICATE, REFERENCE_NOT_FOUND
+from models.transaction import Transaction
+from services.rule_service import RuleService
+from models.budget import Budget
+from datetime import datetime
+from utils.money import Money
 
 
 class CategoryService:
@@ -17,13 +31,13 @@ class CategoryService:
         if len(name) > 100:
             return False, "Kategorie-Name darf maximal 100 Zeichen lang sein"
 
-        # Prüfe ob Name schon existiert (Model erwartet (user_id, name, ...))
-        if Category.name_exists(user_id, name):
-            return False, "Eine Kategorie mit diesem Namen existiert bereits"
-
-        category_id = Category.create(user_id, name, color)
-        if category_id:
+        # Doppelte Namen lehnt der UNIQUE KEY ab (kein vorheriges SELECT)
+        status, _ = Category.create(user_id, name, color)
+        Category.invalidate(user_id)
+        if status == OK:
             return True, "Kategorie erfolgreich erstellt!"
+        if status == DUPLICATE:
+            return False, "Eine Kategorie mit diesem Namen existiert bereits"
         return False, "Fehler beim Erstellen der Kategorie"
 
     @staticmethod
@@ -38,6 +52,7 @@ class CategoryService:
                 'id': c.id,
                 'name': c.name,
                 'color': c.color,
+                'monthly_budget': c.monthly_budget,
                 'is_standard': c.user_id is None,
                 'can_edit': (c.user_id == user_id)
             }
@@ -46,44 +61,109 @@ class CategoryService:
 
     @staticmethod
     def update_category(category_id, user_id, name=None, icon=None, color=None):
-        category = Category.get_by_id(category_id, user_id)
-        if not category:
-            return False, "Kategorie nicht gefunden"
-
-        if category.user_id is None:
-            return False, "Standard-Kategorien können nicht bearbeitet werden"
-
-        if category.user_id != user_id:
-            return False, "Keine Berechtigung"
-
         if name:
             if len(name) < 2:
                 return False, "Name muss mindestens 2 Zeichen lang sein"
             if len(name) > 100:
                 return False, "Name darf maximal 100 Zeichen lang sein"
-            if Category.name_exists(user_id, name, exclude_id=category_id):
-                return False, "Eine Kategorie mit diesem Namen existiert bereits"
 
-        success = Category.update(category_id, user_id, name=name, color=color)
-        if success:
+        # Eigentum (WHERE user_id) und eindeutiger Name (uniq_user_name) prüft das UPDATE selbst
+        status = Category.update(category_id, user_id, name=name or None, color=color or None)
+        Category.invalidate(user_id)
+        if status == OK:
             return True, "Kategorie erfolgreich aktualisiert!"
+        if status == NOT_FOUND:
+            return False, "Kategorie nicht gefunden"
+        if status == DUPLICATE:
+            return False, "Eine Kategorie mit diesem Namen existiert bereits"
         return False, "Fehler beim Aktualisieren der Kategorie"
 
     @staticmethod
-    def delete_category(category_id, user_id):
-        category = Category.get_by_id(category_id, user_id)
-        if not category:
-            return False, "Kategorie nicht gefunden"
+    def delete_category(category_id, user_id, target_id=None):
+        """Kategorie löschen, Transaktionen nach target_id umhängen (None = ohne Kategorie)"""
+        success, message, _ = CategoryService.merge_category(category_id, user_id, target_id)
+        return success, message
 
-        if category.user_id is None:
-            return False, "Standard-Kategorien können nicht gelöscht werden"
+    @staticmethod
+    def merge_category(category_id, user_id, target_id=None, batch_size=None, progress=None):
+        """
+        Hängt alle Transaktionen einer Kategorie um und löscht sie danach
+
+        Blockweise (Config.CATEGORY_MOVE_BATCH_SIZE Zeilen pro kurzer
+        DB-Transaktion) statt eines einzigen UPDATE über alle Zeilen → andere
+        Schreiber warten höchstens auf einen Block. Erst am Ende wird die
+        Kategorie gelöscht (Category.delete: Rest, Archiv, Regeln, Vorlagen).
+        Ein abgebrochener Lauf lässt die Kategorie stehen, ein neuer macht weiter.
+
+        Args:
+            category_id: Quelle
+            user_id: User-ID
+            target_id: Ziel-Kategorie (None = Transaktionen ohne Kategorie)
+            batch_size: Zeilen pro Block
+            progress: optional, wird nach jedem Block mit (umgehängt, gesamt) aufgerufen
+
+        Returns:
+            tuple: (success: bool, message: str, moved: int)
+        """
+        if target_id is not None and target_id == category_id:
+            return False, "Kategorie kann nicht mit sich selbst zusammengeführt werden", 0
+
+        batch_size = batch_size or Config.CATEGORY_MOVE_BATCH_SIZE
+        total = Transaction.count_in_category(user_id, category_id) if progress else None
+        moved = 0
+        while True:
+            status, count = Transaction.move_category_chunk(user_id, category_id, target_id, batch_size)
+            if status != OK:
+                break
+            moved += count
+            if progress:
+                progress(moved, max(total, moved))
+            if count < batch_size:
+                status = Category.delete(category_id, user_id, target_id)
+                break
+
+        Category.invalidate(user_id)
+        RuleService.invalidate(user_id)  # Regeln der Kategorie sind umgehängt bzw. mitgelöscht
+        if status == OK:
+            if target_id is None:
+                return True, "Kategorie erfolgreich gelöscht!", moved
+            return True, "Kategorien erfolgreich zusammengeführt!", moved
+        if status == NOT_FOUND:
+            return False, "Kategorie nicht gefunden", moved
+        if status == REFERENCE_NOT_FOUND:
+            return False, "Ziel-Kategorie nicht gefunden", moved
+        return False, "Fehler beim Löschen der Kategorie", moved
 
-        if category.user_id != user_id:
-            return False, "Keine Berechtigung"
+    @staticmethod
+    def set_budget(category_id, user_id, amount):
+        """Monatsbudget setzen (amount leer/None → Budget entfernen)"""
+        if amount in (None, ''):
+            budget = None
+        else:
+            try:
+                budget = Money.parse(amount)
+            except ValueError:
+                return False, "Ungültiger Betrag"
+            if budget <= 0:
+                return False, "Budget muss größer als 0 sein"
+
+        status = Category.set_budget(category_id, user_id, budget)
+        Category.invalidate(user_id)
+        if status == OK:
+            return True, "Budget erfolgreich gespeichert!"
+        if status == NOT_FOUND:
+            return False, "Kategorie nicht gefunden"
+        return False, "Fehler beim Speichern des Budgets"
 
-        if Category.delete(category_id, user_id):
-            return True, "Kategorie erfolgreich gelöscht!"
-        return False, "Fehler beim Löschen der Kategorie"
+    @staticmethod
+    def get_budget_status(user_id, month=None):
+        """Budget-Status aller Kategorien für einen Monat ('YYYY-MM', Standard: aktuell)"""
+        if month:
+            try:
+                month = datetime.strptime(month, '%Y-%m').date()
+            except ValueError:
+                return False, "Ungültiger Monat (Format: YYYY-MM)"
+        return True, Budget.get_all_status(user_id, month)
 
     @staticmethod
     def get_category_stats(user_id):
@@ -0,0 +1,255 @@
+"""
+Forecast Service - Saldo-Prognose bis Monatsende
+
+    Prognose pro Tag = gebuchter Saldo (Fenwick-Baum, inkl. bereits erfasster
+                       künftiger Buchungen)
+                     + noch nicht gebuchte Ausführungen aktiver Vorlagen
+                     - Ausgaben-Tempo aller Kategorien × vergangene Prognosetage
+
+Das Tempo einer Kategorie ist ein exponentiell gewichteter Mittelwert ihrer
+täglichen Ausgaben der letzten FORECAST_LOOKBACK_DAYS Tage (Gewicht halbiert
+sich alle FORECAST_HALF_LIFE_DAYS Tage). Grundlage sind in SQL aggregierte
+Tagessummen (Transaction.daily_spending), gerechnet wird auf einer Matrix
+Kategorie × Tag - nicht auf einzelnen Transaktionen. Buchungen aus Vorlagen
+zählen nicht zum Tempo, die Vorlagen selbst sind schon eingeplant.
+Einnahmen ohne Vorlage (unregelmässig) werden nicht hochgerechnet.
+
+Gecacht wird mit (LedgerVersion, Stichtag): pro Prozess (UserCache) und in
+balance_forecasts. Der Scheduler rechnet nachts für alle aktiven User vor
+(ForecastService.run) → tagsüber liest jeder Web-Prozess die Prognose bis
+zur nächsten Änderung mit einem PK-Lookup.
+"""
+import calendar
+from datetime import date, timedelta
+import numpy as np
+from config import Config
+from models.balance_index import BalanceIndex, _to_date
+from models.category import Category
+from models.forecast import BalanceForecast
+from models.ledger_version import LedgerVersion
+from models.recurring import RecurringTransaction, occurrence_after
+from models.transaction import Transaction
+from utils.money import Money
+from utils.user_cache import UserCache
+
+# user_id → (Version, Stichtag, Prognose in Rappen)
+_forecasts = UserCache('forecast', Config.ANALYTICS_CACHE_SECONDS, Config.ANALYTICS_CACHE_USERS)
+
+
+def month_end(day):
+    """Letzter Tag des Monats"""
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+
+def spending_velocity(spending, today, lookback_days, half_life_days):
+    """
+    Tägliches Ausgaben-Tempo pro Kategorie aus Tagessummen
+
+    Tage vor der ersten Ausgabe im Zeitraum zählen nicht (neue User hätten
+    sonst ein zu tiefes Tempo).
+
+    Args:
+        spending: (days, category_ids, cents) aus Transaction.daily_spending
+
+    Returns:
+        (category_ids int64-Array, Rappen pro Tag float-Array)
+    """
+    days, category_ids, cents = spending
+    categories, groups = np.unique(np.array(category_ids, dtype=np.int64), return_inverse=True)
+    if len(categories) == 0:
+        return categories, np.zeros(0)
+    groups = groups.reshape(-1)  # NumPy 2.x: gleiche Form wie die Eingabe
+
+    first_day = np.datetime64(today, 'D') - (lookback_days - 1)
+    offsets = (np.array(days, dtype='datetime64[D]') - first_day).astype(np.int64)
+    daily = np.bincount(
+        groups * lookback_days + offsets,
+        weights=np.array(cents, dtype=np.float64),
+        minlength=len(categories) * lookback_days
+    ).reshape(len(categories), lookback_days)
+
+    weights = 0.5 ** (np.arange(lookback_days - 1, -1, -1) / half_life_days)  # heute = 1
+    weights[:offsets.min()] = 0
+    return categories, daily @ weights / weights.sum()
+
+
+def recurring_schedule(templates, today, end):
+    """
+    Noch nicht gebuchte Ausführungen aktiver Vorlagen bis `end`
+
+    Überfällige Ausführungen (Scheduler noch nicht gelaufen) zählen zu heute.
+
+    Returns:
+        (int64-Array Netto-Rappen pro Tag today..end, Einnahmen, Ausgaben)
+    """
+    schedule = np.zeros((end - today).days + 1, dtype=np.int64)
+    income = expense = 0
+    for template in templates:
+        if not template.active:
+            continue
+        until = min(end, _to_date(template.until_date)) if template.until_date else end
+        occurrence = _to_date(template.next_run)
+        while occurrence <= until:
+            cents = template.amount.cents
+            if template.transaction_type == 'income':
+                income += cents
+            else:
+                expense += cents
+                cents = -cents
+            schedule[max((occurrence - today).days, 0)] += cents
+            occurrence = occurrence_after(template.start_date, template.freq, template.interval_count, occurrence)
+    return schedule, income, expense
+
+
+def compute_forecast(today, balances, templates, spending, lookback_days, half_life_days):
+    """
+    Prognose aus den geladenen Daten (alles in Rappen, JSON-tauglich)
+
+    Args:
+        balances: gebuchter Saldo (Money) für jeden Tag today..Monatsende
+        templates: RecurringTransaction-Objekte
+        spending: (days, category_ids, cents) aus Transaction.daily_spending
+    """
+    end = month_end(today)
+    booked = np.array([balance.cents for balance in balances], dtype=np.int64)
+    schedule, recurring_income, recurring_expense = recurring_schedule(templates, today, end)
+    categories, velocity = spending_velocity(spending, today, lookback_days, half_life_days)
+
+    # Ab morgen pro Tag das Gesamttempo (heute ist bereits gebucht)
+    remaining_days = len(booked) - 1
+    spent_by_day = np.arange(len(booked)) * velocity.sum()
+    daily = np.rint(booked + np.cumsum(schedule) - spent_by_day).astype(np.int64)
+    projected = np.rint(velocity * remaining_days).astype(np.int64)
+
+    order = np.argsort(-projected, kind='stable')
+    return {
+        'day': today.isoformat(),
+        'month_end': end.isoformat(),
+        'current_balance': int(booked[0]),
+        'booked_until_month_end': int(booked[-1] - booked[0]),
+        'recurring_income': recurring_income,
+        'recurring_expense': recurring_expense,
+        'projected_spending': int(projected.sum()),
+        'projected_balance': int(booked[-1] + schedule.sum() - projected.sum()),
+        'categories': [
+            {
+                'category_id': int(categories[i]) or None,
+                'daily_velocity': int(round(velocity[i])),
+                'projected': int(projected[i])
+            }
+            for i in order
+        ],
+        'daily': daily.tolist()
+    }
+
+
+class ForecastService:
+    """Service für Saldo-Prognosen"""
+
+    @staticmethod
+    def compute(user_id, today):
+        """
+        Rechnet die Prognose neu (ohne Cache)
+
+        Returns:
+            Dict (Beträge in Rappen) oder None bei Fehler
+        """
+        end = month_end(today)
+        lookback_days = Config.FORECAST_LOOKBACK_DAYS
+        balances = BalanceIndex.balances_as_of(
+            user_id, [today + timedelta(days=offset) for offset in range((end - today).days + 1)]
+        )
+        spending = Transaction.daily_spending(user_id, today - timedelta(days=lookback_days - 1), today)
+        if balances is None or spending is None:
+            return None
+        templates = RecurringTransaction.get_all_by_user(user_id)
+        return compute_forecast(today, balances, templates, spending, lookback_days, Config.FORECAST_HALF_LIFE_DAYS)
+
+    @staticmethod
+    def _refresh(user_id, version, today):
+        """
+        Gespeicherte Prognose, falls zu (version, today) passend, sonst neu rechnen + speichern
+
+        Returns:
+            Dict (Rappen) oder None bei Fehler
+        """
+        stored = BalanceForecast.get(user_id)
+        if stored is not None and stored[:2] == (version, today):
+            return stored[2]
+        data = ForecastService.compute(user_id, today)
+        if data is not None:
+            BalanceForecast.save(user_id, version, today, data)
+        return data
+
+    @staticmethod
+    def get_forecast(user_id):
+        """
+        Saldo-Prognose bis Monatsende (gecacht bis zur nächsten Änderung)
+
+        Returns:
+            tuple: (success: bool, dict | message: str)
+        """
+        version = LedgerVersion.get(user_id)
+        if version is None:
+            return False, "Fehler beim Berechnen der Prognose"
+        today = date.today()
+
+        def load():
+            data = ForecastService._refresh(user_id, version, today)
+            return (version, today, data) if data is not None else None
+
+        entry = _forecasts.get(user_id, load)
+        if entry is not None and entry[:2] != (version, today):
+            _forecasts.invalidate(user_id)
+            entry = _forecasts.get(user_id, load)
+        if entry is None:
+            return False, "Fehler beim Berechnen der Prognose"
+
+        data = entry[2]
+        categories = Category.by_id(user_id)
+        start = date.fromisoformat(data['day'])
+        return True, {
+            'version': entry[0],
+            'as_of': data['day'],
+            'month_end': data['month_end'],
+            'current_balance': Money(data['current_balance']),
+            'booked_until_month_end': Money(data['booked_until_month_end']),
+            'recurring_income': Money(data['recurring_income']),
+            'recurring_expense': Money(data['recurring_expense']),
+            'projected_spending': Money(data['projected_spending']),
+            'projected_balance': Money(data['projected_balance']),
+            'categories': [{
+                'category_id': item['category_id'],
+                'category_name': categories[item['category_id']].name if item['category_id'] in categories else None,
+                'daily_velocity': Money(item['daily_velocity']),
+                'projected': Money(item['projected'])
+            } for item in data['categories']],
+            'daily': [
+                {'date': (start + timedelta(days=offset)).isoformat(), 'balance': Money(cents)}
+                for offset, cents in enumerate(data['daily'])
+            ]
+        }
+
+    @staticmethod
+    def run(today=None):
+        """
+        Prognosen aller aktiven User vorrechnen (Scheduler, einmal pro Tag)
+
+        Aktiv = Transaktionen in den letzten FORECAST_LOOKBACK_DAYS Tagen.
+        Bereits passende Prognosen werden übersprungen.
+
+        Returns:
+            Dict mit users, computed
+        """
+        today = today or date.today()
+        user_ids = Transaction.users_active_since(today - timedelta(days=Config.FORECAST_LOOKBACK_DAYS - 1))
+        computed = 0
+        for user_id in user_ids:
+            version = LedgerVersion.get(user_id)
+            stored = BalanceForecast.get(user_id)
+            if version is None or (stored is not None and stored[:2] == (version, today)):
+                continue
+            data = ForecastService.compute(user_id, today)
+            if data is not None and BalanceForecast.save(user_id, version, today, data):
+                computed += 1
+        return {'users': len(user_ids), 'computed': computed}
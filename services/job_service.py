@@ -0,0 +1,348 @@
+"""
+Job Service - Hintergrund-Jobs (Import, Export, Neuberechnungen, Archivierung, Regeln,
+Kategorien zusammenführen)
+
+Request-Handler legen nur einen Job an (JobService.enqueue) und antworten
+sofort mit 202 + Job-ID. Der Worker-Prozess (worker.py) holt die Jobs ab
+und führt die hier registrierten Handler aus.
+
+Neuen Job-Typ hinzufügen:
+
+    @job_handler('mein_job')
+    def _mein_job(job, ctx):
+        ctx.progress(0, total)
+        ...
+        return {'ergebnis': ...}   # wird als JSON gespeichert
+"""
+import csv
+import io
+import threading
+from datetime import datetime, timedelta
+from models.job import Job
+from models.transaction import Transaction
+from models.balance_checkpoint import BalanceCheckpoint
+from models.balance_index import BalanceIndex
+from models.budget import Budget
+from models.category import Category
+from services.archive_service import ArchiveService, archive_cutoff
+from services.category_service import CategoryService
+from services.rule_service import RuleService
+from utils.money import Money
+from config import Config
+
+# Max. wartende + laufende Jobs pro User (Schutz vor Job-Flut)
+MAX_ACTIVE_JOBS_PER_USER = 5
+# Max. gleichzeitig LAUFENDE Jobs pro User (vom Worker durchgesetzt)
+MAX_RUNNING_JOBS_PER_USER = 1
+# Ohne Lebenszeichen so lange → Worker gilt als tot, Job wird neu eingereiht
+STALE_AFTER = timedelta(minutes=15)
+# Lebenszeichen laufender Jobs (eigener Thread, auch ohne Fortschritts-Updates)
+HEARTBEAT_SECONDS = 60
+
+IMPORT_CHUNK_SIZE = 500
+
+# Job-Typen mit Datei-Ausgabe in job_output → Dateiname für den Download
+OUTPUT_FILES = {'export_transactions': 'transactions.csv'}
+
+JOB_HANDLERS = {}
+
+
+def job_handler(kind):
+    """Registriert eine Funktion als Handler für einen Job-Typ"""
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+class JobCancelled(Exception):
+    """Wird von JobContext.progress() geworfen, wenn der Job abgebrochen wurde"""
+
+
+class JobContext:
+    """Wird an jeden Handler übergeben (Fortschritt + Abbruch)"""
+
+    def __init__(self, job):
+        self.job = job
+
+    def progress(self, done, total=None):
+        """Speichert Fortschritt; wirft JobCancelled bei angefordertem Abbruch"""
+        if Job.update_progress(self.job.id, done, total, self.job.attempts):
+            raise JobCancelled()
+
+
+class JobService:
+    """Service für Hintergrund-Jobs"""
+
+    @staticmethod
+    def enqueue(user_id, kind, params=None):
+        """
+        Legt neuen Job an
+
+        Returns:
+            tuple: (success: bool, job_id: int | message: str)
+        """
+        if kind not in JOB_HANDLERS:
+            return False, "Unbekannter Job-Typ"
+
+        if Job.count_active(user_id) >= MAX_ACTIVE_JOBS_PER_USER:
+            return False, "Zu viele offene Jobs - bitte warten"
+
+        job_id = Job.create(user_id, kind, params)
+        if job_id:
+            return True, job_id
+        return False, "Fehler beim Anlegen des Jobs"
+
+    @staticmethod
+    def job_as_dict(job, include_result=True):
+        data = {
+            'id': job.id,
+            'kind': job.kind,
+            'status': job.status,
+            'progress': job.progress,
+            'total': job.total,
+            'error': job.error,
+            'created_at': job.created_at.strftime('%Y-%m-%d %H:%M:%S') if job.created_at else None,
+            'finished_at': job.finished_at.strftime('%Y-%m-%d %H:%M:%S') if job.finished_at else None
+        }
+        if include_result:
+            data['result'] = job.result
+        return data
+
+    @staticmethod
+    def get_job(job_id, user_id):
+        job = Job.get_by_id(job_id, user_id)
+        return JobService.job_as_dict(job) if job else None
+
+    @staticmethod
+    def get_jobs(user_id):
+        """Liste ohne Ergebnisse (Details über get_job)"""
+        return [JobService.job_as_dict(job, include_result=False) for job in Job.get_all_by_user(user_id)]
+
+    @staticmethod
+    def get_output(job_id, user_id):
+        """
+        Ausgabe eines abgeschlossenen Jobs mit Datei (z.B. CSV-Export)
+
+        Returns:
+            tuple: (Dateiname, Generator über Text-Blöcke) oder None
+        """
+        job = Job.get_by_id(job_id, user_id)
+        if job is None or job.status != 'done' or job.kind not in OUTPUT_FILES:
+            return None
+        return OUTPUT_FILES[job.kind], Job.iter_output(job.id)
+
+    @staticmethod
+    def cancel_job(job_id, user_id):
+        """
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        if Job.request_cancel(job_id, user_id):
+            return True, "Abbruch angefordert"
+        return False, "Job nicht gefunden oder bereits beendet"
+
+    @staticmethod
+    def run(job):
+        """
+        Führt einen (bereits auf 'running' gesetzten) Job aus - vom Worker aufgerufen
+
+        Ein Heartbeat-Thread schreibt alle HEARTBEAT_SECONDS ein Lebenszeichen,
+        damit lange Schritte ohne Fortschritts-Update (z.B. rebuild_balances)
+        nicht als verwaist gelten und ein zweites Mal laufen.
+
+        Gehört der Job beim Abschluss nicht mehr diesem Lauf (neu eingereiht,
+        abgebrochen), wird das Ergebnis verworfen.
+        """
+        handler = JOB_HANDLERS.get(job.kind)
+        if handler is None:
+            Job.finish(job.id, 'failed', error=f"Unbekannter Job-Typ: {job.kind}", attempt=job.attempts)
+            return
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=_heartbeat, args=(job.id, job.attempts, stop),
+                                     name=f"job-{job.id}-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            result = handler(job, JobContext(job))
+            finished = Job.finish(job.id, 'done', result=result, attempt=job.attempts)
+        except JobCancelled:
+            finished = Job.finish(job.id, 'cancelled', attempt=job.attempts)
+        except Exception as e:
+            print(f"Error running job {job.id} ({job.kind}): {e}")
+            finished = Job.finish(job.id, 'failed', error=str(e), attempt=job.attempts)
+        finally:
+            stop.set()
+            heartbeat.join()
+        if not finished:
+            print(f"Job {job.id} ({job.kind}): gehört nicht mehr diesem Lauf - Ergebnis verworfen")
+
+    @staticmethod
+    def claim_next():
+        return Job.claim_next(MAX_RUNNING_JOBS_PER_USER)
+
+    @staticmethod
+    def requeue_stale():
+        return Job.requeue_stale(datetime.now() - STALE_AFTER)
+
+
+def _heartbeat(job_id, attempt, stop):
+    """Lebenszeichen bis stop gesetzt ist"""
+    while not stop.wait(HEARTBEAT_SECONDS):
+        Job.heartbeat(job_id, attempt)
+
+
+# ============================================================
+# JOB-HANDLER
+# ============================================================
+
+@job_handler('export_transactions')
+def _export_transactions(job, ctx):
+    """
+    Exportiert alle Transaktionen als CSV (blockweise gelesen und gespeichert)
+
+    Jeder Block landet als eigene Zeile in job_output, nicht in jobs.result
+    → Download über /api/jobs/<id>/download.
+    """
+    Job.clear_output(job.id)  # erneuter Lauf nach Neustart
+
+    done = 0
+    seq = 0
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['id', 'date', 'type', 'amount', 'category', 'description'])
+    for rows in Transaction.iter_chunks(job.user_id):
+        for row in rows:
+            writer.writerow([
+                row['id'],
+                row['date'].strftime('%Y-%m-%d'),
+                row['type'],
+                f"{row['amount']:.2f}",
+                row.get('category_name') or '',
+                row.get('description') or ''
+            ])
+        if not Job.append_output(job.id, seq, output.getvalue(), job.attempts):
+            raise ValueError("Export konnte nicht gespeichert werden")
+        seq += 1
+        output.seek(0)
+        output.truncate()
+        done += len(rows)
+        ctx.progress(done)
+
+    if seq == 0 and not Job.append_output(job.id, seq, output.getvalue(), job.attempts):
+        raise ValueError("Export konnte nicht gespeichert werden")
+    return {'rows': done}
+
+
+@job_handler('import_transactions')
+def _import_transactions(job, ctx):
+    """
+    Importiert Transaktionen aus params['rows'] (blockweise, fortsetzbar)
+
+    Jede Zeile: {amount, type, category_id, description, date ('YYYY-MM-DD')}
+    Ungültige Zeilen werden übersprungen und gemeldet, ebenso Zeilen mit einer
+    Kategorie, die nicht dem User gehört. Zeilen ohne category_id bekommen die
+    Kategorie der ersten passenden Regel (RuleService).
+    """
+    raw_rows = job.params.get('rows') or []
+    valid, errors = [], []
+    categories = Category.by_id(job.user_id)
+
+    for index, raw in enumerate(raw_rows):
+        try:
+            amount = Money.parse(raw['amount'])
+            if amount <= 0:
+                raise ValueError("Betrag muss größer als 0 sein")
+            if raw.get('type') not in ('income', 'expense'):
+                raise ValueError("Ungültiger Transaktionstyp")
+            date = datetime.strptime(raw['date'], '%Y-%m-%d') if raw.get('date') else datetime.now()
+            category_id = int(raw['category_id']) if raw.get('category_id') not in (None, '') else None
+            if category_id is not None and category_id not in categories:
+                Category.invalidate(job.user_id)  # Cache evtl. älter als die Kategorie
+                categories = Category.by_id(job.user_id)
+                if category_id not in categories:
+                    raise ValueError("Kategorie nicht gefunden")
+        except (KeyError, TypeError, ValueError) as e:
+            errors.append({'row': index, 'error': str(e)})
+            continue
+        valid.append({
+            'amount': amount,
+            'type': raw['type'],
+            'description': raw.get('description'),
+            'date': date,
+            'category_id': category_id
+        })
+
+    categorized = RuleService.categorize_rows(job.user_id, valid)
+
+    # Fortschritt = Anzahl bereits importierter Zeilen, gespeichert in derselben
+    # DB-Transaktion wie jeder Block → nach einem Neustart (Job neu eingereiht)
+    # geht es genau nach dem letzten committeten Block weiter, ohne Duplikate
+    imported = min(job.progress or 0, len(valid))
+    ctx.progress(imported, len(valid))
+    while imported < len(valid):
+        chunk = valid[imported:imported + IMPORT_CHUNK_SIZE]
+        done = imported + len(chunk)
+        count = Transaction.import_rows(
+            job.user_id, chunk,
+            before_commit=lambda cursor: Job.record_progress(cursor, job.id, done, len(valid), job.attempts)
+        )
+        if count != len(chunk):
+            raise ValueError(f"Import ab Zeile {imported + 1} fehlgeschlagen ({imported} importiert)")
+        imported = done
+        ctx.progress(imported, len(valid))
+
+    return {'imported': imported, 'categorized': categorized, 'skipped': len(errors), 'errors': errors[:100]}
+
+
+@job_handler('reapply_rules')
+def _reapply_rules(job, ctx):
+    """
+    Wendet die Kategorisierungs-Regeln auf bestehende Transaktionen an
+
+    params['overwrite']: True → auch bereits kategorisierte neu zuordnen
+    (Standard: nur Transaktionen ohne Kategorie)
+    """
+    return RuleService.reapply(job.user_id, overwrite=bool(job.params.get('overwrite')), progress=ctx.progress)
+
+
+@job_handler('merge_category')
+def _merge_category(job, ctx):
+    """
+    Hängt die Transaktionen von params['category_id'] blockweise nach
+    params['target_id'] um (fehlt: ohne Kategorie) und löscht danach die Kategorie
+    """
+    try:
+        category_id = int(job.params['category_id'])
+        target_id = int(job.params['target_id']) if job.params.get('target_id') else None
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("category_id/target_id ungültig")
+    success, message, moved = CategoryService.merge_category(
+        category_id, job.user_id, target_id, progress=ctx.progress
+    )
+    if not success:
+        raise ValueError(message)
+    return {'moved': moved, 'deleted': category_id, 'target_id': target_id}
+
+
+@job_handler('rebuild_balances')
+def _rebuild_balances(job, ctx):
+    """Berechnet alle abgeleiteten Salden/Zähler eines Users neu"""
+    ctx.progress(0, 3)
+    BalanceIndex.rebuild(job.user_id)
+    ctx.progress(1, 3)
+    Budget.rebuild(job.user_id)
+    ctx.progress(2, 3)
+    checkpoints = BalanceCheckpoint.rebuild(job.user_id)
+    ctx.progress(3, 3)
+    return {'checkpoints': checkpoints}
+
+
+@job_handler('archive_transactions')
+def _archive_transactions(job, ctx):
+    """Archiviert Transaktionen älter als params['older_than_days'] (Standard Config.ARCHIVE_AFTER_DAYS)"""
+    days = int(job.params.get('older_than_days') or Config.ARCHIVE_AFTER_DAYS)
+    if days <= 0:
+        raise ValueError("older_than_days muss grösser als 0 sein")
+    archived = ArchiveService.archive_user(job.user_id, days, progress=ctx.progress)
+    return {'archived': archived, 'before': archive_cutoff(days).strftime('%Y-%m-%d')}
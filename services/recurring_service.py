@@ -0,0 +1,217 @@
+"""
+Recurring Service - Wiederkehrende Transaktionen + Scheduler-Logik
+
+Der Scheduler (scheduler.py) ruft RecurringService.run_due() einmal pro Tick auf.
+Ablauf pro Batch (eine DB-Transaktion):
+    1. fällige Vorlagen holen + sperren (1 Index-Abfrage, SKIP LOCKED)
+    2. alle verpassten Ausführungen bis heute berechnen (Catch-up)
+    3. bereits gebuchte Ausführungen aussortieren (UNIQUE recurring_id/occurrence)
+    4. Transaktionen pro User mit einem mehrzeiligen INSERT anlegen
+    5. next_run der Vorlagen + Checkpoint speichern, commit
+
+Stirbt der Prozess mitten im Batch, wird der ganze Batch zurückgerollt und
+beim nächsten Start erneut verarbeitet → idempotent.
+"""
+from collections import defaultdict
+from datetime import datetime
+from models.storage import get_db_connection, OK, REFERENCE_NOT_FOUND
+from models.recurring import RecurringTransaction, SchedulerState, FREQUENCIES, occurrence_after
+from models.transaction import Transaction
+from utils.money import Money
+
+SCHEDULER_NAME = 'recurring'
+BATCH_SIZE = 500
+
+
+class RecurringService:
+    """Service für wiederkehrende Transaktionen"""
+
+    @staticmethod
+    def add_recurring(user_id, amount, transaction_type, category_id, description,
+                      freq, interval_count=1, start_date=None, until_date=None):
+        """
+        Legt neue Vorlage an
+
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        try:
+            amount = Money.parse(amount)
+            if amount <= 0:
+                return False, "Betrag muss größer als 0 sein"
+        except (TypeError, ValueError):
+            return False, "Ungültiger Betrag"
+
+        if transaction_type not in ['income', 'expense']:
+            return False, "Ungültiger Transaktionstyp"
+
+        if freq not in FREQUENCIES:
+            return False, "Ungültige Frequenz (daily, weekly, monthly, yearly)"
+
+        try:
+            interval_count = int(interval_count or 1)
+        except (TypeError, ValueError):
+            return False, "Ungültiges Intervall"
+        if interval_count < 1:
+            return False, "Intervall muss mindestens 1 sein"
+
+        try:
+            start_date = (datetime.strptime(start_date, '%Y-%m-%d').date()
+                          if start_date else datetime.now().date())
+            until_date = datetime.strptime(until_date, '%Y-%m-%d').date() if until_date else None
+        except (TypeError, ValueError):
+            return False, "Ungültiges Datumsformat"
+        if until_date and until_date < start_date:
+            return False, "Enddatum liegt vor Startdatum"
+
+        try:
+            category_id = int(category_id) if category_id not in (None, '') else None
+        except (TypeError, ValueError):
+            return False, "Ungültige Kategorie"
+
+        status, _ = RecurringTransaction.create(user_id, amount, transaction_type, description, category_id,
+                                                freq, interval_count, start_date, until_date)
+        if status == OK:
+            return True, "Wiederkehrende Transaktion erstellt!"
+        if status == REFERENCE_NOT_FOUND:
+            return False, "Kategorie nicht gefunden"
+        return False, "Fehler beim Erstellen der wiederkehrenden Transaktion"
+
+    @staticmethod
+    def get_recurring_as_dict(user_id):
+        """Vorlagen als Dicts (für API)"""
+        return [{
+            'id': r.id,
+            'amount': r.amount,
+            'type': r.transaction_type,
+            'category_id': r.category_id,
+            'description': r.description,
+            'freq': r.freq,
+            'interval': r.interval_count,
+            'start_date': r.start_date.strftime('%Y-%m-%d'),
+            'until_date': r.until_date.strftime('%Y-%m-%d') if r.until_date else None,
+            'next_run': r.next_run.strftime('%Y-%m-%d'),
+            'active': r.active
+        } for r in RecurringTransaction.get_all_by_user(user_id)]
+
+    @staticmethod
+    def delete_recurring(recurring_id, user_id):
+        """
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        if RecurringTransaction.delete(recurring_id, user_id):
+            return True, "Wiederkehrende Transaktion gelöscht!"
+        return False, "Fehler beim Löschen der wiederkehrenden Transaktion"
+
+    @staticmethod
+    def _due_occurrences(schedule, today):
+        """
+        Alle fälligen Ausführungen einer Vorlage bis inkl. today
+
+        Returns:
+            tuple: (Liste von Daten, neues next_run, noch aktiv?)
+        """
+        occurrences = []
+        current = schedule['next_run']
+        until = schedule['until_date']
+        while current <= today and (until is None or current <= until):
+            occurrences.append(current)
+            current = occurrence_after(schedule['start_date'], schedule['freq'],
+                                       schedule['interval_count'], current)
+        active = until is None or current <= until
+        return occurrences, current, active
+
+    @staticmethod
+    def process_batch(today, batch_size=BATCH_SIZE):
+        """
+        Verarbeitet EINEN Batch fälliger Vorlagen in einer DB-Transaktion
+
+        Returns:
+            tuple: (Anzahl Vorlagen, Anzahl gebuchter Transaktionen)
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            conn.start_transaction()
+
+            schedules = RecurringTransaction.lock_due(cursor, today, batch_size)
+            if not schedules:
+                conn.commit()
+                return 0, 0
+
+            rows_by_user = defaultdict(list)
+            updates = []
+            for schedule in schedules:
+                occurrences, next_run, active = RecurringService._due_occurrences(schedule, today)
+                updates.append((next_run, 1 if active else 0, schedule['id']))
+                for occurrence in occurrences:
+                    rows_by_user[schedule['user_id']].append({
+                        'amount': schedule['amount'],
+                        'type': schedule['type'],
+                        'description': schedule['description'],
+                        'date': datetime(occurrence.year, occurrence.month, occurrence.day),
+                        'category_id': schedule['category_id'],
+                        'recurring_id': schedule['id'],
+                        'occurrence': occurrence
+                    })
+
+            # Schon gebuchte Ausführungen (z.B. nach Absturz) überspringen
+            oldest = min(schedule['next_run'] for schedule in schedules)
+            existing = Transaction.existing_occurrences(
+                cursor, [schedule['id'] for schedule in schedules], oldest
+            )
+
+            created = 0
+            for user_id, rows in rows_by_user.items():
+                new_rows = [r for r in rows if (r['recurring_id'], r['occurrence']) not in existing]
+                created += Transaction.bulk_create(cursor, user_id, new_rows)
+
+            RecurringTransaction.save_progress(cursor, updates)
+            SchedulerState.record(cursor, SCHEDULER_NAME, processed=created)
+            conn.commit()
+            return len(schedules), created
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def run_due(today=None, batch_size=BATCH_SIZE):
+        """
+        Ein Scheduler-Tick: arbeitet alle fälligen Vorlagen in Batches ab
+
+        Verpasste Läufe (Server aus, Absturz) werden automatisch nachgeholt,
+        weil next_run erst zusammen mit den Buchungen weitergeschoben wird.
+
+        Returns:
+            Dict mit schedules, created
+        """
+        today = today or datetime.now().date()
+        started = datetime.now()
+
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        SchedulerState.record(cursor, SCHEDULER_NAME, tick=started)
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        total_schedules = total_created = 0
+        while True:
+            schedules, created = RecurringService.process_batch(today, batch_size)
+            total_schedules += schedules
+            total_created += created
+            if schedules < batch_size:
+                break
+
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        SchedulerState.record(cursor, SCHEDULER_NAME, completed=datetime.now())
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+        return {'schedules': total_schedules, 'created': total_created}
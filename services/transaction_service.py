@@ -3,6 +3,12 @@ Transaction Service - Business-Logik für Transaktionen
 """
 from models.transaction import Transaction
 from models.category import Category
+from models.budget import Budget
+from models.storage import OK, NOT_FOUND, REFERENCE_NOT_FOUND
+from services.rule_service import RuleService
+from utils.concurrency import run_parallel
+from utils.money import Money
+from config import Config
 from datetime import datetime
 
 class TransactionService:
@@ -13,30 +19,47 @@ class TransactionService:
         """
         Fügt eine neue Transaktion hinzu
         
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        success, message, _ = TransactionService.add_transaction_with_budget(
+            user_id, amount, transaction_type, category_id, description, date
+        )
+        return success, message
+    
+    @staticmethod
+    def add_transaction_with_budget(user_id, amount, transaction_type, category_id, description, date=None):
+        """
+        Fügt eine neue Transaktion hinzu und liefert den Budget-Status der Kategorie
+        
+        Der Budget-Zähler wird beim Schreiben mitgeführt (siehe models/budget.py),
+        der Status ist danach nur noch ein Key-Lookup.
+        
         Args:
             user_id: Benutzer-ID
             amount: Betrag
             transaction_type: Typ (income/expense)
-            category: Kategorie
+            category_id: Kategorie-ID (leer → erste passende Regel, siehe RuleService)
             description: Beschreibung
             date: Datum (optional)
             
         Returns:
-            tuple: (success: bool, message: str)
+            tuple: (success: bool, message: str, budget: dict | None)
+                   budget nur bei Ausgaben mit Kategorie mit Budget
         """
         # Validierung
-        if not amount or not transaction_type or not category_id:
-            return False, "Betrag, Typ und Kategorie sind erforderlich"
+        if not amount or not transaction_type:
+            return False, "Betrag und Typ sind erforderlich", None
         
         try:
-            amount = float(amount)
+            amount = Money.parse(amount)
             if amount <= 0:
-                return False, "Betrag muss größer als 0 sein"
+                return False, "Betrag muss größer als 0 sein", None
         except ValueError:
-            return False, "Ungültiger Betrag"
+            return False, "Ungültiger Betrag", None
         
         if transaction_type not in ['income', 'expense']:
-            return False, "Ungültiger Transaktionstyp"
+            return False, "Ungültiger Transaktionstyp", None
         
         # Parse date if provided
         if date:
@@ -44,23 +67,36 @@ class TransactionService:
                 if isinstance(date, str):
                     date = datetime.strptime(date, '%Y-%m-%d').date()
             except ValueError:
-                return False, "Ungültiges Datumsformat"
+                return False, "Ungültiges Datumsformat", None
         
-        # Kategorie-ID verarbeiten (leerer String -> None)
-        if category_id == '':
-            category_id = None
+        # Kategorie-ID verarbeiten (leer → per Regel bestimmen)
+        if category_id in (None, ''):
+            category_id = RuleService.categorize(user_id, description, amount, transaction_type)
+            if category_id is None:
+                return False, "Kategorie ist erforderlich (keine Regel passt)", None
         else:
             try:
-                category_id = int(category_id) if category_id is not None else None
+                category_id = int(category_id)
             except (ValueError, TypeError):
-                return False, "Ungültige Kategorie"
+                return False, "Ungültige Kategorie", None
 
         # Erstelle Transaktion
         # Transaction.create signature: (user_id, amount, transaction_type, description, category_id=None, date=None)
-        if Transaction.create(user_id, amount, transaction_type, description, category_id, date):
-            return True, "Transaktion erfolgreich hinzugefügt!"
-        else:
-            return False, "Fehler beim Hinzufügen der Transaktion"
+        if not Transaction.create(user_id, amount, transaction_type, description, category_id, date):
+            return False, "Fehler beim Hinzufügen der Transaktion", None
+        
+        budget = None
+        if transaction_type == 'expense' and category_id:
+            budget = Budget.get_status(user_id, category_id, date or datetime.now())
+            if budget and budget['budget'] is None:
+                budget = None
+        
+        if budget and budget['over_budget']:
+            return True, (
+                f"Transaktion hinzugefügt - Budget für '{budget['category_name']}' "
+                f"um CHF {-budget['remaining']:.2f} überschritten!"
+            ), budget
+        return True, "Transaktion erfolgreich hinzugefügt!", budget
     
     @staticmethod
     def get_user_transactions(user_id):
@@ -105,7 +141,7 @@ class TransactionService:
         # Validierung
         if 'amount' in kwargs:
             try:
-                kwargs['amount'] = float(kwargs['amount'])
+                kwargs['amount'] = Money.parse(kwargs['amount'])
                 if kwargs['amount'] <= 0:
                     return False, "Betrag muss größer als 0 sein"
             except ValueError:
@@ -121,11 +157,22 @@ class TransactionService:
             except ValueError:
                 return False, "Ungültiges Datumsformat"
         
-        # Aktualisiere Transaktion
-        if Transaction.update(transaction_id, user_id, **kwargs):
+        # Kategorie: leer/0 → entfernen
+        if 'category_id' in kwargs:
+            try:
+                kwargs['category_id'] = int(kwargs['category_id'] or 0)
+            except (TypeError, ValueError):
+                return False, "Ungültige Kategorie"
+        
+        # Aktualisiere Transaktion (Eigentum + Kategorie prüft das UPDATE selbst)
+        status = Transaction.update(transaction_id, user_id, **kwargs)
+        if status == OK:
             return True, "Transaktion erfolgreich aktualisiert!"
-        else:
-            return False, "Fehler beim Aktualisieren der Transaktion"
+        if status == NOT_FOUND:
+            return False, "Transaktion nicht gefunden"
+        if status == REFERENCE_NOT_FOUND:
+            return False, "Kategorie nicht gefunden"
+        return False, "Fehler beim Aktualisieren der Transaktion"
     
     @staticmethod
     def delete_transaction(transaction_id, user_id):
@@ -139,73 +186,164 @@ class TransactionService:
         Returns:
             tuple: (success: bool, message: str)
         """
-        if Transaction.delete(transaction_id, user_id):
+        status = Transaction.delete(transaction_id, user_id)
+        if status == OK:
             return True, "Transaktion erfolgreich gelöscht!"
-        else:
-            return False, "Fehler beim Löschen der Transaktion"
+        if status == NOT_FOUND:
+            return False, "Transaktion nicht gefunden"
+        return False, "Fehler beim Löschen der Transaktion"
     
     @staticmethod
-    def get_dashboard_data(user_id):
+    def get_dashboard_data(user_id, page=None, per_page=50):
         """
         Holt alle Daten für das Dashboard
         
         Args:
             user_id: Benutzer-ID
+            page: Seite der Transaktionsliste (None = alle)
+            per_page: Einträge pro Seite
             
+        Die vier Abfragen sind unabhängig und laufen parallel (je eine eigene
+        Verbindung aus dem Pool), mit gemeinsamer Deadline Config.DASHBOARD_DEADLINE.
+        Was bis dahin fehlt, wird leer angezeigt und in 'partial' gemeldet.
+        
         Returns:
             Dict mit Dashboard-Daten
         """
-        transactions = Transaction.get_all_by_user(user_id)
-        summary = Transaction.get_summary_by_user(user_id)
-
-        # Kategorien für Chart (name -> {total, color})
-        category_chart = Transaction.get_by_category(user_id)
+        results, missing = run_parallel({
+            'transactions': (Transaction.get_page_with_balance, (user_id, page, per_page)),
+            'summary': (Transaction.get_summary_by_user, (user_id,)),
+            # Kategorien für Chart (name -> {total, color})
+            'category_chart': (Transaction.get_by_category, (user_id,)),
+            # Kategorien für Dropdown
+            'categories': (Category.get_all_by_user, (user_id,)),
+        }, timeout=Config.DASHBOARD_DEADLINE)
+        
+        transactions = results.get('transactions', [])
+        summary = results.get('summary', {'total_income': 0, 'total_expenses': 0, 'balance': 0})
+        category_chart = results.get('category_chart', {})
+        category_objs = results.get('categories', [])
 
         # Kategorien für Dropdown (Liste von Dicts mit id + name)
-        category_objs = Category.get_all_by_user(user_id)
         categories_dropdown = [
             {'id': c.id, 'name': c.name, 'color': c.color}
             for c in category_objs
         ]
 
         # Format transactions for display to match template keys
-        formatted_transactions = []
-        for t in transactions:
-            formatted_transactions.append({
-                'id': t.id,
-                'amount': float(t.amount),
-                'type': t.transaction_type,
-                'category_name': t.category_name or 'Ohne Kategorie',
-                'category_color': t.category_color or '#999999',
-                'description': t.description or '',
-                'date': t.date.strftime('%Y-%m-%d') if t.date else ''
-            })
+        formatted_transactions = TransactionService._format_with_balance(transactions)
+
+        # Saldo-Verlauf für Linienchart (älteste zuerst)
+        balance_chart = [
+            {'date': t['date'], 'balance': t['balance']}
+            for t in reversed(formatted_transactions)
+        ]
 
         return {
             'transactions': formatted_transactions,
             'summary': summary,
             'categories': categories_dropdown,
-            'category_chart': category_chart
+            'category_chart': category_chart,
+            'balance_chart': balance_chart,
+            'page': page,
+            'per_page': per_page,
+            'partial': missing
         }
     
     @staticmethod
-    def get_transactions_as_dict(user_id):
+    def get_running_balance(user_id, page=1, per_page=50):
         """
-        Holt Transaktionen als Dictionary (für API)
+        Holt eine Seite Transaktionen mit laufendem Saldo (für API)
         
         Args:
             user_id: Benutzer-ID
+            page: Seite (1-basiert)
+            per_page: Einträge pro Seite (max. 500)
             
         Returns:
-            Liste von Dicts
+            Liste von Dicts (neueste zuerst, mit 'balance')
         """
-        transactions = Transaction.get_all_by_user(user_id)
+        per_page = max(1, min(per_page, 500))
+        transactions = Transaction.get_page_with_balance(user_id, max(page, 1), per_page)
+        return TransactionService._format_with_balance(transactions)
+    
+    @staticmethod
+    def get_balance(user_id, as_of=None, start=None, end=None):
+        """
+        Saldo zu einem Datum oder Veränderung zwischen zwei Daten
         
+        Args:
+            user_id: Benutzer-ID
+            as_of: 'YYYY-MM-DD' → Saldo am Ende dieses Tages
+            start, end: 'YYYY-MM-DD' → Veränderung im Zeitraum (inklusive)
+            
+        Returns:
+            tuple: (success: bool, data: dict | message: str)
+        """
+        try:
+            if start or end:
+                if not (start and end):
+                    return False, "Start- und Enddatum sind erforderlich"
+                start_date = datetime.strptime(start, '%Y-%m-%d').date()
+                end_date = datetime.strptime(end, '%Y-%m-%d').date()
+                if end_date < start_date:
+                    return False, "Enddatum liegt vor Startdatum"
+                change = Transaction.get_balance_between(user_id, start_date, end_date)
+                return True, {
+                    'start': start_date.strftime('%Y-%m-%d'),
+                    'end': end_date.strftime('%Y-%m-%d'),
+                    'change': change
+                }
+            
+            as_of_date = datetime.strptime(as_of, '%Y-%m-%d').date() if as_of else datetime.now().date()
+        except ValueError:
+            return False, "Ungültiges Datumsformat"
+        
+        balance = Transaction.get_balance_as_of(user_id, as_of_date)
+        return True, {
+            'date': as_of_date.strftime('%Y-%m-%d'),
+            'balance': balance
+        }
+    
+    @staticmethod
+    def _format_with_balance(transactions):
+        """Transaction-Objekte → Dicts für Template/API (inkl. Saldo)"""
         return [{
             'id': t.id,
-            'amount': float(t.amount),
+            'amount': t.amount,
             'type': t.transaction_type,
-            'category': t.category,
-            'description': t.description,
-            'date': t.date.strftime('%Y-%m-%d') if t.date else None
-        } for t in transactions]
\ No newline at end of file
+            'category_name': t.category_name or 'Ohne Kategorie',
+            'category_color': t.category_color or '#999999',
+            'description': t.description or '',
+            'date': t.date.strftime('%Y-%m-%d') if t.date else '',
+            'balance': t.balance
+        } for t in transactions]
+    
+    @staticmethod
+    def get_transactions_as_dict(user_id, include_archived=False):
+        """
+        Holt Transaktionen als Dictionary (für API)
+        
+        Args:
+            user_id: Benutzer-ID
+            include_archived: True → auch archivierte Transaktionen (mit 'archived')
+            
+        Returns:
+            Liste von Dicts
+        """
+        transactions = Transaction.get_all_by_user(user_id, include_archived)
+        
+        result = []
+        for t in transactions:
+            item = {
+                'id': t.id,
+                'amount': t.amount,
+                'type': t.transaction_type,
+                'category': t.category_name,
+                'description': t.description,
+                'date': t.date.strftime('%Y-%m-%d') if t.date else None
+            }
+            if include_archived:
+                item['archived'] = t.archived
+            result.append(item)
+        return result
\ No newline at end of file
@@ -3,6 +3,7 @@ import argparse
 import secrets
 import string
 import sys
+from datetime import date
 
 import mysql.connector
 from mysql.connector import Error
@@ -24,11 +25,52 @@ CREATE TABLE IF NOT EXISTS categories (
   user_id INT NOT NULL,
   name VARCHAR(100) NOT NULL,
   color CHAR(7) DEFAULT '#999999',
+  monthly_budget DECIMAL(12,2) NULL,
   UNIQUE KEY uniq_user_name (user_id, name),
   CONSTRAINT fk_cat_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 """
 
+# Regeln für die automatische Kategorisierung (siehe models/category_rule.py)
+CATEGORY_RULES_SQL = """
+CREATE TABLE IF NOT EXISTS category_rules (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  user_id INT NOT NULL,
+  category_id INT NOT NULL,
+  kind ENUM('contains','regex') NOT NULL DEFAULT 'contains',
+  pattern VARCHAR(255) NULL,
+  min_amount DECIMAL(12,2) NULL,
+  max_amount DECIMAL(12,2) NULL,
+  type ENUM('income','expense') NULL,
+  priority INT NOT NULL DEFAULT 100,
+  KEY idx_rules_user (user_id, priority, id),
+  CONSTRAINT fk_rule_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+  CONSTRAINT fk_rule_cat  FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
+);
+"""
+
+# Vorlagen für wiederkehrende Transaktionen (siehe models/recurring.py)
+RECURRING_SQL = """
+CREATE TABLE IF NOT EXISTS recurring_transactions (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  user_id INT NOT NULL,
+  amount DECIMAL(12,2) NOT NULL,
+  type ENUM('income','expense') NOT NULL,
+  description VARCHAR(255),
+  category_id INT NULL,
+  freq ENUM('daily','weekly','monthly','yearly') NOT NULL,
+  interval_count INT NOT NULL DEFAULT 1,
+  start_date DATE NOT NULL,
+  until_date DATE NULL,
+  next_run DATE NOT NULL,
+  active TINYINT(1) NOT NULL DEFAULT 1,
+  KEY idx_rec_due (active, next_run, id),
+  KEY idx_rec_user (user_id),
+  CONSTRAINT fk_rec_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+  CONSTRAINT fk_rec_cat  FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE SET NULL
+);
+"""
+
 TRANSACTIONS_SQL = """
 CREATE TABLE IF NOT EXISTS transactions (
   id INT AUTO_INCREMENT PRIMARY KEY,
@@ -38,11 +80,272 @@ CREATE TABLE IF NOT EXISTS transactions (
   description VARCHAR(255),
   date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
   category_id INT NULL,
+  recurring_id INT NULL,
+  occurrence DATE NULL,
+  KEY idx_tx_user_date (user_id, date, id),
+  KEY idx_tx_user_cat (user_id, category_id, date, id),
+  UNIQUE KEY uniq_recurring_occurrence (recurring_id, occurrence),
   CONSTRAINT fk_tx_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-  CONSTRAINT fk_tx_cat  FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE SET NULL
+  CONSTRAINT fk_tx_cat  FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE SET NULL,
+  CONSTRAINT fk_tx_rec  FOREIGN KEY (recurring_id) REFERENCES recurring_transactions(id) ON DELETE SET NULL
+);
+"""
+
+# Archivierte (alte) Transaktionen, gleiche IDs wie zuvor (siehe models/archive.py)
+TRANSACTIONS_ARCHIVE_SQL = """
+CREATE TABLE IF NOT EXISTS transactions_archive (
+  id INT NOT NULL PRIMARY KEY,
+  user_id INT NOT NULL,
+  amount DECIMAL(12,2) NOT NULL,
+  type ENUM('income','expense') NOT NULL,
+  description VARCHAR(255),
+  date DATETIME NOT NULL,
+  category_id INT NULL,
+  recurring_id INT NULL,
+  occurrence DATE NULL,
+  archived_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  KEY idx_txa_user_date (user_id, date, id),
+  CONSTRAINT fk_txa_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+"""
+
+# Summen der archivierten Transaktionen pro Kategorie (0 = ohne Kategorie) und Typ
+ARCHIVE_TOTALS_SQL = """
+CREATE TABLE IF NOT EXISTS archive_totals (
+  user_id INT NOT NULL,
+  category_id INT NOT NULL DEFAULT 0,
+  type ENUM('income','expense') NOT NULL,
+  total DECIMAL(14,2) NOT NULL DEFAULT 0,
+  tx_count INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, category_id, type),
+  CONSTRAINT fk_at_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+"""
+
+# Zwischensalden alle N Transaktionen (siehe models/balance_checkpoint.py)
+BALANCE_CHECKPOINTS_SQL = """
+CREATE TABLE IF NOT EXISTS balance_checkpoints (
+  user_id INT NOT NULL,
+  date DATETIME NOT NULL,
+  tx_id INT NOT NULL,
+  balance DECIMAL(14,2) NOT NULL,
+  PRIMARY KEY (user_id, date, tx_id),
+  CONSTRAINT fk_bc_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+"""
+
+# Fenwick-Baum für Saldo pro Tag (siehe models/balance_index.py)
+BALANCE_FENWICK_SQL = """
+CREATE TABLE IF NOT EXISTS balance_fenwick (
+  user_id INT NOT NULL,
+  node INT NOT NULL,
+  value DECIMAL(14,2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, node),
+  CONSTRAINT fk_bf_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 """
 
+# Datenstand pro User, steigt bei jeder Änderung an transactions (siehe models/ledger_version.py)
+LEDGER_VERSIONS_SQL = """
+CREATE TABLE IF NOT EXISTS ledger_versions (
+  user_id INT NOT NULL PRIMARY KEY,
+  version BIGINT NOT NULL DEFAULT 0,
+  CONSTRAINT fk_lv_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+"""
+
+# Zuletzt berechnete Saldo-Prognose pro User (siehe models/forecast.py)
+BALANCE_FORECASTS_SQL = """
+CREATE TABLE IF NOT EXISTS balance_forecasts (
+  user_id INT NOT NULL PRIMARY KEY,
+  version BIGINT NOT NULL,
+  day DATE NOT NULL,
+  data MEDIUMTEXT NOT NULL,
+  computed_at DATETIME NOT NULL,
+  CONSTRAINT fk_bfc_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+"""
+
+# Ausgaben pro Kategorie und Monat (siehe models/budget.py)
+CATEGORY_SPEND_SQL = """
+CREATE TABLE IF NOT EXISTS category_spend (
+  user_id INT NOT NULL,
+  category_id INT NOT NULL,
+  month DATE NOT NULL,
+  spent DECIMAL(14,2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, category_id, month),
+  CONSTRAINT fk_cs_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+  CONSTRAINT fk_cs_cat  FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE CASCADE
+);
+"""
+
+# Checkpoint des Schedulers (siehe scheduler.py)
+SCHEDULER_STATE_SQL = """
+CREATE TABLE IF NOT EXISTS scheduler_state (
+  name VARCHAR(50) PRIMARY KEY,
+  last_tick DATETIME NULL,
+  last_completed DATETIME NULL,
+  processed BIGINT NOT NULL DEFAULT 0
+);
+"""
+
+# Hintergrund-Jobs (siehe models/job.py, worker.py)
+JOBS_SQL = """
+CREATE TABLE IF NOT EXISTS jobs (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  user_id INT NOT NULL,
+  kind VARCHAR(50) NOT NULL,
+  params MEDIUMTEXT,
+  status ENUM('queued','running','done','failed','cancelled') NOT NULL DEFAULT 'queued',
+  progress INT NOT NULL DEFAULT 0,
+  total INT NULL,
+  result MEDIUMTEXT,
+  error VARCHAR(500),
+  cancel_requested TINYINT(1) NOT NULL DEFAULT 0,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  started_at DATETIME NULL,
+  finished_at DATETIME NULL,
+  heartbeat_at DATETIME NULL,
+  attempts INT NOT NULL DEFAULT 0,
+  KEY idx_jobs_status (status, id),
+  KEY idx_jobs_user (user_id, status),
+  CONSTRAINT fk_jobs_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+"""
+
+# Ausgabe von Jobs (z.B. CSV-Export) in Blöcken statt in jobs.result
+JOB_OUTPUT_SQL = """
+CREATE TABLE IF NOT EXISTS job_output (
+  job_id INT NOT NULL,
+  seq INT NOT NULL,
+  data MEDIUMTEXT NOT NULL,
+  PRIMARY KEY (job_id, seq),
+  CONSTRAINT fk_jo_job FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE
+);
+"""
+
+# Spalten, die bei bestehenden Installationen nachträglich ergänzt werden
+ADDED_COLUMNS = [
+    ("categories", "monthly_budget", "DECIMAL(12,2) NULL"),
+    ("transactions", "recurring_id", "INT NULL"),
+    ("transactions", "occurrence", "DATE NULL"),
+    ("jobs", "attempts", "INT NOT NULL DEFAULT 0"),
+]
+
+# Indizes, die bei bestehenden Installationen nachträglich ergänzt werden
+ADDED_INDEXES = [
+    ("transactions", "idx_tx_user_date", "KEY idx_tx_user_date (user_id, date, id)"),
+    ("transactions", "idx_tx_user_cat", "KEY idx_tx_user_cat (user_id, category_id, date, id)"),
+    ("transactions", "uniq_recurring_occurrence", "UNIQUE KEY uniq_recurring_occurrence (recurring_id, occurrence)"),
+]
+
+def ensure_column(cur, table: str, column: str, definition: str, schema: str = DB_NAME) -> None:
+    # CREATE TABLE IF NOT EXISTS ändert bestehende Tabellen nicht → Spalte ggf. nachziehen
+    cur.execute(
+        "SELECT COUNT(*) FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (schema, table, column),
+    )
+    if cur.fetchone()[0] == 0:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition};")
+
+def ensure_index(cur, table: str, index: str, definition: str, schema: str = DB_NAME) -> None:
+    cur.execute(
+        "SELECT COUNT(*) FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND INDEX_NAME = %s",
+        (schema, table, index),
+    )
+    if cur.fetchone()[0] == 0:
+        cur.execute(f"ALTER TABLE {table} ADD {definition};")
+
+# Reihenfolge = Abhängigkeiten (Foreign Keys); auch vom SQLite-Backend verwendet
+TABLES_SQL = [
+    USERS_SQL, CATEGORIES_SQL, CATEGORY_RULES_SQL, RECURRING_SQL, TRANSACTIONS_SQL, TRANSACTIONS_ARCHIVE_SQL,
+    ARCHIVE_TOTALS_SQL, BALANCE_CHECKPOINTS_SQL, BALANCE_FENWICK_SQL, LEDGER_VERSIONS_SQL, BALANCE_FORECASTS_SQL,
+    CATEGORY_SPEND_SQL, SCHEDULER_STATE_SQL, JOBS_SQL, JOB_OUTPUT_SQL,
+]
+
+def create_schema(cur, schema: str = DB_NAME) -> None:
+    # Tabellen + nachträgliche Spalten/Indizes in der aktuellen DB (USE schema)
+    for table_sql in TABLES_SQL:
+        cur.execute(table_sql)
+    for table, column, definition in ADDED_COLUMNS:
+        ensure_column(cur, table, column, definition, schema)
+    for table, index, definition in ADDED_INDEXES:
+        ensure_index(cur, table, index, definition, schema)
+
+# Partitionierung von transactions nach Jahr (optional, siehe partition_transactions)
+PARTITION_YEARS_AHEAD = 2
+TRANSACTION_FOREIGN_KEYS = ("fk_tx_user", "fk_tx_cat", "fk_tx_rec")
+
+def partition_definitions(first_year: int, last_year: int) -> str:
+    # Ein Jahr pro Partition + Auffang-Partition, damit Inserts nie fehlschlagen
+    parts = [f"PARTITION p{year} VALUES LESS THAN ('{year + 1}-01-01')" for year in range(first_year, last_year + 1)]
+    parts.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    return ", ".join(parts)
+
+def transaction_partitions(cur, schema: str = DB_NAME) -> list:
+    cur.execute(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'transactions' AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION",
+        (schema,),
+    )
+    return [row[0] for row in cur.fetchall()]
+
+def ensure_future_partitions(cur, schema: str = DB_NAME, years_ahead: int = PARTITION_YEARS_AHEAD) -> list:
+    # Auffang-Partition pmax in neue Jahres-Partitionen aufteilen. Billig, solange pmax leer ist.
+    # pmax fängt aber jede Buchung nach dem letzten Jahr auf (z.B. Tippfehler 2099 oder Vorlagen
+    # weit in der Zukunft) - dann kopiert REORGANIZE diese Zeilen und sperrt dabei die Tabelle.
+    years = [int(name[1:]) for name in transaction_partitions(cur, schema) if name != "pmax"]
+    if not years:
+        return []
+    target = date.today().year + years_ahead
+    if max(years) >= target:
+        return []
+    cur.execute("SELECT COUNT(*) FROM transactions PARTITION (pmax)")
+    rows = cur.fetchone()[0]
+    if rows:
+        print(f"[WARN] Partition pmax enthält {rows} Transaktionen ab {max(years) + 1}-01-01 - "
+              f"REORGANIZE kopiert sie, transactions ist solange gesperrt")
+    cur.execute(
+        f"ALTER TABLE transactions REORGANIZE PARTITION pmax INTO "
+        f"({partition_definitions(max(years) + 1, target)})"
+    )
+    return [f"p{year}" for year in range(max(years) + 1, target + 1)]
+
+def partition_transactions(cur, schema: str = DB_NAME, years_ahead: int = PARTITION_YEARS_AHEAD) -> list:
+    # Einmalige Migration auf RANGE COLUMNS(date). MySQL verlangt dafür:
+    # - keine Foreign Keys (ON DELETE SET NULL übernehmen Category.delete/RecurringTransaction.delete)
+    # - date in jedem eindeutigen Schlüssel (PRIMARY KEY, uniq_recurring_occurrence)
+    if transaction_partitions(cur, schema):
+        return ensure_future_partitions(cur, schema, years_ahead)
+
+    cur.execute(
+        "SELECT CONSTRAINT_NAME FROM information_schema.TABLE_CONSTRAINTS "
+        "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'transactions' AND CONSTRAINT_TYPE = 'FOREIGN KEY'",
+        (schema,),
+    )
+    for (constraint,) in cur.fetchall():
+        if constraint in TRANSACTION_FOREIGN_KEYS:
+            cur.execute(f"ALTER TABLE transactions DROP FOREIGN KEY {constraint};")
+    cur.execute(
+        "ALTER TABLE transactions "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (id, date), "
+        "DROP INDEX uniq_recurring_occurrence, "
+        "ADD UNIQUE KEY uniq_recurring_occurrence (recurring_id, occurrence, date);"
+    )
+
+    cur.execute("SELECT MIN(date) FROM transactions")
+    oldest = cur.fetchone()[0]
+    first_year = oldest.year if oldest else date.today().year
+    last_year = date.today().year + years_ahead
+    cur.execute(
+        f"ALTER TABLE transactions PARTITION BY RANGE COLUMNS(date) "
+        f"({partition_definitions(first_year, last_year)});"
+    )
+    return [f"p{year}" for year in range(first_year, last_year + 1)] + ["pmax"]
+
 def gen_password(length: int = 22) -> str:
     # gut für Copy&Paste, vermeidet Leerzeichen/Anführungszeichen
     alphabet = string.ascii_letters + string.digits + "-._@#%+="
@@ -53,6 +356,10 @@ def main() -> int:
     ap.add_argument("--host", default="localhost")
     ap.add_argument("--port", default=3306, type=int)
     ap.add_argument("--root-user", default="root")
+    ap.add_argument("--partition-transactions", action="store_true",
+                    help="transactions nach Jahr partitionieren (entfernt deren Foreign Keys)")
+    ap.add_argument("--years-ahead", default=PARTITION_YEARS_AHEAD, type=int,
+                    help="so viele künftige Jahres-Partitionen vorhalten")
     args = ap.parse_args()
 
     root_pass = getpass.getpass("MySQL root password: ")
@@ -73,9 +380,11 @@ def main() -> int:
         cur.execute(f"USE {DB_NAME};")
 
         # Tabellen anlegen
-        cur.execute(USERS_SQL)
-        cur.execute(CATEGORIES_SQL)
-        cur.execute(TRANSACTIONS_SQL)
+        create_schema(cur)
+        if args.partition_transactions:
+            created = partition_transactions(cur, DB_NAME, args.years_ahead)
+            print(f"Partitionen transactions: {', '.join(transaction_partitions(cur))}"
+                  f" (neu: {', '.join(created) or '-'})")
 
         # App-User anlegen + Rechte
         app_pass = gen_password()
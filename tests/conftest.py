@@ -0,0 +1,129 @@
+"""
+Gemeinsame Fixtures - jeder Test bekommt eine eigene SQLite-Datenbank
+
+    python -m pytest -q
+
+Kein DB-Server nötig: die Tests laufen auf dem SQLite-Backend
+(models/storage/sqlite_backend.py), das Schema kommt wie im Betrieb aus
+setup_db.TABLES_SQL.
+"""
+import os
+import sys
+
+os.environ['DB_ENGINE'] = 'sqlite'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from config import Config
+from models import storage
+from models.storage import sqlite_backend
+
+
+class PooledStyleConnection:
+    """
+    Verhält sich nach close() wie mysql.connector.pooling.PooledMySQLConnection:
+    die Verbindung ist zurück im Pool, jeder weitere Zugriff schlägt fehl
+
+    SQLite allein würde Zugriffe nach close() stillschweigend erlauben.
+    """
+
+    def __init__(self, connection):
+        self._cnx = connection
+
+    def close(self):
+        if self._cnx is not None:
+            self._cnx.close()
+            self._cnx = None
+
+    def __getattr__(self, name):
+        if self._cnx is None:
+            raise AttributeError(f"Verbindung ist geschlossen ({name})")
+        return getattr(self._cnx, name)
+
+
+def _clear_caches():
+    """Prozess-Caches leeren (IDs beginnen in jeder neuen Datenbank wieder bei 1)"""
+    from models.category import _cache as categories
+    from services.analytics_service import _stats
+    from services.forecast_service import _forecasts
+    from services.rule_service import _matchers
+
+    for cache in (categories, _stats, _forecasts, _matchers):
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    """Leere Datenbank pro Test (Datei in tmp_path), Verbindungen wie aus dem MySQL-Pool"""
+    monkeypatch.setattr(Config, 'SQLITE_PATH', str(tmp_path / 'budget.db'))
+    monkeypatch.setattr(sqlite_backend, '_schema_ready', False)
+    storage.use_engine('sqlite')
+    sqlite_backend._local.idle = []
+    connect = sqlite_backend.get_db_connection
+    monkeypatch.setattr(sqlite_backend, 'get_db_connection',
+                        lambda readonly=False: PooledStyleConnection(connect(readonly)))
+    _clear_caches()
+    yield
+    for connection in sqlite_backend._local.idle:
+        connection.close()
+    sqlite_backend._local.idle = []
+
+
+@pytest.fixture
+def make_user():
+    """
+    Legt User an
+
+    Returns:
+        Funktion(username) → user_id
+    """
+    from models.user import User
+
+    def create(username='alice'):
+        assert User.create(username, 'secret123')
+        return User.find_by_username(username).id
+    return create
+
+
+@pytest.fixture
+def user_id(make_user):
+    return make_user('alice')
+
+
+@pytest.fixture
+def make_category():
+    """
+    Legt Kategorien an
+
+    Returns:
+        Funktion(user_id, name) → category_id
+    """
+    from models.category import Category
+    from models.storage import OK
+
+    def create(user_id, name):
+        status, category_id = Category.create(user_id, name)
+        assert status == OK
+        Category.invalidate(user_id)
+        return category_id
+    return create
+
+
+@pytest.fixture
+def app():
+    from app import create_app
+
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app, user_id):
+    """Test-Client, eingeloggt als user_id"""
+    with app.test_client() as client:
+        with client.session_transaction() as session:
+            session['user_id'] = user_id
+            session['username'] = 'alice'
+        yield client
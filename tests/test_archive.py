@@ -0,0 +1,54 @@
+"""Archivierung: Salden und Summen bleiben über die ganze Historie korrekt"""
+from datetime import datetime, timedelta
+
+from models.archive import TransactionArchive
+from models.balance_index import BalanceIndex
+from models.transaction import Transaction
+from services.archive_service import ArchiveService
+from utils.money import Money
+
+
+def _ledger(user_id):
+    """60 alte Einnahmen (werden archiviert) + 120 neue Ausgaben"""
+    now = datetime.now().replace(microsecond=0)
+    old = [{'amount': '100.00', 'type': 'income', 'description': 'alt',
+            'date': now - timedelta(days=400, minutes=i), 'category_id': None} for i in range(60)]
+    new = [{'amount': f'{i + 1}.25', 'type': 'expense', 'description': 'neu',
+            'date': now - timedelta(days=30, minutes=i), 'category_id': None} for i in range(120)]
+    assert Transaction.import_rows(user_id, old + new) == 180
+    return old, new
+
+
+def test_archive_moves_rows_and_keeps_opening_balance(user_id):
+    _ledger(user_id)
+
+    assert ArchiveService.archive_user(user_id, 365, batch_size=25) == 60
+    assert TransactionArchive.opening_balance(user_id) == Money.of('6000.00')
+    assert BalanceIndex.balance_as_of(user_id, datetime.now().date()) == Money.of('6000.00') - Money.of(
+        sum(i + 1.25 for i in range(120))
+    )
+
+
+def test_running_balance_on_later_pages_includes_archive(user_id):
+    """
+    Seite 2+ ohne Checkpoint davor: Startwert = opening_balance()
+
+    Läuft mit Verbindungen, die nach close() unbrauchbar sind (conftest) →
+    fängt ab, wenn der Startwert über eine bereits geschlossene Verbindung
+    gelesen wird (Saldo wäre dann ohne Archiv).
+    """
+    _, new = _ledger(user_id)
+    ArchiveService.archive_user(user_id, 365)
+
+    # Erwarteter Saldo nach jeder Zeile (älteste zuerst), neueste zuerst wie die Liste
+    balance = Money.of('6000.00')
+    expected = []
+    for row in sorted(new, key=lambda row: row['date']):
+        balance -= Money.of(row['amount'])
+        expected.append(balance)
+    expected.reverse()
+
+    per_page = 50
+    for page in (1, 2, 3):
+        rows = Transaction.get_page_with_balance(user_id, page=page, per_page=per_page)
+        assert [row.balance for row in rows] == expected[(page - 1) * per_page:page * per_page]
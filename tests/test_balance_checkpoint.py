@@ -0,0 +1,142 @@
+"""Checkpoints für laufende Salden: Invalidierung bei rückdatierten Änderungen"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import balance_checkpoint
+from models.balance_checkpoint import BalanceCheckpoint
+from models.storage import get_db_connection, OK
+from models.transaction import Transaction
+from utils.money import Money
+
+
+@pytest.fixture(autouse=True)
+def small_interval(monkeypatch):
+    """Alle 10 statt 500 Transaktionen ein Checkpoint"""
+    monkeypatch.setattr(balance_checkpoint, 'CHECKPOINT_INTERVAL', 10)
+
+
+def _import(user_id, count, start):
+    rows = [{'amount': f'{i + 1}.00', 'type': 'income' if i % 3 == 0 else 'expense', 'description': 'x',
+             'date': start + timedelta(days=i), 'category_id': None} for i in range(count)]
+    assert Transaction.import_rows(user_id, rows) == count
+
+
+def _ledger(user_id):
+    """Alle Transaktionen als (date, id, Rappen mit Vorzeichen), sortiert"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT date, id, type, amount FROM transactions WHERE user_id = %s", (user_id,))
+    rows = sorted(
+        (date, id, Money.of(amount).cents * (1 if tx_type == 'income' else -1))
+        for date, id, tx_type, amount in cursor.fetchall()
+    )
+    cursor.close()
+    conn.close()
+    return rows
+
+
+def _checkpoints(user_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT date, tx_id, balance FROM balance_checkpoints WHERE user_id = %s ORDER BY date, tx_id",
+                   (user_id,))
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return rows
+
+
+def _assert_checkpoints_match_ledger(user_id):
+    running = 0
+    expected = {}
+    for date, tx_id, cents in _ledger(user_id):
+        running += cents
+        expected[(date, tx_id)] = running
+    for date, tx_id, balance in _checkpoints(user_id):
+        assert Money.of(balance).cents == expected[(date, tx_id)]
+
+
+def _assert_balance_before_matches_ledger(user_id):
+    ledger = _ledger(user_id)
+    running = 0
+    for date, tx_id, cents in ledger:
+        assert BalanceCheckpoint.balance_before(user_id, date, tx_id).cents == running
+        running += cents
+
+
+def test_checkpoints_every_interval(user_id):
+    _import(user_id, 35, datetime(2024, 1, 1, 12))
+
+    assert BalanceCheckpoint.refresh(user_id) == 3
+    assert len(_checkpoints(user_id)) == 3
+    _assert_checkpoints_match_ledger(user_id)
+    _assert_balance_before_matches_ledger(user_id)
+
+
+def test_backdated_writes_invalidate_later_checkpoints(user_id):
+    _import(user_id, 35, datetime(2024, 1, 1, 12))
+    BalanceCheckpoint.refresh(user_id)
+
+    # Einfügen vor allen Checkpoints
+    assert Transaction.create(user_id, '500.00', 'income', 'rückdatiert', date=datetime(2023, 12, 1))
+    assert _checkpoints(user_id) == []
+    _assert_balance_before_matches_ledger(user_id)
+
+    # Ändern und Löschen einer Zeile zwischen zwei Checkpoints
+    ledger = _ledger(user_id)
+    _, middle_id, _ = ledger[15]
+    assert Transaction.update(middle_id, user_id, amount='999.00') == OK
+    assert [row[0] for row in _checkpoints(user_id)] == [ledger[9][0]]
+    _assert_balance_before_matches_ledger(user_id)
+
+    _, other_id, _ = ledger[25]
+    assert Transaction.delete(other_id, user_id) == OK
+    _assert_checkpoints_match_ledger(user_id)
+    _assert_balance_before_matches_ledger(user_id)
+
+
+class _Hooked:
+    """Verbindung/Cursor, die vor dem ersten executemany() einen Hook ausführen"""
+
+    def __init__(self, target, hook):
+        self._target = target
+        self._hook = hook
+
+    def cursor(self, *args, **kwargs):
+        return _Hooked(self._target.cursor(*args, **kwargs), self._hook)
+
+    def executemany(self, *args):
+        hook, self._hook[:] = list(self._hook), []
+        for function in hook:
+            function()
+        return self._target.executemany(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+def test_refresh_drops_checkpoints_computed_before_concurrent_write(user_id, monkeypatch):
+    """
+    Rückdatierte Buchung committet zwischen Lesen und Einfügen von refresh()
+
+    Die Invalidierung läuft dann VOR dem Einfügen und findet nichts; die aus
+    dem alten Stand berechneten Checkpoints dürfen nicht gespeichert werden.
+    """
+    _import(user_id, 35, datetime(2024, 1, 1, 12))
+
+    def backdated_write():
+        assert Transaction.create(user_id, '1000.00', 'income', 'gleichzeitig', date=datetime(2023, 6, 1))
+
+    hook = [backdated_write]
+    monkeypatch.setattr(balance_checkpoint, 'get_db_connection',
+                        lambda readonly=False: _Hooked(get_db_connection(readonly), hook))
+
+    assert BalanceCheckpoint.refresh(user_id) == 0
+    assert not hook, "Hook wurde nicht ausgeführt"
+    assert _checkpoints(user_id) == []
+
+    # Nächster Aufruf rechnet mit dem neuen Stand
+    assert BalanceCheckpoint.refresh(user_id) == 3
+    _assert_checkpoints_match_ledger(user_id)
+    _assert_balance_before_matches_ledger(user_id)
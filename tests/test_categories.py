@@ -0,0 +1,59 @@
+"""Kategorien löschen/zusammenführen: blockweise, als Job, Budget-Zähler bleiben korrekt"""
+from datetime import datetime
+
+from models.budget import Budget
+from models.category import Category
+from models.job import Job
+from models.transaction import Transaction
+from services.category_service import CategoryService
+from utils.money import Money
+
+
+def _expenses(user_id, category_id, count):
+    now = datetime.now().replace(microsecond=0)
+    rows = [{'amount': '10.00', 'type': 'expense', 'description': 'x', 'date': now, 'category_id': category_id}
+            for _ in range(count)]
+    assert Transaction.import_rows(user_id, rows) == count
+
+
+def test_merge_moves_rows_in_chunks_and_keeps_budget_counters(user_id, make_category):
+    source, target = make_category(user_id, 'Essen'), make_category(user_id, 'Lebensmittel')
+    _expenses(user_id, source, 7)
+    _expenses(user_id, target, 1)
+    calls = []
+
+    success, _, moved = CategoryService.merge_category(
+        source, user_id, target, batch_size=3, progress=lambda done, total: calls.append((done, total))
+    )
+
+    assert success and moved == 7
+    assert calls == [(3, 7), (6, 7), (7, 7)]
+    assert Transaction.count_in_category(user_id, source) == 0
+    assert Transaction.count_in_category(user_id, target) == 8
+    assert Category.get_by_id(source, user_id) is None
+    assert Budget.get_status(user_id, target)['spent'] == Money.of('80.00')
+
+
+def test_merge_into_foreign_category_is_rejected(user_id, make_user, make_category):
+    source = make_category(user_id, 'Essen')
+    foreign = make_category(make_user('bob'), 'Fremd')
+    _expenses(user_id, source, 2)
+
+    success, _, moved = CategoryService.merge_category(source, user_id, foreign)
+
+    assert not success and moved == 0
+    assert Transaction.count_in_category(user_id, source) == 2
+
+
+def test_delete_form_enqueues_job_instead_of_merging(client, user_id, make_category):
+    source = make_category(user_id, 'Essen')
+    _expenses(user_id, source, 2)
+
+    response = client.post(f'/category/delete/{source}', data={'target_id': ''}, follow_redirects=True)
+
+    assert response.status_code == 200
+    assert 'Job #' in response.get_data(as_text=True)
+    assert Transaction.count_in_category(user_id, source) == 2
+    [job] = Job.get_all_by_user(user_id)
+    assert job.kind == 'merge_category'
+    assert Job.get_by_id(job.id).params == {'category_id': source, 'target_id': None}
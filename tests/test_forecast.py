@@ -0,0 +1,72 @@
+"""Saldo-Prognose: Cache gilt nur bis zur nächsten Änderung"""
+from datetime import date, datetime
+
+import pytest
+
+from models.storage import OK
+from models.transaction import Transaction
+from services import forecast_service
+from services.forecast_service import ForecastService
+from services.recurring_service import RecurringService
+from utils.money import Money
+
+
+@pytest.fixture
+def computed(monkeypatch):
+    """Zählt echte Neuberechnungen (ohne Cache)"""
+    calls = []
+    compute = ForecastService.compute
+
+    def counting(user_id, today):
+        calls.append(user_id)
+        return compute(user_id, today)
+
+    monkeypatch.setattr(ForecastService, 'compute', staticmethod(counting))
+    return calls
+
+
+def _forecast(user_id):
+    success, forecast = ForecastService.get_forecast(user_id)
+    assert success, forecast
+    return forecast
+
+
+def test_cached_until_next_write(user_id, computed):
+    assert Transaction.create(user_id, '100.00', 'income', 'Lohn', date=datetime.now())
+    first = _forecast(user_id)
+    assert _forecast(user_id) == first
+    assert len(computed) == 1
+
+    assert Transaction.create(user_id, '30.00', 'income', 'Bonus', date=datetime.now())
+    second = _forecast(user_id)
+
+    assert len(computed) == 2
+    assert second['version'] > first['version']
+    assert second['current_balance'] == first['current_balance'] + Money.of('30.00')
+
+
+def test_new_template_invalidates_forecast(user_id, make_category, computed):
+    first = _forecast(user_id)
+
+    assert RecurringService.add_recurring(user_id, '50.00', 'expense', make_category(user_id, 'Abo'),
+                                          'Abo', 'monthly', 1, date.today().isoformat())[0]
+    second = _forecast(user_id)
+
+    assert len(computed) == 2
+    assert second['version'] > first['version']
+    assert second['recurring_expense'] == first['recurring_expense'] + Money.of('50.00')
+
+
+def test_stored_forecast_is_shared_between_processes(user_id, computed):
+    assert Transaction.create(user_id, '10.00', 'income', 'x', date=datetime.now())
+    first = _forecast(user_id)
+
+    forecast_service._forecasts.clear()   # anderer Prozess: leerer Speicher-Cache
+    assert _forecast(user_id) == first
+    assert len(computed) == 1
+
+    assert ForecastService.run()['computed'] == 0   # Scheduler überspringt passende Prognose
+    assert Transaction.delete(Transaction.get_all_by_user(user_id)[0].id, user_id) == OK
+    forecast_service._forecasts.clear()
+    assert _forecast(user_id)['current_balance'] == Money.of('0.00')
+    assert len(computed) == 2
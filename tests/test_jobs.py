@@ -0,0 +1,207 @@
+"""Job-Queue: Verteilung, Limit pro User, verwaiste Jobs, fortsetzbarer Import"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.job import Job
+from models.storage import get_db_connection
+from services import job_service
+from services.job_service import JobService, JOB_HANDLERS
+
+
+def _set_heartbeat(job_id, heartbeat_at):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE jobs SET heartbeat_at = %s WHERE id = %s", (heartbeat_at, job_id))
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def _transaction_count(user_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM transactions WHERE user_id = %s", (user_id,))
+    count = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return count
+
+
+def _output_blocks(job_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM job_output WHERE job_id = %s", (job_id,))
+    count = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return count
+
+
+def test_claim_respects_running_limit_per_user(make_user):
+    alice, bob = make_user('alice'), make_user('bob')
+    first = Job.create(alice, 'rebuild_balances')
+    second = Job.create(alice, 'rebuild_balances')
+    other = Job.create(bob, 'rebuild_balances')
+
+    assert Job.claim_next(1).id == first
+    assert Job.claim_next(1).id == other    # zweiter Job von alice muss warten
+    assert Job.claim_next(1) is None
+
+    Job.finish(first, 'done')
+    assert Job.claim_next(1).id == second
+
+
+def test_concurrent_claims_start_one_job_per_user(user_id):
+    for _ in range(4):
+        Job.create(user_id, 'rebuild_balances')
+
+    claimed = []
+    barrier = threading.Barrier(4)
+
+    def claim():
+        barrier.wait()
+        job = Job.claim_next(1)
+        if job:
+            claimed.append(job.id)
+
+    threads = [threading.Thread(target=claim) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(claimed) == 1
+    assert [job.status for job in Job.get_all_by_user(user_id)].count('running') == 1
+
+
+def test_requeue_stale_keeps_progress(user_id):
+    job_id = Job.create(user_id, 'rebuild_balances')
+    Job.claim_next(1)
+    Job.update_progress(job_id, 2, 3)
+
+    assert JobService.requeue_stale() == 0
+    _set_heartbeat(job_id, datetime.now() - job_service.STALE_AFTER - timedelta(minutes=1))
+    assert JobService.requeue_stale() == 1
+
+    job = Job.claim_next(1)
+    assert (job.id, job.progress, job.total) == (job_id, 2, 3)
+
+
+def test_heartbeat_without_progress_updates(user_id, monkeypatch):
+    """Langer Schritt ohne ctx.progress() gilt nicht als verwaist"""
+    monkeypatch.setattr(job_service, 'HEARTBEAT_SECONDS', 0.05)
+    seen = []
+
+    def slow_step(job, ctx):
+        _set_heartbeat(job.id, datetime(2000, 1, 1))
+        time.sleep(0.5)
+        seen.append(Job.requeue_stale(datetime.now() - timedelta(minutes=1)))
+        return {}
+
+    monkeypatch.setitem(JOB_HANDLERS, 'slow_step', slow_step)
+    job_id = Job.create(user_id, 'slow_step')
+    JobService.run(Job.claim_next(1))
+
+    assert seen == [0]
+    assert Job.get_by_id(job_id).status == 'done'
+
+
+def test_stale_run_cannot_overwrite_new_run(user_id):
+    """Hängender Worker wacht nach requeue_stale wieder auf"""
+    job_id = Job.create(user_id, 'rebuild_balances')
+    old = Job.claim_next(1)
+    _set_heartbeat(job_id, datetime(2000, 1, 1))
+    assert JobService.requeue_stale() == 1
+    new = Job.claim_next(1)
+    assert (old.attempts, new.attempts) == (1, 2)
+
+    assert Job.update_progress(job_id, 1, 3, old.attempts)          # alter Lauf soll aufhören
+    assert not Job.append_output(job_id, 0, 'alt', old.attempts)
+    assert not Job.finish(job_id, 'done', result={'run': 'alt'}, attempt=old.attempts)
+    assert Job.get_by_id(job_id).status == 'running'
+
+    assert Job.finish(job_id, 'done', result={'run': 'neu'}, attempt=new.attempts)
+    assert not Job.finish(job_id, 'failed', error='zu spät', attempt=new.attempts)
+    assert Job.get_by_id(job_id).result == {'run': 'neu'}
+
+
+def test_stale_run_does_not_finish_cancelled_job(user_id, monkeypatch):
+    monkeypatch.setitem(JOB_HANDLERS, 'quick', lambda job, ctx: {'run': 'alt'})
+    job_id = Job.create(user_id, 'quick')
+    old = Job.claim_next(1)
+    _set_heartbeat(job_id, datetime(2000, 1, 1))
+    JobService.requeue_stale()
+    assert JobService.cancel_job(job_id, user_id)[0]
+
+    JobService.run(old)
+
+    assert Job.get_by_id(job_id).status == 'cancelled'
+
+
+class _WorkerDied(BaseException):
+    """Simuliert einen abgestürzten Worker (wird von JobService.run nicht gefangen)"""
+
+
+def test_requeued_import_resumes_without_duplicates(user_id, monkeypatch):
+    monkeypatch.setattr(job_service, 'IMPORT_CHUNK_SIZE', 2)
+    rows = [{'amount': f'{i + 1}.00', 'type': 'expense', 'date': '2024-03-01', 'description': f'row {i}'}
+            for i in range(5)]
+    job_id = Job.create(user_id, 'import_transactions', {'rows': rows})
+
+    # Erster Lauf stirbt nach dem ersten Block (vor dem Fortschritts-Update des Handlers)
+    original = Job.update_progress
+
+    def dies_after_first_chunk(job_id, progress, total=None, attempt=None):
+        if progress >= 2:
+            raise _WorkerDied()
+        return original(job_id, progress, total, attempt)
+
+    monkeypatch.setattr(Job, 'update_progress', staticmethod(dies_after_first_chunk))
+    with pytest.raises(_WorkerDied):
+        JobService.run(Job.claim_next(1))
+    monkeypatch.setattr(Job, 'update_progress', staticmethod(original))
+    assert _transaction_count(user_id) == 2
+
+    _set_heartbeat(job_id, datetime(2000, 1, 1))
+    assert JobService.requeue_stale() == 1
+    JobService.run(Job.claim_next(1))
+
+    job = Job.get_by_id(job_id)
+    assert job.status == 'done'
+    assert job.result['imported'] == 5
+    assert _transaction_count(user_id) == 5
+
+
+def test_export_output_is_stored_outside_the_job(client, user_id, monkeypatch):
+    iter_chunks = job_service.Transaction.iter_chunks
+    monkeypatch.setattr(job_service.Transaction, 'iter_chunks',
+                        staticmethod(lambda user_id: iter_chunks(user_id, chunk_size=2)))
+    rows = [{'amount': f'{i + 1}.50', 'type': 'expense', 'date': f'2024-03-0{i + 1}', 'description': f'row {i}'}
+            for i in range(3)]
+    assert job_service.Transaction.import_rows(user_id, rows) == 3
+
+    job_id = Job.create(user_id, 'export_transactions')
+    JobService.run(Job.claim_next(1))
+
+    job = Job.get_by_id(job_id)
+    assert job.status == 'done'
+    assert job.result == {'rows': 3}
+    assert _output_blocks(job_id) == 2
+    assert 'result' not in client.get('/api/jobs').get_json()[0]
+
+    response = client.get(f'/api/jobs/{job_id}/download')
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == 'id,date,type,amount,category,description'
+    assert [line.split(',')[3] for line in lines[1:]] == ['1.50', '2.50', '3.50']
+
+
+def test_download_requires_finished_export_of_own_user(client, user_id, make_user):
+    pending = Job.create(user_id, 'export_transactions')
+    foreign = Job.create(make_user('bob'), 'export_transactions')
+
+    assert client.get(f'/api/jobs/{pending}/download').status_code == 404
+    assert client.get(f'/api/jobs/{foreign}/download').status_code == 404
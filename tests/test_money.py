@@ -0,0 +1,55 @@
+"""Money: Eingaben parsen, kaufmännisch runden, exakt rechnen"""
+from decimal import Decimal
+
+import pytest
+
+from models.transaction import Transaction
+from services.transaction_service import TransactionService
+from utils.money import Money, ZERO
+
+
+@pytest.mark.parametrize('value, cents', [
+    ('12.5', 1250),
+    (' 7 ', 700),
+    ('0.005', 1),        # ROUND_HALF_UP wie MySQL DECIMAL(…,2)
+    ('0.004', 0),
+    ('-0.005', -1),
+    ('2.675', 268),      # als float wäre das 2.67499…
+    (2.675, 268),
+    (Decimal('19.999'), 2000),
+    (3, 300),
+])
+def test_parse_and_round_half_up(value, cents):
+    assert Money.parse(value).cents == cents
+
+
+@pytest.mark.parametrize('value', [None, '', '   ', 'abc', 'NaN', 'Infinity', True])
+def test_parse_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        Money.parse(value)
+
+
+def test_arithmetic_is_exact():
+    assert Money.sum(['0.10'] * 10) == Money.of('1.00')
+    assert Money.of('0.1') + Money.of('0.2') == Money.of('0.3')
+    assert Money.of('5.00') - 7 == Money.of('-2.00')
+    assert Money.of('1.25') * 3 == Money.of('3.75')
+    assert str(-Money.of('0.05')) == '-0.05'
+    assert Money.of('10.00').to_decimal() == Decimal('10.00')
+    assert not ZERO and Money.of('0.01')
+    with pytest.raises(TypeError):
+        Money(1.5)
+
+
+def test_stored_amount_is_rounded_to_cents(user_id, make_category):
+    category_id = make_category(user_id, 'Essen')
+    success, _, _ = TransactionService.add_transaction_with_budget(
+        user_id, '10.005', 'expense', category_id, 'Rundung', '2024-04-01'
+    )
+    assert success
+
+    [transaction] = Transaction.get_all_by_user(user_id)
+    assert transaction.amount == Money.of('10.01')
+    assert TransactionService.add_transaction_with_budget(
+        user_id, '0.004', 'expense', category_id, 'zu klein', '2024-04-01'
+    )[0] is False
@@ -0,0 +1,55 @@
+"""Interne Endpunkte: Token-Prüfung; SQL-Histogramm für /metrics"""
+import pytest
+from flask import request
+
+from config import Config
+from models.transaction import Transaction
+from utils import metrics, profiler, sql_stats
+
+
+@pytest.fixture
+def ops_token(monkeypatch):
+    monkeypatch.setattr(Config, 'OPS_TOKEN', 'geheim')
+
+
+@pytest.mark.parametrize('token', ['falsch', 'gehäim', ''])
+def test_slow_queries_rejects_wrong_token(app, ops_token, token):
+    response = app.test_client().get('/ops/slow-queries', headers={'X-Ops-Token': token})
+
+    assert response.status_code == 404
+
+
+def test_slow_queries_with_token(app, ops_token):
+    response = app.test_client().get('/ops/slow-queries', headers={'X-Ops-Token': 'geheim'})
+
+    assert response.status_code == 200
+    assert 'queries' in response.get_json()
+
+
+@pytest.mark.parametrize('token, expected', [('geheim', True), ('gehäim', False), ('falsch', False)])
+def test_profile_token(app, monkeypatch, token, expected):
+    monkeypatch.setattr(Config, 'PROFILE_TOKEN', 'geheim')
+    monkeypatch.setattr(Config, 'PROFILE_SAMPLE_RATE', 0)
+
+    with app.test_request_context(headers={profiler.PROFILE_HEADER: token}):
+        assert profiler._should_profile(request) is expected
+
+
+def _select_count():
+    key = ('db_query_duration_seconds', (('statement', 'SELECT'),))
+    return metrics._histograms.get(key, [None, 0.0, 0])[2]
+
+
+def test_query_histogram_outside_request_and_without_sql_stats(app, user_id, monkeypatch):
+    monkeypatch.setattr(Config, 'SQL_STATS_ENABLED', False)
+    before = _select_count()
+
+    Transaction.get_all_by_user(user_id)   # wie im Worker: kein Request, kein Sammler
+
+    assert sql_stats.current() is None
+    assert _select_count() > before
+
+    monkeypatch.setattr(Config, 'METRICS_DB_QUERIES', False)
+    before = _select_count()
+    Transaction.get_all_by_user(user_id)
+    assert _select_count() == before
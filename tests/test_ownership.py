@@ -0,0 +1,77 @@
+"""Eigentum: Änderungen prüfen User und Kategorie in derselben Anweisung"""
+from datetime import date, datetime
+
+from models.budget import Budget
+from models.category import Category
+from models.job import Job
+from models.transaction import Transaction
+from services.category_service import CategoryService
+from services.job_service import JobService
+from services.transaction_service import TransactionService
+from utils.money import Money
+
+
+def _transaction(user_id, category_id):
+    rows = [{'amount': '8.00', 'type': 'expense', 'description': 'x', 'date': datetime(2024, 6, 1),
+             'category_id': category_id}]
+    assert Transaction.import_rows(user_id, rows) == 1
+    return Transaction.get_all_by_user(user_id)[0].id
+
+
+def test_update_with_foreign_category_is_rejected(client, user_id, make_user, make_category):
+    own = make_category(user_id, 'Essen')
+    foreign = make_category(make_user('bob'), 'Fremd')
+    transaction_id = _transaction(user_id, own)
+
+    assert TransactionService.update_transaction(transaction_id, user_id, category_id=foreign) == (
+        False, "Kategorie nicht gefunden"
+    )
+    response = client.put(f'/api/transactions/{transaction_id}', json={'category': foreign, 'amount': '1.00'})
+    assert response.status_code == 400
+
+    transaction = Transaction.get_by_id(transaction_id, user_id)
+    assert (transaction.category_id, str(transaction.amount)) == (own, '8.00')
+
+
+def test_foreign_transaction_is_not_found(user_id, make_user, make_category):
+    bob = make_user('bob')
+    transaction_id = _transaction(bob, make_category(bob, 'Fremd'))
+
+    assert TransactionService.update_transaction(transaction_id, user_id, amount='1.00') == (
+        False, "Transaktion nicht gefunden"
+    )
+    assert not TransactionService.delete_transaction(transaction_id, user_id)[0]
+    assert str(Transaction.get_by_id(transaction_id, bob).amount) == '8.00'
+
+
+def test_category_mutations_check_owner_and_name(user_id, make_user, make_category):
+    bob = make_user('bob')
+    foreign = make_category(bob, 'Fremd')
+    make_category(user_id, 'Essen')
+    own = make_category(user_id, 'Reisen')
+
+    assert CategoryService.update_category(foreign, user_id, name='Meins') == (False, "Kategorie nicht gefunden")
+    assert CategoryService.set_budget(foreign, user_id, '100') == (False, "Kategorie nicht gefunden")
+    assert CategoryService.update_category(own, user_id, name='Essen') == (
+        False, "Eine Kategorie mit diesem Namen existiert bereits"
+    )
+    assert Category.get_by_id(foreign, bob).name == 'Fremd'
+    assert Category.get_by_id(own, user_id).name == 'Reisen'
+
+
+def test_import_rejects_foreign_category(user_id, make_user, make_category):
+    own = make_category(user_id, 'Essen')
+    bob = make_user('bob')
+    foreign = make_category(bob, 'Fremd')
+    rows = [{'amount': '5.00', 'type': 'expense', 'date': '2024-06-01', 'category_id': category_id}
+            for category_id in (own, foreign, own)]
+    job_id = Job.create(user_id, 'import_transactions', {'rows': rows})
+
+    JobService.run(Job.claim_next(1))
+
+    result = Job.get_by_id(job_id).result
+    assert (result['imported'], result['skipped']) == (2, 1)
+    assert result['errors'] == [{'row': 1, 'error': "Kategorie nicht gefunden"}]
+    assert Transaction.count_in_category(user_id, own) == 2
+    assert Transaction.count_in_category(user_id, foreign) == 0
+    assert Budget.get_status(bob, foreign, date(2024, 6, 1))['spent'] == Money.of('0.00')
@@ -0,0 +1,77 @@
+"""Wiederkehrende Transaktionen: Vorlagen anlegen und buchen"""
+from datetime import date
+
+from models.ledger_version import LedgerVersion
+from models.recurring import RecurringTransaction
+from models.storage import get_db_connection, OK, REFERENCE_NOT_FOUND
+from models.transaction import Transaction
+from services.recurring_service import RecurringService
+
+
+def _transactions(user_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT occurrence, category_id FROM transactions WHERE user_id = %s ORDER BY occurrence",
+                   (user_id,))
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return rows
+
+
+def test_create_rejects_category_of_other_user(make_user, make_category):
+    alice, bob = make_user('alice'), make_user('bob')
+    foreign = make_category(bob, 'Miete')
+
+    status, recurring_id = RecurringTransaction.create(alice, '1200.00', 'expense', 'Miete', foreign,
+                                                       'monthly', 1, date(2024, 1, 1))
+    assert (status, recurring_id) == (REFERENCE_NOT_FOUND, None)
+    assert RecurringService.add_recurring(alice, '1200.00', 'expense', foreign, 'Miete', 'monthly') == \
+        (False, "Kategorie nicht gefunden")
+    assert RecurringTransaction.get_all_by_user(alice) == []
+
+
+def test_create_with_own_or_without_category(user_id, make_category):
+    own = make_category(user_id, 'Miete')
+
+    status, recurring_id = RecurringTransaction.create(user_id, '1200.00', 'expense', 'Miete', own,
+                                                       'monthly', 1, date(2024, 1, 1))
+    assert status == OK and recurring_id
+    status, _ = RecurringTransaction.create(user_id, '5000.00', 'income', 'Lohn', None,
+                                            'monthly', 1, date(2024, 1, 25))
+    assert status == OK
+    assert sorted((r.description, r.category_id) for r in RecurringTransaction.get_all_by_user(user_id)) == \
+        [('Lohn', None), ('Miete', own)]
+
+
+def test_run_due_catches_up_once(user_id, make_category):
+    category_id = make_category(user_id, 'Abo')
+    assert RecurringService.add_recurring(user_id, '9.90', 'expense', category_id, 'Abo', 'monthly', 1,
+                                          '2024-01-31', '2024-05-31')[0]
+
+    assert RecurringService.run_due(today=date(2024, 4, 15))['created'] == 3
+    # Erneuter Lauf bucht nichts doppelt, danach bis zum Enddatum
+    assert RecurringService.run_due(today=date(2024, 4, 15))['created'] == 0
+    assert RecurringService.run_due(today=date(2024, 12, 1))['created'] == 2
+
+    assert _transactions(user_id) == [
+        (date(2024, 1, 31), category_id), (date(2024, 2, 29), category_id), (date(2024, 3, 31), category_id),
+        (date(2024, 4, 30), category_id), (date(2024, 5, 31), category_id),
+    ]
+    assert not RecurringTransaction.get_all_by_user(user_id)[0].active
+    assert Transaction.get_summary_by_user(user_id)['total_expenses'].cents == 5 * 990
+
+
+def test_delete_of_foreign_template_keeps_ledger_version(make_user):
+    alice, bob = make_user('alice'), make_user('bob')
+    status, recurring_id = RecurringTransaction.create(bob, '20.00', 'expense', 'Abo', None, 'monthly', 1,
+                                                       date(2024, 1, 1))
+    assert status == OK
+    version = LedgerVersion.get(alice)
+
+    assert not RecurringTransaction.delete(recurring_id, alice)
+    assert LedgerVersion.get(alice) == version
+
+    before = LedgerVersion.get(bob)
+    assert RecurringTransaction.delete(recurring_id, bob)
+    assert LedgerVersion.get(bob) > before
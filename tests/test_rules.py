@@ -0,0 +1,65 @@
+"""Kategorisierungs-Regeln: Eigentum der Kategorie, sichere reguläre Ausdrücke, blockweises Anwenden"""
+from datetime import datetime
+
+import pytest
+
+from config import Config
+from models.category_rule import CategoryRule
+from models.transaction import Transaction
+from services.rule_service import RuleService
+
+
+@pytest.mark.parametrize('pattern', [
+    '(a+)+$',
+    '(a|ab)*c',
+    r'(\w+)\s\1',
+    '(?P<x>a)(?P=x)',
+    'x' * 101,
+])
+def test_risky_regex_is_rejected(user_id, make_category, pattern):
+    category_id = make_category(user_id, 'Essen')
+
+    success, _ = RuleService.add_rule(user_id, category_id, pattern, kind='regex')
+
+    assert not success
+    assert RuleService.get_rules_as_dict(user_id) == []
+
+
+@pytest.mark.parametrize('pattern', ['migros|coop', r'^twint\s+\d+', r'(\d{2})+'])
+def test_plain_regex_is_accepted(user_id, make_category, pattern):
+    category_id = make_category(user_id, 'Essen')
+
+    assert RuleService.add_rule(user_id, category_id, pattern, kind='regex')[0]
+
+
+def test_stored_risky_regex_is_skipped(user_id, make_category):
+    """Vor der Prüfung gespeicherte Regel wird nie ausgeführt"""
+    category_id = make_category(user_id, 'Essen')
+    assert CategoryRule.create(user_id, category_id, 'regex', '(a+)+$', None, None, None, 1)[0] is not None
+    assert RuleService.add_rule(user_id, category_id, 'coop', priority=2)[0]
+
+    assert RuleService.categorize(user_id, 'a' * 40 + '!', '5.00', 'expense') is None
+    assert RuleService.categorize(user_id, 'Coop Bern', '5.00', 'expense') == category_id
+
+
+def test_rule_for_foreign_category_is_rejected(user_id, make_user, make_category):
+    foreign = make_category(make_user('bob'), 'Fremd')
+
+    assert RuleService.add_rule(user_id, foreign, 'migros') == (False, "Kategorie nicht gefunden")
+    assert RuleService.get_rules_as_dict(user_id) == []
+
+
+def test_reapply_uses_configured_batch_size(user_id, make_category, monkeypatch):
+    monkeypatch.setattr(Config, 'RULE_REAPPLY_BATCH_SIZE', 2)
+    category_id = make_category(user_id, 'Essen')
+    assert RuleService.add_rule(user_id, category_id, 'migros')[0]
+    rows = [{'amount': '3.00', 'type': 'expense', 'description': 'Migros Zürich', 'date': datetime(2024, 5, 1),
+             'category_id': None} for _ in range(5)]
+    assert Transaction.import_rows(user_id, rows) == 5
+    calls = []
+
+    result = RuleService.reapply(user_id, progress=calls.append)
+
+    assert result == {'checked': 5, 'updated': 5}
+    assert len(calls) == 3
+    assert Transaction.count_in_category(user_id, category_id) == 5
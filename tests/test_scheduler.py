@@ -0,0 +1,45 @@
+"""Scheduler: tägliche Wartung nur einmal pro Tag, auch über mehrere --once-Läufe"""
+from datetime import date, timedelta
+
+import pytest
+
+import scheduler
+
+
+@pytest.fixture
+def steps(monkeypatch):
+    calls = []
+    monkeypatch.setattr(scheduler, 'maintain_partitions', lambda: calls.append('partitions'))
+    monkeypatch.setattr(scheduler, 'archive', lambda: calls.append('archive'))
+    monkeypatch.setattr(scheduler, 'forecast', lambda: calls.append('forecast'))
+    return calls
+
+
+def test_once_runs_maintain_only_once_per_day(steps, monkeypatch):
+    monkeypatch.setattr(scheduler, 'tick', lambda batch_size: None)
+    monkeypatch.setattr('sys.argv', ['scheduler.py', '--once'])
+
+    for _ in range(3):
+        assert scheduler.main() == 0
+
+    assert steps == ['partitions', 'archive', 'forecast']
+
+
+def test_next_day_runs_again(steps):
+    today = date.today()
+    assert scheduler.daily_maintenance(today)
+    assert not scheduler.daily_maintenance(today)
+    assert scheduler.daily_maintenance(today + timedelta(days=1))
+    assert len(steps) == 6
+
+
+def test_failed_maintenance_is_retried(steps, monkeypatch):
+    def broken():
+        raise RuntimeError("DDL fehlgeschlagen")
+
+    monkeypatch.setattr(scheduler, 'archive', broken)
+    assert not scheduler.daily_maintenance(date.today())
+
+    monkeypatch.setattr(scheduler, 'archive', lambda: steps.append('archive'))
+    assert scheduler.daily_maintenance(date.today())
+    assert steps == ['partitions', 'partitions', 'archive', 'forecast']
@@ -0,0 +1,35 @@
+"""Storage-Schicht: Dialekt-Übersetzung und SQLite-Backend"""
+from models.storage import get_db_connection, is_duplicate_key
+from models.storage.dialect import to_sqlite
+
+
+def test_upsert_translated():
+    sql, locking = to_sqlite(
+        "INSERT INTO t (a, b) VALUES (%s, %s) ON DUPLICATE KEY UPDATE b = b + VALUES(b)"
+    )
+    assert sql == "INSERT INTO t (a, b) VALUES (?, ?) ON CONFLICT DO UPDATE SET b = b + excluded.b"
+    assert not locking
+
+
+def test_for_update_becomes_write_lock():
+    sql, locking = to_sqlite("SELECT id FROM jobs WHERE status = 'queued' LIMIT 1 FOR UPDATE SKIP LOCKED")
+    assert sql == "SELECT id FROM jobs WHERE status = 'queued' LIMIT 1"
+    assert locking
+
+
+def test_string_literals_untouched():
+    sql, _ = to_sqlite("SELECT '%s FOR UPDATE' FROM t WHERE a = %s")
+    assert sql == "SELECT '%s FOR UPDATE' FROM t WHERE a = ?"
+
+
+def test_schema_created_and_duplicate_key_detected(user_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("INSERT INTO users (username, password) VALUES (%s, %s)", ('alice', 'x'))
+        raise AssertionError("doppelter Benutzername wurde akzeptiert")
+    except Exception as e:
+        assert is_duplicate_key(e)
+    finally:
+        cursor.close()
+        conn.close()
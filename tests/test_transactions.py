@@ -0,0 +1,27 @@
+"""Transaktionen: blockweises Lesen mit Kategorien aus dem Cache"""
+from datetime import datetime
+
+from models import transaction
+from models.storage import sqlite_backend
+from models.transaction import Transaction
+
+
+def test_iter_chunks_attaches_categories_after_closing(user_id, make_category, monkeypatch):
+    category_id = make_category(user_id, 'Essen')
+    rows = [{'amount': '2.00', 'type': 'expense', 'description': 'x', 'date': datetime(2024, 7, 1),
+             'category_id': category_id if i % 2 else None} for i in range(5)]
+    assert Transaction.import_rows(user_id, rows) == 5
+    in_use = []
+    attach = transaction._attach_categories
+
+    def recording(user_id, rows):
+        in_use.append(sqlite_backend.pool_stats()['sqlite']['in_use'])
+        return attach(user_id, rows)
+
+    monkeypatch.setattr(transaction, '_attach_categories', recording)
+
+    chunks = list(Transaction.iter_chunks(user_id, chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [row['category_name'] for chunk in chunks for row in chunk] == [None, 'Essen', None, 'Essen', None]
+    assert in_use == [0, 0, 0]   # keine Verbindung mehr offen, während der Cache lädt
@@ -0,0 +1,53 @@
+"""Konto löschen: Transaktionen explizit mitlöschen (partitioniert ohne Foreign Key)"""
+from datetime import datetime
+
+from models.storage import get_db_connection, NOT_FOUND
+from models.transaction import Transaction
+from models.user import User
+
+
+def _count(table, user_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE user_id = %s", (user_id,))
+    count = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return count
+
+
+def _without_foreign_keys():
+    """Wie MySQL nach der Partitionierung: kein ON DELETE CASCADE von users auf transactions"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA foreign_keys = OFF")
+    cursor.close()
+    conn.close()
+
+
+def _import(user_id, count):
+    rows = [{'amount': '4.00', 'type': 'expense', 'description': 'x', 'date': datetime(2024, 2, 1),
+             'category_id': None} for _ in range(count)]
+    assert Transaction.import_rows(user_id, rows) == count
+
+
+def test_delete_account_removes_transactions(client, user_id, make_user):
+    other = make_user('bob')
+    _import(user_id, 3)
+    _import(other, 2)
+    _without_foreign_keys()
+
+    assert client.delete('/api/account', json={'password': 'falsch'}).status_code == 400
+    assert User.find_by_id(user_id) is not None
+
+    response = client.delete('/api/account', json={'password': 'secret123'})
+
+    assert response.status_code == 200
+    assert User.find_by_id(user_id) is None
+    assert _count('transactions', user_id) == 0
+    assert _count('transactions', other) == 2
+    assert client.get('/api/jobs').status_code == 401
+
+
+def test_delete_unknown_user(user_id):
+    assert User.delete(user_id + 100) == NOT_FOUND
@@ -0,0 +1,49 @@
+"""
+Parallele Ausführung unabhängiger DB-Abfragen
+
+Jede Aufgabe läuft in einem Thread aus einem gemeinsamen Pool und holt sich
+ihre eigene Verbindung aus dem Connection Pool. Die Gesamtdauer ist damit
+ungefähr die der langsamsten Abfrage statt der Summe aller Abfragen.
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from config import Config
+
+_executor = ThreadPoolExecutor(max_workers=Config.FANOUT_WORKERS, thread_name_prefix='fanout')
+
+
+def run_parallel(tasks, timeout=None):
+    """
+    Führt Aufgaben parallel aus, höchstens `timeout` Sekunden insgesamt
+
+    Der Flask-Kontext (g, session, ...) wird in die Threads mitgenommen.
+    Aufgaben, die bis zur Deadline nicht gestartet sind, werden abgebrochen;
+    bereits laufende Abfragen laufen im Hintergrund zu Ende, ihr Ergebnis
+    wird verworfen.
+
+    Args:
+        tasks: Dict {name: (funktion, args-tuple)}
+        timeout: Deadline in Sekunden (None = unbegrenzt)
+
+    Returns:
+        tuple: (results: dict {name: ergebnis}, missing: Liste von Namen
+                ohne Ergebnis wegen Deadline oder Fehler)
+    """
+    futures = {
+        name: _executor.submit(contextvars.copy_context().run, func, *args)
+        for name, (func, args) in tasks.items()
+    }
+    done, not_done = wait(futures.values(), timeout=timeout)
+    for future in not_done:
+        future.cancel()
+
+    results, missing = {}, []
+    for name, future in futures.items():
+        if future in done and future.exception() is None:
+            results[name] = future.result()
+        else:
+            if future in done:
+                print(f"Error in parallel task {name}: {future.exception()}")
+            missing.append(name)
+    return results, missing
@@ -0,0 +1,267 @@
+"""
+Prometheus-Metriken (/metrics, Text-Format 0.0.4)
+
+Gesammelt wird pro Prozess im Speicher (ein Lock, ein Dict-Zugriff pro
+Messung). Mehrere Gunicorn-Worker: mit METRICS_DIR schreibt jeder Worker
+seinen Stand höchstens alle METRICS_FLUSH_SECONDS in eine eigene Datei
+(metrics_<pid>.json); /metrics liest alle Dateien und summiert sie auf,
+egal welcher Worker den Scrape bekommt. Dateien beendeter Worker werden
+dabei entfernt. worker.py und scheduler.py schreiben ihren Stand ebenfalls
+(flush() in ihrer Schleife); ein einzelner --once-Lauf endet, bevor ihn ein
+Scrape sieht, und fehlt darum.
+
+Metriken:
+    budget_tracker_request_duration_seconds   Histogramm {blueprint, endpoint, method}
+    budget_tracker_db_query_duration_seconds  Histogramm {statement} (SELECT, INSERT, ...,
+                                              gemessen über utils/sql_stats.py in allen
+                                              Prozessen, auch mit SQL_STATS_ENABLED=0;
+                                              aus mit METRICS_DB_QUERIES=0)
+    budget_tracker_db_pool_connections        Gauge {endpoint, state} (in_use, idle, waiting)
+    budget_tracker_cache_requests_total       Counter {cache, result} (hit, miss)
+    budget_tracker_cache_hit_ratio            Gauge {cache}
+"""
+import glob
+import json
+import os
+import threading
+import time
+
+from config import Config
+
+PREFIX = 'budget_tracker_'
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    'request_duration_seconds': ('histogram', 'HTTP-Request-Dauer pro Endpoint'),
+    'db_query_duration_seconds': ('histogram', 'Dauer einzelner SQL-Abfragen'),
+    'db_pool_connections': ('gauge', 'Verbindungen im Connection Pool'),
+    'cache_requests_total': ('counter', 'Cache-Zugriffe nach Ergebnis'),
+    'cache_hit_ratio': ('gauge', 'Anteil Cache-Treffer'),
+}
+
+_lock = threading.Lock()
+_histograms = {}  # (name, labels) → [bucket-zähler..., +Inf], summe, anzahl
+_counters = {}    # (name, labels) → wert
+_last_flush = 0.0
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def observe(name, value, **labels):
+    """Wert in Histogramm `name` eintragen"""
+    key = (name, _labels(labels))
+    with _lock:
+        entry = _histograms.get(key)
+        if entry is None:
+            entry = _histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        counts = entry[0]
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+        entry[1] += value
+        entry[2] += 1
+
+
+def inc(name, amount=1, **labels):
+    """Counter `name` erhöhen"""
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def record_cache(cache, hit):
+    """Cache-Zugriff zählen (für Trefferquote)"""
+    inc('cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+
+def observe_query(sql, elapsed):
+    """SQL-Dauer nach Anweisungstyp (erstes Wort) eintragen"""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql[:16].decode('utf-8', 'replace')
+    words = sql.lstrip()[:16].split(None, 1)
+    observe('db_query_duration_seconds', elapsed, statement=words[0].upper() if words else '?')
+
+
+def _gauges():
+    """Momentaufnahme dieses Prozesses (Pool-Auslastung)"""
+    from models.storage import pool_stats
+
+    gauges = {}
+    for endpoint, stats in pool_stats().items():
+        for state, value in stats.items():
+            gauges[('db_pool_connections', _labels({'endpoint': endpoint, 'state': state}))] = value
+    return gauges
+
+
+def _snapshot():
+    with _lock:
+        histograms = {key: [list(entry[0]), entry[1], entry[2]] for key, entry in _histograms.items()}
+        counters = dict(_counters)
+    return histograms, counters, _gauges()
+
+
+def _encode(mapping):
+    return [[name, list(labels), value] for (name, labels), value in mapping.items()]
+
+
+def _decode(items):
+    return {(name, tuple(tuple(pair) for pair in labels)): value for name, labels, value in items}
+
+
+def flush(force=False):
+    """Stand dieses Prozesses nach METRICS_DIR schreiben (gedrosselt)"""
+    global _last_flush
+    if not Config.METRICS_DIR:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < Config.METRICS_FLUSH_SECONDS:
+        return
+    _last_flush = now
+
+    histograms, counters, gauges = _snapshot()
+    path = os.path.join(Config.METRICS_DIR, f"metrics_{os.getpid()}.json")
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(Config.METRICS_DIR, exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'histograms': _encode(histograms),
+                'counters': _encode(counters),
+                'gauges': _encode(gauges)
+            }, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Error writing metrics: {e}")
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _collect():
+    """Alle Prozesse zusammenführen (ohne METRICS_DIR: nur dieser Prozess)"""
+    if not Config.METRICS_DIR:
+        return _snapshot()
+
+    flush(force=True)
+    histograms, counters, gauges = {}, {}, {}
+    for path in glob.glob(os.path.join(Config.METRICS_DIR, 'metrics_*.json')):
+        try:
+            pid = int(os.path.basename(path)[len('metrics_'):-len('.json')])
+        except ValueError:
+            continue
+        if not _pid_alive(pid):
+            # Beendeter Worker: Counter gehen verloren (Prometheus erkennt den Reset)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        for key, (counts, total, count) in _decode(data['histograms']).items():
+            entry = histograms.setdefault(key, [[0] * (len(BUCKETS) + 1), 0.0, 0])
+            entry[0] = [a + b for a, b in zip(entry[0], counts)]
+            entry[1] += total
+            entry[2] += count
+        for key, value in _decode(data['counters']).items():
+            counters[key] = counters.get(key, 0) + value
+        for key, value in _decode(data['gauges']).items():
+            gauges[key] = gauges.get(key, 0) + value
+    return histograms, counters, gauges
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def render():
+    """
+    Returns:
+        Text im Prometheus-Format
+    """
+    histograms, counters, gauges = _collect()
+
+    # Trefferquote aus den Cache-Zählern ableiten
+    caches = {}
+    for (name, labels), value in counters.items():
+        if name == 'cache_requests_total':
+            label_dict = dict(labels)
+            hits_total = caches.setdefault(label_dict['cache'], [0, 0])
+            hits_total[0 if label_dict['result'] == 'hit' else 1] += value
+    for cache, (hits, misses) in caches.items():
+        gauges[('cache_hit_ratio', _labels({'cache': cache}))] = hits / (hits + misses) if hits + misses else 0.0
+
+    by_name = {}
+    for mapping in (histograms, counters, gauges):
+        for (name, labels), value in mapping.items():
+            by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name in sorted(by_name):
+        kind, help_text = HELP.get(name, ('untyped', name))
+        full = PREFIX + name
+        lines.append(f"# HELP {full} {help_text}")
+        lines.append(f"# TYPE {full} {kind}")
+        for labels, value in sorted(by_name[name]):
+            if kind == 'histogram':
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket in zip(BUCKETS + ('+Inf',), counts):
+                    cumulative += bucket
+                    lines.append(f"{full}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{full}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{full}_count{_format_labels(labels)} {count}")
+            else:
+                lines.append(f"{full}{_format_labels(labels)} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+def init_app(app):
+    """Request-Messung + Route /metrics registrieren"""
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        started = g.pop('_metrics_started', None)
+        if started is not None and request.endpoint != 'metrics':
+            observe(
+                'request_duration_seconds',
+                time.perf_counter() - started,
+                blueprint=request.blueprint or 'app',
+                endpoint=request.endpoint or 'unknown',
+                method=request.method
+            )
+            flush()
+        return response
+
+    def metrics_view():
+        return Response(render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,162 @@
+"""
+Geldbeträge als ganze Rappen (int) statt Decimal/float
+
+    Money.of(Decimal('12.50'))   → Money('12.50'), intern cents = 1250
+    Money.parse('12.5')          → Eingaben aus Formularen/API (ValueError bei Unsinn)
+    a + b, a - b, -a, a * 3      → exakte Ganzzahl-Arithmetik
+    Money.sum(beträge)           → Summe über die cents, ohne Zwischenobjekte
+
+Grenzen der Anwendung:
+    DB → Models:   DECIMAL-Spalten werden beim Lesen zu Money (Money.of)
+    Models → DB:   als Decimal schreiben (money.to_decimal())
+    Ausgabe:       JSON über init_app() als Zahl wie bisher (12.5),
+                   Templates über "%.2f"|format(...) (nutzt __float__)
+
+Rundung bei mehr als 2 Nachkommastellen: kaufmännisch (ROUND_HALF_UP), wie
+MySQL beim Speichern in eine DECIMAL(…,2)-Spalte.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+
+class Money:
+    """Unveränderlicher Geldbetrag in Rappen"""
+
+    __slots__ = ('cents',)
+
+    def __init__(self, cents=0):
+        if type(cents) is not int:
+            raise TypeError(f"Money erwartet ganze Rappen (int), nicht {type(cents).__name__}")
+        self.cents = cents
+
+    @classmethod
+    def of(cls, value):
+        """
+        Betrag aus Money, Decimal, int (ganze Franken), float oder Text
+
+        Raises:
+            ValueError: kein endlicher Betrag
+        """
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, bool):
+            raise ValueError(f"Ungültiger Betrag: {value!r}")
+        if isinstance(value, int):
+            return cls(value * 100)
+        if isinstance(value, float):
+            value = Decimal(repr(value))
+        elif not isinstance(value, Decimal):
+            try:
+                value = Decimal(str(value).strip())
+            except InvalidOperation:
+                raise ValueError(f"Ungültiger Betrag: {value!r}") from None
+        if not value.is_finite():
+            raise ValueError(f"Ungültiger Betrag: {value!r}")
+        return cls(int(value.scaleb(2).to_integral_value(ROUND_HALF_UP)))
+
+    @classmethod
+    def parse(cls, value):
+        """Benutzereingabe → Money (ValueError bei leerem/ungültigem Wert)"""
+        if value is None or (isinstance(value, str) and not value.strip()):
+            raise ValueError("Betrag fehlt")
+        return cls.of(value)
+
+    @classmethod
+    def sum(cls, values):
+        """Summe mehrerer Beträge (Money oder andere für Money.of)"""
+        return cls(sum(value.cents if isinstance(value, Money) else cls.of(value).cents for value in values))
+
+    def to_decimal(self):
+        """Für DB-Parameter (DECIMAL-Spalten)"""
+        return Decimal(self.cents).scaleb(-2)
+
+    def _other_cents(self, other):
+        if isinstance(other, Money):
+            return other.cents
+        if isinstance(other, (int, Decimal, float)) and not isinstance(other, bool):
+            return Money.of(other).cents
+        return None
+
+    def __add__(self, other):
+        cents = self._other_cents(other)
+        return NotImplemented if cents is None else Money(self.cents + cents)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        cents = self._other_cents(other)
+        return NotImplemented if cents is None else Money(self.cents - cents)
+
+    def __rsub__(self, other):
+        cents = self._other_cents(other)
+        return NotImplemented if cents is None else Money(cents - self.cents)
+
+    def __mul__(self, factor):
+        if type(factor) is not int:
+            return NotImplemented
+        return Money(self.cents * factor)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __abs__(self):
+        return Money(abs(self.cents))
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __eq__(self, other):
+        cents = self._other_cents(other)
+        return NotImplemented if cents is None else self.cents == cents
+
+    def __lt__(self, other):
+        cents = self._other_cents(other)
+        return NotImplemented if cents is None else self.cents < cents
+
+    def __le__(self, other):
+        cents = self._other_cents(other)
+        return NotImplemented if cents is None else self.cents <= cents
+
+    def __gt__(self, other):
+        cents = self._other_cents(other)
+        return NotImplemented if cents is None else self.cents > cents
+
+    def __ge__(self, other):
+        cents = self._other_cents(other)
+        return NotImplemented if cents is None else self.cents >= cents
+
+    def __hash__(self):
+        # gleich wie der gleichwertige Decimal/int/float (Money(100) == 1)
+        return hash(self.to_decimal())
+
+    def __float__(self):
+        return self.cents / 100
+
+    def __str__(self):
+        sign = '-' if self.cents < 0 else ''
+        units, cents = divmod(abs(self.cents), 100)
+        return f"{sign}{units}.{cents:02d}"
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+    def __format__(self, spec):
+        return format(self.to_decimal(), spec) if spec else str(self)
+
+
+ZERO = Money(0)
+
+
+def init_app(app):
+    """Money in jsonify() und |tojson als Zahl ausgeben (wie bisher float(Decimal))"""
+    from flask.json.provider import DefaultJSONProvider
+
+    class MoneyJSONProvider(DefaultJSONProvider):
+        @staticmethod
+        def default(o):
+            if isinstance(o, Money):
+                return float(o)
+            return DefaultJSONProvider.default(o)
+
+    app.json = MoneyJSONProvider(app)
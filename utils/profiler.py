@@ -0,0 +1,106 @@
+"""
+Profiling einzelner Live-Requests (cProfile + tracemalloc)
+
+Aktiv nur, wenn konfiguriert:
+    PROFILE_SAMPLE_RATE=0.01   → zufällig 1% der Requests
+    PROFILE_TOKEN=<geheim>     → jeder Request mit Header X-Profile-Token: <geheim>
+
+Sind beide nicht gesetzt, werden KEINE Hooks registriert (kein Overhead).
+
+Pro profiliertem Request landen zwei Dateien in PROFILE_DIR:
+    <zeit>_<endpoint>_u<user>_<pid>.prof        (cProfile, z.B. mit snakeviz öffnen)
+    <zeit>_<endpoint>_u<user>_<pid>.tracemalloc (tracemalloc.Snapshot.load())
+Es bleiben höchstens PROFILE_MAX_FILES Profile erhalten (älteste werden gelöscht).
+
+Pro Prozess wird immer nur ein Request gleichzeitig profiliert
+(cProfile/tracemalloc sind prozessweit).
+"""
+import cProfile
+import glob
+import hmac
+import os
+import random
+import re
+import threading
+import time
+import tracemalloc
+
+from config import Config
+
+PROFILE_HEADER = 'X-Profile-Token'
+
+_active = threading.Lock()
+_UNSAFE = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+def _should_profile(request):
+    if Config.PROFILE_TOKEN:
+        token = request.headers.get(PROFILE_HEADER)
+        if token and hmac.compare_digest(token.encode(), Config.PROFILE_TOKEN.encode()):  # str: TypeError bei Nicht-ASCII
+            return True
+    return Config.PROFILE_SAMPLE_RATE > 0 and random.random() < Config.PROFILE_SAMPLE_RATE
+
+
+def _rotate():
+    """Nur die neuesten PROFILE_MAX_FILES Profile behalten"""
+    profiles = sorted(glob.glob(os.path.join(Config.PROFILE_DIR, '*.prof')), key=os.path.getmtime)
+    for path in profiles[:-Config.PROFILE_MAX_FILES]:
+        for stale in (path, path[:-len('.prof')] + '.tracemalloc'):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def _write(profile, snapshot, endpoint, user_id):
+    os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+    now = time.time()
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now * 1000) % 1000:03d}"
+    name = _UNSAFE.sub('_', f"{stamp}_{endpoint or 'unknown'}_u{user_id or 'anon'}_{os.getpid()}")
+    base = os.path.join(Config.PROFILE_DIR, name)
+    profile.dump_stats(base + '.prof')
+    if snapshot is not None:
+        snapshot.dump(base + '.tracemalloc')
+    _rotate()
+    return name
+
+
+def init_app(app):
+    """Registriert die Profiling-Hooks (nur wenn Sampling oder Token konfiguriert ist)"""
+    if Config.PROFILE_SAMPLE_RATE <= 0 and not Config.PROFILE_TOKEN:
+        return
+
+    from flask import g, request, session
+
+    @app.before_request
+    def _start_profile():
+        if not _should_profile(request) or not _active.acquire(blocking=False):
+            return
+        g._profile_started_tracemalloc = not tracemalloc.is_tracing()
+        if g._profile_started_tracemalloc:
+            tracemalloc.start(Config.PROFILE_TRACEMALLOC_FRAMES)
+        profile = cProfile.Profile()
+        g._profile = profile
+        profile.enable()
+
+    @app.after_request
+    def _mark_profiled(response):
+        if g.get('_profile') is not None:
+            response.headers['X-Profiled'] = '1'
+        return response
+
+    @app.teardown_request
+    def _stop_profile(exc):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return
+        try:
+            profile.disable()
+            snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+            if g.pop('_profile_started_tracemalloc', False):
+                tracemalloc.stop()
+            _write(profile, snapshot, request.endpoint, session.get('user_id'))
+        except Exception as e:
+            print(f"Error writing profile: {e}")
+        finally:
+            _active.release()
@@ -0,0 +1,218 @@
+"""
+Slow-Query-Log der App (mit Route + User, anders als MySQLs slow log)
+
+Jede Abfrage über einen gemessenen Cursor (utils/sql_stats.py), die länger
+als Config.SLOW_QUERY_MS dauert, wird am Ende des Requests als JSON-Zeile
+geschrieben:
+
+    {"event": "slow_query", "fingerprint": "select ... where user_id = ?",
+     "params": [42, "<str:8>"], "ms": 512.3, "rows": 1840,
+     "caller": "Transaction.get_all_by_user", "endpoint": "main.dashboard",
+     "user_id": 42}
+
+Parameter werden geschwärzt: Zahlen (IDs), Datumswerte und NULL bleiben,
+Texte und Beträge werden zu "<typ:länge>".
+
+Geschrieben wird über QueueHandler → QueueListener: der Request legt die
+Zeile nur in eine Queue, ein Hintergrund-Thread schreibt in die Datei
+(Config.SLOW_QUERY_LOG, sonst stderr).
+
+Übersicht der teuersten Abfragen (Summe der Dauer, dieser Prozess):
+    GET /ops/slow-queries?top=20   mit Header X-Ops-Token: <Config.OPS_TOKEN>
+Über alle Worker hinweg (aus der Logdatei):
+    python utils/slow_queries.py /var/log/budget-tracker/slow.log --top 20
+"""
+import atexit
+import hmac
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import date, datetime
+
+if __name__ == "__main__":
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+logger = logging.getLogger('budget_tracker.slow_queries')
+
+_listener = None
+_summary_lock = threading.Lock()
+_summary = {}  # fingerprint → {'count', 'total_ms', 'max_ms', 'rows', 'callers', 'endpoints'}
+
+
+def redact(params):
+    """Parameter ohne Inhalte von Texten/Beträgen"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: redact([value])[0] for key, value in params.items()}
+    redacted = []
+    for value in params:
+        if value is None or isinstance(value, (bool, int)):
+            redacted.append(value)
+        elif isinstance(value, (date, datetime)):
+            redacted.append(value.isoformat())
+        else:
+            text = str(value)
+            redacted.append(f"<{type(value).__name__}:{len(text)}>")
+    return redacted
+
+
+def _start_listener():
+    """Queue-Logger einrichten (einmal pro Prozess)"""
+    global _listener
+    if _listener is not None:
+        return
+    if Config.SLOW_QUERY_LOG:
+        target = logging.handlers.WatchedFileHandler(Config.SLOW_QUERY_LOG)
+    else:
+        target = logging.StreamHandler()
+    target.setFormatter(logging.Formatter('%(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    _listener = logging.handlers.QueueListener(log_queue, target)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def _add_to_summary(entry):
+    with _summary_lock:
+        item = _summary.get(entry['fingerprint'])
+        if item is None:
+            item = _summary[entry['fingerprint']] = {
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0, 'callers': set(), 'endpoints': set()
+            }
+        item['count'] += 1
+        item['total_ms'] += entry['ms']
+        item['max_ms'] = max(item['max_ms'], entry['ms'])
+        item['rows'] += entry['rows']
+        if entry.get('caller'):
+            item['callers'].add(entry['caller'])
+        if entry.get('endpoint'):
+            item['endpoints'].add(entry['endpoint'])
+
+
+def record(entries, endpoint=None, user_id=None):
+    """Langsame Abfragen eines Requests protokollieren"""
+    for entry in entries:
+        line = {
+            'event': 'slow_query',
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'fingerprint': entry['fingerprint'],
+            'params': redact(entry['params']),
+            'ms': entry['ms'],
+            'rows': entry['rows'],
+            'caller': entry['caller'],
+            'endpoint': endpoint,
+            'user_id': user_id
+        }
+        _add_to_summary(line)
+        logger.info(json.dumps(line, default=str))
+
+
+def _top(summary, top):
+    rows = [
+        {
+            'fingerprint': fingerprint,
+            'count': item['count'],
+            'total_ms': round(item['total_ms'], 1),
+            'avg_ms': round(item['total_ms'] / item['count'], 1),
+            'max_ms': round(item['max_ms'], 1),
+            'rows': item['rows'],
+            'callers': sorted(item['callers']),
+            'endpoints': sorted(item['endpoints'])
+        }
+        for fingerprint, item in summary.items()
+    ]
+    rows.sort(key=lambda row: row['total_ms'], reverse=True)
+    return rows[:top]
+
+
+def top_offenders(top=20):
+    """
+    Returns:
+        Liste der Fingerprints mit der grössten Gesamtdauer (dieser Prozess)
+    """
+    with _summary_lock:
+        snapshot = {
+            key: dict(item, callers=set(item['callers']), endpoints=set(item['endpoints']))
+            for key, item in _summary.items()
+        }
+    return _top(snapshot, top)
+
+
+def summarize_file(path, top=20):
+    """Wie top_offenders(), aber aus einer Logdatei (alle Worker)"""
+    summary = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('event') != 'slow_query':
+                continue
+            item = summary.setdefault(entry['fingerprint'], {
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0, 'callers': set(), 'endpoints': set()
+            })
+            item['count'] += 1
+            item['total_ms'] += entry['ms']
+            item['max_ms'] = max(item['max_ms'], entry['ms'])
+            item['rows'] += entry.get('rows') or 0
+            if entry.get('caller'):
+                item['callers'].add(entry['caller'])
+            if entry.get('endpoint'):
+                item['endpoints'].add(entry['endpoint'])
+    return _top(summary, top)
+
+
+def init_app(app):
+    """Slow-Query-Log + Übersicht /ops/slow-queries registrieren"""
+    if Config.SLOW_QUERY_MS <= 0 or not Config.SQL_STATS_ENABLED:
+        return
+
+    from flask import abort, jsonify, request, session
+    from utils import sql_stats
+
+    _start_listener()
+
+    @app.after_request
+    def _log_slow_queries(response):
+        stats = sql_stats.current()
+        if stats is not None and stats.slow:
+            record(stats.slow, request.endpoint, session.get('user_id'))
+        return response
+
+    def slow_queries_view():
+        token = request.headers.get('X-Ops-Token', '')
+        # Bytes vergleichen: compare_digest() wirft bei Nicht-ASCII-str TypeError (→ 500)
+        if not Config.OPS_TOKEN or not hmac.compare_digest(token.encode(), Config.OPS_TOKEN.encode()):
+            abort(404)
+        return jsonify({
+            'threshold_ms': Config.SLOW_QUERY_MS,
+            'queries': top_offenders(request.args.get('top', 20, type=int))
+        })
+
+    app.add_url_rule('/ops/slow-queries', 'slow_queries', slow_queries_view)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Teuerste Abfragen aus dem Slow-Query-Log")
+    ap.add_argument("logfile")
+    ap.add_argument("--top", default=20, type=int)
+    args = ap.parse_args()
+
+    for row in summarize_file(args.logfile, args.top):
+        print(f"{row['total_ms']:>10.1f} ms  {row['count']:>6}x  max {row['max_ms']:>8.1f} ms  "
+              f"{', '.join(row['callers']) or '-'}")
+        print(f"            {row['fingerprint'][:150]}")
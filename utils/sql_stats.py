@@ -0,0 +1,341 @@
+"""
+SQL-Statistik pro Request (Anzahl, Dauer, Zeilen, N+1-Verdacht)
+
+Jeder Cursor aus get_db_connection() / execute_prepared() wird über
+instrument() gewickelt und meldet seine Abfragen an den Sammler des
+aktuellen Requests. Ausserhalb eines Requests (Worker, Scheduler) oder mit
+SQL_STATS_ENABLED=0 gibt es keinen Sammler → der Cursor misst nur noch die
+Dauer für das Histogramm in utils/metrics.py (abschaltbar mit
+METRICS_DB_QUERIES=0).
+
+Ausgabe (siehe init_app):
+    Debug-Modus  → Response-Header X-SQL-*
+    Produktion   → eine JSON-Logzeile pro Request (Logger 'budget_tracker.sql')
+
+N+1: Taucht derselbe Fingerprint (Abfrage ohne Literale) mindestens
+Config.SQL_N_PLUS_ONE_THRESHOLD Mal in einem Request auf, wird er gemeldet.
+"""
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+from config import Config
+from utils import metrics
+
+logger = logging.getLogger('budget_tracker.sql')
+
+_current = contextvars.ContextVar('sql_stats', default=None)
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES\s*\(.*?\)(?:\s*,\s*\(.*?\))*", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+_fingerprint_cache = {}
+_MODELS_DIR = os.sep + 'models' + os.sep
+
+
+def fingerprint(sql):
+    """
+    Normalisierte Form einer Abfrage (Literale → ?, Listen zusammengefasst)
+
+    "SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'"
+        → "select * from t where id in (?+) and name = ?"
+    """
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode('utf-8', 'replace')
+    cached = _fingerprint_cache.get(sql)
+    if cached is not None:
+        return cached
+
+    result = sql.replace('%s', '?')
+    result = _STRING.sub('?', result)
+    result = _NUMBER.sub('?', result)
+    result = _IN_LIST.sub('IN (?+)', result)
+    result = _VALUES_LIST.sub('VALUES (?+)', result)
+    result = _SPACE.sub(' ', result).strip().lower()
+
+    if len(_fingerprint_cache) < 1000:  # nur feste Abfragen landen hier dauerhaft
+        _fingerprint_cache[sql] = result
+    return result
+
+
+class RequestStats:
+    """Sammelt alle Abfragen eines Requests (thread-sicher, wegen run_parallel)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.total_time = 0.0
+        self.rows = 0
+        self.statements = {}  # fingerprint → [anzahl, zeit, zeilen]
+        self.slow = []        # langsame Abfragen (siehe utils/slow_queries.py)
+
+    def record(self, sql, elapsed, rows=0, params=None):
+        key = fingerprint(sql)
+        with self._lock:
+            self.queries += 1
+            self.total_time += elapsed
+            self.rows += rows
+            entry = self.statements.get(key)
+            if entry is None:
+                self.statements[key] = [1, elapsed, rows]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] += rows
+
+    def add_rows(self, sql, rows):
+        key = fingerprint(sql)
+        with self._lock:
+            self.rows += rows
+            entry = self.statements.get(key)
+            if entry is not None:
+                entry[2] += rows
+
+    def add_slow(self, sql, params, elapsed):
+        """
+        Merkt eine langsame Abfrage vor (Zeilen zählt der Cursor nach)
+
+        Returns:
+            Dict des Eintrags
+        """
+        entry = {
+            'fingerprint': fingerprint(sql),
+            'params': params,
+            'ms': round(elapsed * 1000, 3),
+            'rows': 0,
+            'caller': model_caller()
+        }
+        with self._lock:
+            self.slow.append(entry)
+        return entry
+
+    def n_plus_one(self, threshold=None):
+        """Fingerprints, die mindestens `threshold` Mal ausgeführt wurden"""
+        threshold = threshold or Config.SQL_N_PLUS_ONE_THRESHOLD
+        with self._lock:
+            return {key: entry[0] for key, entry in self.statements.items() if entry[0] >= threshold}
+
+    def as_dict(self):
+        with self._lock:
+            statements = [
+                {'sql': key, 'count': count, 'ms': round(elapsed * 1000, 3), 'rows': rows}
+                for key, (count, elapsed, rows) in self.statements.items()
+            ]
+            result = {
+                'queries': self.queries,
+                'sql_ms': round(self.total_time * 1000, 3),
+                'rows': self.rows
+            }
+        statements.sort(key=lambda s: s['ms'], reverse=True)
+        result['statements'] = statements
+        result['n_plus_one'] = self.n_plus_one()
+        return result
+
+
+class StatementLog(RequestStats):
+    """
+    Wie RequestStats, merkt sich aber pro Fingerprint ein Beispiel
+    (SQL, Parameter, aufrufende Model-Methode) - für Werkzeuge wie
+    benchmarks/explain_check.py
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.samples = {}
+
+    def record(self, sql, elapsed, rows=0, params=None):
+        super().record(sql, elapsed, rows, params)
+        key = fingerprint(sql)
+        if key not in self.samples:
+            self.samples[key] = {'sql': sql, 'params': params, 'caller': model_caller()}
+
+
+def model_caller():
+    """
+    Aufrufende Methode im models-Paket, z.B. 'Transaction.get_all_by_user'
+
+    Returns:
+        Name oder None (Aufruf nicht aus models/)
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        if _MODELS_DIR in frame.f_code.co_filename:
+            code = frame.f_code
+            return getattr(code, 'co_qualname', code.co_name)
+        frame = frame.f_back
+    return None
+
+
+@contextlib.contextmanager
+def capture():
+    """
+    Alle Abfragen innerhalb des with-Blocks sammeln (auch ohne Request)
+
+        with sql_stats.capture() as log:
+            Transaction.get_all_by_user(1)
+        log.samples → {fingerprint: {'sql', 'params', 'caller'}}
+    """
+    log = StatementLog()
+    token = _current.set(log)
+    try:
+        yield log
+    finally:
+        _current.reset(token)
+
+
+class InstrumentedCursor:
+    """
+    Cursor-Wrapper: misst execute(), zählt gelesene Zeilen
+
+    Ohne Sammler (stats=None) nur die Dauer für metrics.observe_query()
+    """
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._sql = None
+        self._slow = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._sql = operation
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe_query(operation, elapsed)
+            if self._stats is not None:
+                self._stats.record(operation, elapsed, params=params)
+                self._check_slow(operation, params, elapsed)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        self._sql = operation
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe_query(operation, elapsed)
+            if self._stats is not None:
+                self._stats.record(operation, elapsed)
+                self._check_slow(operation, None, elapsed)
+
+    def _check_slow(self, operation, params, elapsed):
+        threshold = Config.SLOW_QUERY_MS
+        if threshold <= 0 or elapsed * 1000 < threshold:
+            self._slow = None
+            return
+        self._slow = self._stats.add_slow(operation, params, elapsed)
+        if not getattr(self._cursor, 'with_rows', True):
+            # INSERT/UPDATE/DELETE: betroffene Zeilen
+            self._slow['rows'] = max(self._cursor.rowcount, 0)
+
+    def _count_rows(self, count):
+        if self._stats is None:
+            return
+        if self._sql is not None:
+            self._stats.add_rows(self._sql, count)
+        if self._slow is not None:
+            self._slow['rows'] += count
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count_rows(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._count_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count_rows(len(rows))
+        return rows
+
+
+def current():
+    """Sammler des aktuellen Requests oder None"""
+    return _current.get()
+
+
+def instrument(cursor):
+    """
+    Cursor wickeln: Sammler des aktuellen Requests (falls vorhanden) und
+    SQL-Histogramm für /metrics
+
+    Returns:
+        InstrumentedCursor oder der Cursor unverändert (nichts zu messen)
+    """
+    stats = _current.get()
+    if stats is None and not Config.METRICS_DB_QUERIES:
+        return cursor
+    return InstrumentedCursor(cursor, stats)
+
+
+def init_app(app):
+    """Registriert die Hooks für Sammeln + Ausgabe"""
+    if not Config.SQL_STATS_ENABLED:
+        return
+
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    from flask import g, request, session
+
+    @app.before_request
+    def _start_sql_stats():
+        g._sql_stats_token = _current.set(RequestStats())
+
+    @app.after_request
+    def _report_sql_stats(response):
+        stats = _current.get()
+        if stats is None:
+            return response
+
+        if app.debug:
+            response.headers['X-SQL-Queries'] = str(stats.queries)
+            response.headers['X-SQL-Time-ms'] = f"{stats.total_time * 1000:.1f}"
+            response.headers['X-SQL-Rows'] = str(stats.rows)
+            suspects = stats.n_plus_one()
+            if suspects:
+                response.headers['X-SQL-N-Plus-One'] = '; '.join(
+                    f"{count}x {sql[:120]}" for sql, count in suspects.items()
+                )
+        elif stats.queries:
+            entry = stats.as_dict()
+            entry.update({
+                'event': 'sql_stats',
+                'method': request.method,
+                'endpoint': request.endpoint,
+                'status': response.status_code,
+                'user_id': session.get('user_id')
+            })
+            logger.info(json.dumps(entry, default=str))
+        return response
+
+    @app.teardown_request
+    def _stop_sql_stats(exc):
+        token = g.pop('_sql_stats_token', None)
+        if token is not None:
+            _current.reset(token)
@@ -0,0 +1,72 @@
+"""
+Pro-User-Cache im Prozess mit Versionszähler
+
+    _cache = UserCache('categories', Config.CATEGORY_CACHE_SECONDS, Config.CATEGORY_CACHE_USERS)
+    value = _cache.get(user_id, lambda: lade_aus_db(user_id))   # None = Fehler, nicht cachen
+    _cache.invalidate(user_id)                                  # nach jeder Änderung
+
+invalidate() erhöht die Version des Users. Ein Ladevorgang, während dessen
+sich die Version ändert, landet nicht im Cache (sonst könnte ein langsamer
+Leser den Stand vor der Änderung zurückschreiben). Andere Prozesse merken
+nichts davon → Einträge laufen nach `ttl` Sekunden ab (0 = Cache aus).
+
+Treffer/Fehlschläge gehen als budget_tracker_cache_requests_total{cache=name}
+nach /metrics.
+"""
+import threading
+import time
+
+from utils import metrics
+
+
+class UserCache:
+    """Ein Wert pro User, begrenzt auf max_users Einträge (älteste fliegen raus)"""
+
+    def __init__(self, name, ttl, max_users):
+        self.name = name
+        self.ttl = ttl
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._entries = {}   # user_id → (version, geladen_um, wert)
+        self._versions = {}  # user_id → Version (steigt bei jeder Änderung)
+
+    def get(self, user_id, load):
+        """
+        Args:
+            load: Funktion ohne Argumente, liefert den Wert (None = Fehler)
+
+        Returns:
+            Wert aus dem Cache oder frisch geladen (None bei Fehler)
+        """
+        now = time.monotonic()
+        with self._lock:
+            version = self._versions.get(user_id, 0)
+            entry = self._entries.get(user_id)
+        if entry and entry[0] == version and now - entry[1] < self.ttl:
+            metrics.record_cache(self.name, True)
+            return entry[2]
+
+        metrics.record_cache(self.name, False)
+        value = load()
+        if value is None:
+            return None
+
+        with self._lock:
+            if self._versions.get(user_id, 0) == version and self.ttl > 0:
+                if user_id not in self._entries and len(self._entries) >= self.max_users:
+                    self._entries.pop(next(iter(self._entries)))
+                self._entries[user_id] = (version, now, value)
+        return value
+
+    def invalidate(self, user_id):
+        """Eintrag eines Users verwerfen (nach jeder Änderung an seinen Daten)"""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        """Alle Einträge verwerfen"""
+        with self._lock:
+            for user_id in self._entries:
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._entries.clear()
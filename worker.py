@@ -0,0 +1,64 @@
+"""
+worker.py - Führt Hintergrund-Jobs aus (Import, Export, Neuberechnungen)
+
+Eigener Prozess neben der Web-App:
+    python worker.py                 # 4 Threads
+    python worker.py --threads 8
+
+Mehrere Worker-Prozesse dürfen parallel laufen: Jobs werden mit
+FOR UPDATE SKIP LOCKED verteilt (siehe models/job.py). Jeder Worker reiht
+regelmässig Jobs ohne Lebenszeichen wieder ein (gestorbene Worker).
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.job_service import JobService
+from utils import metrics
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Worker für Hintergrund-Jobs")
+    ap.add_argument("--threads", default=4, type=int, help="max. parallel laufende Jobs")
+    ap.add_argument("--poll", default=1.0, type=float, help="Sekunden zwischen Abfragen, wenn nichts zu tun ist")
+    ap.add_argument("--requeue-interval", default=60.0, type=float,
+                    help="Sekunden zwischen Prüfungen auf verwaiste Jobs")
+    args = ap.parse_args()
+
+    running = set()
+    next_requeue = 0.0
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        try:
+            while True:
+                running = {future for future in running if not future.done()}
+                metrics.flush()
+
+                if time.monotonic() >= next_requeue:
+                    next_requeue = time.monotonic() + args.requeue_interval
+                    try:
+                        requeued = JobService.requeue_stale()
+                        if requeued:
+                            print(f"{requeued} verwaiste Jobs neu eingereiht")
+                    except Exception as e:
+                        print(f"[ERROR] Verwaiste Jobs konnten nicht geprüft werden: {e}")
+
+                job = None
+                if len(running) < args.threads:
+                    try:
+                        job = JobService.claim_next()
+                    except Exception as e:
+                        print(f"[ERROR] Job konnte nicht geholt werden: {e}")
+
+                if job:
+                    print(f"Starte Job {job.id} ({job.kind}) für User {job.user_id}")
+                    running.add(pool.submit(JobService.run, job))
+                else:
+                    time.sleep(args.poll)
+        except KeyboardInterrupt:
+            print("Beende Worker - warte auf laufende Jobs...")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())